@@ -2,7 +2,7 @@ __author__ = "Matthew Poole"
 
 from fastapi import Body, FastAPI, HTTPException, Path
 from schemas import CompanyZScores, Financial, ZScore
-from utils import calc_zscore, validate_country_code, validate_id
+from utils import calc_zscores, validate_country_code, validate_id
 
 app = FastAPI(
     title="WiserFunding Technical Assignment",
@@ -146,11 +146,11 @@ async def financial_scores(
 
     financials = payload["financials"]
 
+    zscores = calc_zscores(financials, country_iso_code)
+
     scores = []
-    for financial in financials:
-        score = ZScore(
-            year=financial["year"], zscore=calc_zscore(financial, country_iso_code)
-        )
+    for financial, zscore in zip(financials, zscores.tolist()):
+        score = ZScore(year=financial["year"], zscore=zscore)
         scores.append(score)
 
     result = dict(scores=scores)
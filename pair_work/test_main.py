@@ -1,7 +1,9 @@
 __author__ = "Matthew Poole"
 
+import pytest
 from fastapi.testclient import TestClient
 from main import app
+from utils import calc_zscore
 
 client = TestClient(app)
 
@@ -114,3 +116,9 @@ def test_financial_scores_bad_id():
     response = client.put("/company/gb/abc123", json=payload)
     assert response.status_code == 422
     assert response.json() == {"detail": "Invalid company id"}
+
+
+def test_calc_zscore_zero_total_assets():
+    financial = dict(payload["financials"][0], total_assets=0)
+    with pytest.raises(ZeroDivisionError):
+        calc_zscore(financial, "gb")
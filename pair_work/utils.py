@@ -2,6 +2,7 @@ __author__ = "Matthew Poole"
 
 from typing import List
 
+import numpy as np
 import pycountry
 from schemas import Financial
 
@@ -26,13 +27,44 @@ def calc_zscore(financial: Financial, country_code: str):
     Returns:
         [float]: z-score
     """
+    return float(calc_zscores([financial], country_code)[0])
+
+
+def calc_zscores(financials: List[Financial], country_code: str):
+    """
+    Calculation Z-scores for many financial years in one vectorized pass.
+
+    Args:
+        financials (List[Financial]): financial data per each year
+        country_code (str): country iso code
+
+    Returns:
+        [numpy.ndarray]: z-scores
+    """
     coeffecients = get_zscore_coeffecients(country_code)
+    columns = {
+        field: np.array([financial[field] for financial in financials], dtype=float)
+        for field in (
+            "ebit",
+            "equity",
+            "retained_earnings",
+            "sales",
+            "total_assets",
+            "total_liabilities",
+            "working_capital",
+        )
+    }
+
+    # Same as dividing year by year, a zero denominator fails the whole batch
+    # instead of scoring `inf`
+    if not (columns["total_assets"].all() and columns["total_liabilities"].all()):
+        raise ZeroDivisionError("float division by zero")
 
-    x1 = financial["working_capital"] / financial["total_assets"]
-    x2 = financial["retained_earnings"] / financial["total_assets"]
-    x3 = financial["ebit"] / financial["total_assets"]
-    x4 = financial["equity"] / financial["total_liabilities"]
-    x5 = financial["sales"] / financial["total_assets"]
+    x1 = columns["working_capital"] / columns["total_assets"]
+    x2 = columns["retained_earnings"] / columns["total_assets"]
+    x3 = columns["ebit"] / columns["total_assets"]
+    x4 = columns["equity"] / columns["total_liabilities"]
+    x5 = columns["sales"] / columns["total_assets"]
 
     z = (
         coeffecients[0] * x1
@@ -1,6 +1,13 @@
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import company, items, login, users, utils
+from app.api.api_v1.endpoints import (
+    coeffecients,
+    company,
+    items,
+    login,
+    users,
+    utils,
+)
 
 api_router = APIRouter()
 api_router.include_router(login.router, tags=["login"])
@@ -8,3 +15,6 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(utils.router, prefix="/utils", tags=["utils"])
 api_router.include_router(items.router, prefix="/items", tags=["items"])
 api_router.include_router(company.router, prefix="/company", tags=["company"])
+api_router.include_router(
+    coeffecients.router, prefix="/coeffecients", tags=["coeffecients"]
+)
@@ -0,0 +1,42 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app import models, schemas, utils
+from app.api import deps
+from app.scoring import coeffecient_registry
+
+router = APIRouter()
+
+
+@router.get("/", response_model=schemas.Coeffecients)
+def read_coeffecients(
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Retrieve the current Z-score coeffecients.
+    """
+    table = coeffecient_registry.get()
+    return {"default": table.default, "countries": table.countries}
+
+
+@router.put("/", response_model=schemas.Coeffecients)
+def update_coeffecients(
+    *,
+    coeffecients_in: schemas.Coeffecients,
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Replace the Z-score coeffecients.
+
+    The new version is written atomically and picked up by every worker without
+    a restart.
+    """
+    for code in coeffecients_in.countries:
+        if not utils.validate_country_code(code):
+            raise HTTPException(status_code=422, detail="Invalid country code")
+    table = coeffecient_registry.save(
+        coeffecients_in.default,
+        {code.lower(): c for code, c in coeffecients_in.countries.items()},
+    )
+    return {"default": table.default, "countries": table.countries}
@@ -1,8 +1,272 @@
-from fastapi import APIRouter, HTTPException, Path
+import math
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas, scoring, utils
+from app.api import deps
+from app.api.responses import NDJSONStreamingResponse, ORJSONResponse, render_json
+from app.api.routing import MsgPackRoute
+from app.core.cache import zscore_cache
+from app.core.config import settings
+from app.core.executor import ExecutorBusy, compute_executor
+from app.db.session import AsyncSessionLocal
+
+# Company endpoints also speak MessagePack and accept gzip request bodies, see
+# `MsgPackRoute`
+router = APIRouter(route_class=MsgPackRoute)
+
+ResultType = TypeVar("ResultType")
+
+# Records scored per kernel call on the NDJSON stream
+STREAM_CHUNK_SIZE = 1024
+# Longest line of the NDJSON stream, in bytes, longer ones are reported in place
+STREAM_LINE_SIZE = 64 * 1024
+
+# Relative changes of each field of the formula when none are given
+SENSITIVITY_CHANGES = (-0.5, -0.4, -0.3, -0.2, -0.1, 0.1, 0.2, 0.3, 0.4, 0.5)
+SENSITIVITY_MAX_POINTS = 10000
+
+# Span of years of the companies x years matrix of trends
+TRENDS_MAX_YEARS = 200
+
+DISTRIBUTION_PERCENTILES = [5.0, 25.0, 50.0, 75.0, 95.0]
+
+RANKS_DESCRIPTION = (
+    "Attach the percentile of each score within the stored scores of its "
+    "country and year cohort."
+)
+
+COLUMNAR_DESCRIPTION = (
+    "Return one array per field, `year`, `zscore`, `zone` and, with `ranks`, "
+    "`percentile`, instead of one object per year."
+)
+
+# Errors of the optional fields, which only leave the scores reading them `null`
+OPTIONAL_FIELD_ERRORS = frozenset(
+    f"Missing {field}" for field in scoring.EXTRA_FINANCIAL_FIELDS
+)
+
+FORMULA_DESCRIPTION = (
+    "Z-score formula, one of: "
+    + ", ".join(f"`{name}`" for name in scoring.FORMULAS)
+    + ". Defaults to the formula of the country."
+)
+
+
+def _validate_company(country_iso_code: str, id: str) -> None:
+    if not utils.validate_country_code(country_iso_code):
+        raise HTTPException(status_code=422, detail="Invalid country code")
+
+    if not utils.validate_id(id):
+        raise HTTPException(status_code=422, detail="Invalid company id")
+
+
+def _validate_financials(
+    columns: Dict[str, np.ndarray],
+    formulas: Iterable[str],
+    ignored: Collection[str] = (),
+) -> None:
+    # Rows failing validation would score `inf` or `nan`, they are answered
+    # with 422 and the errors of each row instead
+    row_errors: scoring.RowErrors = {}
+    for formula in formulas:
+        for detail, mask in scoring.validate_rows(columns, formula).items():
+            if detail in ignored:
+                continue
+            row_errors[detail] = (
+                row_errors[detail] | mask if detail in row_errors else mask
+            )
+    invalid = scoring.invalid_rows(row_errors, len(columns["year"]))
+    if invalid.any():
+        years = columns["year"]
+        raise HTTPException(
+            status_code=422,
+            detail=[
+                {
+                    "row": row,
+                    "year": (
+                        None if years[row] == scoring.MISSING_YEAR else int(years[row])
+                    ),
+                    "detail": "; ".join(scoring.error_details(row_errors, row)),
+                }
+                for row in np.flatnonzero(invalid).tolist()
+            ],
+        )
+
+
+def _finite(value: float) -> Optional[float]:
+    # Non-finite values are rendered as `null`
+    return value if math.isfinite(value) else None
+
+
+def _check_finite(zscores: np.ndarray) -> None:
+    # Valid rows can still overflow, which is an error rather than a `null`
+    if not np.isfinite(zscores).all():
+        raise HTTPException(status_code=422, detail="Score is not finite")
+
+
+def _check_changes(
+    compiled: scoring.CompiledFormula,
+    changes: Mapping[str, Iterable[float]],
+    detail: str,
+) -> None:
+    # A change of -100% or less leaves a denominator zero or negative
+    denominators = {ratio.denominator for ratio in compiled.ratios}
+    if any(
+        change <= -1
+        for field, field_changes in changes.items()
+        if field in denominators
+        for change in field_changes
+    ):
+        raise HTTPException(status_code=422, detail=detail)
 
-from app import schemas, utils
 
-router = APIRouter()
+class _ScoredBatch(NamedTuple):
+    companies: List[schemas.CompanyFinancials]
+    # Per each company of `companies`
+    countries: np.ndarray
+    # Per each valid financial year
+    groups: np.ndarray
+    years: np.ndarray
+    formulas: np.ndarray
+    columns: Dict[str, np.ndarray]
+    coeffecients: scoring.CoeffecientTable
+    zscores: np.ndarray
+    errors: List[schemas.CompanyError]
+
+
+def _score_companies(
+    payload: schemas.BulkFinancialPayload, formula: Optional[str]
+) -> _ScoredBatch:
+    # Companies and their financial years are validated with one mask per
+    # check, so every bad company and year is reported
+    companies = payload.companies
+    ids = scoring.country_ids([company.country_iso_code for company in companies])
+    company_errors = {
+        "Invalid country code": ~scoring.validate_country_ids(ids),
+        "Invalid company id": ~scoring.validate_ids(
+            [company.id for company in companies]
+        ),
+    }
+    invalid = scoring.invalid_rows(company_errors, len(companies))
+    indices = np.flatnonzero(~invalid)
+    valid = [companies[index] for index in indices.tolist()]
+    countries = ids[indices]
+
+    errors = [
+        schemas.CompanyError(
+            index=index,
+            country_iso_code=companies[index].country_iso_code,
+            id=companies[index].id,
+            detail=scoring.error_details(company_errors, index)[0],
+        )
+        for index in np.flatnonzero(invalid).tolist()
+    ]
+
+    lengths = [len(company.financials) for company in valid]
+    columns = scoring.financials_to_columns(
+        [financial for company in valid for financial in company.financials]
+    )
+    groups = np.repeat(np.arange(len(valid)), lengths)
+    formulas = np.repeat(
+        np.asarray(
+            [
+                utils.get_zscore_formula(company.country_iso_code, formula)
+                for company in valid
+            ],
+            dtype=str,
+        ),
+        lengths,
+    )
+    row_errors = scoring.validate_rows(columns, formulas, groups=groups)
+    invalid = scoring.invalid_rows(row_errors, len(groups))
+    if invalid.any():
+        offsets = np.cumsum(lengths) - lengths
+        for row in np.flatnonzero(invalid).tolist():
+            company = valid[groups[row]]
+            year = int(columns["year"][row])
+            errors.append(
+                schemas.CompanyError(
+                    index=indices[groups[row]],
+                    country_iso_code=company.country_iso_code,
+                    id=company.id,
+                    row=row - offsets[groups[row]],
+                    year=None if year == scoring.MISSING_YEAR else year,
+                    detail="; ".join(scoring.error_details(row_errors, row)),
+                )
+            )
+        errors.sort(key=lambda error: error.index)
+
+        keep = ~invalid
+        columns = {field: values[keep] for field, values in columns.items()}
+        groups, formulas = groups[keep], formulas[keep]
+
+    coeffecients = scoring.coeffecient_registry.get()
+    zscores = scoring.calc_zscores(
+        columns, countries[groups], coeffecients, formulas=formulas, groups=groups
+    )
+    return _ScoredBatch(
+        companies=valid,
+        countries=countries,
+        groups=groups,
+        years=columns["year"],
+        formulas=formulas,
+        columns=columns,
+        coeffecients=coeffecients,
+        zscores=zscores,
+        errors=errors,
+    )
+
+
+def _columnar(scores: List[dict], fields: Iterable[str]) -> dict:
+    return {field: [score[field] for score in scores] for field in fields}
+
+
+async def _compute(func: Callable[..., ResultType], *args: Any) -> ResultType:
+    # CPU-heavy work leaves the event loop for the bounded compute executor
+    try:
+        return await compute_executor.run(func, *args)
+    except ExecutorBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many requests in progress",
+            headers={"Retry-After": "1"},
+        )
+
+
+async def _rank_scores(
+    country_iso_code: str, scores: List[schemas.ZScore]
+) -> List[schemas.RankedZScore]:
+    # A session of its own, so that requests without ranks never take one
+    async with AsyncSessionLocal() as db:
+        return await crud.financial.arank_scores(
+            db, country_iso_code=country_iso_code, scores=scores
+        )
+
+
+def _get_formula(country_iso_code: str, formula: Optional[str] = None) -> str:
+    formula = utils.get_zscore_formula(country_iso_code, formula)
+    if not utils.validate_formula(formula):
+        raise HTTPException(status_code=422, detail="Invalid formula")
+    return formula
 
 
 @router.put(
@@ -12,18 +276,40 @@ router = APIRouter()
     description="Calculate Z-Scores with Z-Score formula for predicting bankruptcy, created by \
              Professor Edward Altman, the co-founder of WiserFunding.",
     response_description="Dict of z-scores data per each year",
-    response_model=schemas.CompanyZScores,
+    response_model=Union[  # type: ignore
+        schemas.CompanyZScores, schemas.ColumnarZScores
+    ],
     responses={
         200: {
             "content": {
                 "application/json": {
                     "example": {
                         "scores": [
-                            {"year": 2020, "zscore": 6.539547842049954},
-                            {"year": 2019, "zscore": 6.786510311168614},
-                            {"year": 2018, "zscore": 6.6714673215855385},
-                            {"year": 2017, "zscore": 6.460657488940055},
-                            {"year": 2016, "zscore": 6.602816418774483},
+                            {
+                                "year": 2020,
+                                "zscore": 6.539547842049954,
+                                "zone": "safe",
+                            },
+                            {
+                                "year": 2019,
+                                "zscore": 6.786510311168614,
+                                "zone": "safe",
+                            },
+                            {
+                                "year": 2018,
+                                "zscore": 6.6714673215855385,
+                                "zone": "safe",
+                            },
+                            {
+                                "year": 2017,
+                                "zscore": 6.460657488940055,
+                                "zone": "safe",
+                            },
+                            {
+                                "year": 2016,
+                                "zscore": 6.602816418774483,
+                                "zone": "safe",
+                            },
                         ]
                     }
                 }
@@ -37,34 +323,961 @@ router = APIRouter()
         },
     },
 )
-def financial_scores(
-    payload: schemas.FinancialPayload,
+async def financial_scores(
+    payload: Union[schemas.FinancialPayload, schemas.ColumnarFinancialPayload],
     country_iso_code: str = Path(..., description="Country ISO Code."),
     id: str = Path(..., description="Company ID."),
-):
+    formula: Optional[str] = Query(None, description=FORMULA_DESCRIPTION),
+    ranks: bool = Query(False, description=RANKS_DESCRIPTION),
+    columnar: bool = Query(False, description=COLUMNAR_DESCRIPTION),
+) -> Any:
     """
     Get Z-scores for 5 financial years
 
+    Args:
+        iso_code (str): country iso code
+        id (str): company id
+        financial (Financial): financial data, one row per year or one array
+            per field
+        formula (str): z-score formula
+        ranks (bool): attach cohort percentiles
+        columnar (bool): return one array per field
+    """
+    _validate_company(country_iso_code, id)
+    formula = _get_formula(country_iso_code, formula)
+
+    if isinstance(payload, schemas.ColumnarFinancialPayload):
+        columns = payload.to_columns()
+    else:
+        columns = scoring.financials_to_columns(payload.financials)
+    coeffecients = scoring.coeffecient_registry.get()
+
+    # Percentiles change as scores are stored, so they are never cached
+    if ranks:
+        _validate_financials(columns, [formula])
+        zscores = scoring.calc_zscores(
+            columns, country_iso_code, coeffecients, formulas=formula
+        )
+        _check_finite(zscores)
+        zones = scoring.calc_zones(zscores, formula)
+        ranked = await _rank_scores(
+            country_iso_code,
+            [
+                schemas.ZScore(year=year, zscore=zscore, zone=scoring.zone_name(code))
+                for year, zscore, code in zip(
+                    columns["year"].tolist(), zscores.tolist(), zones.tolist()
+                )
+            ],
+        )
+        scores = [score.dict() for score in ranked]
+        body = render_json(
+            _columnar(scores, schemas.RankedZScore.__fields__)
+            if columnar
+            else dict(scores=scores)
+        )
+        return Response(content=body, media_type="application/json")
+
+    key = (
+        scoring.country_id(country_iso_code),
+        formula,
+        coeffecients.version,
+        scoring.fingerprint(columns),
+        columnar,
+    )
+
+    # Cached responses are returned as is, skipping the response model. Only
+    # valid rows are cached, so hits are not validated again
+    cached = zscore_cache.get(key)
+    if cached is None:
+        _validate_financials(columns, [formula])
+        zscores = scoring.calc_zscores(
+            columns, country_iso_code, coeffecients, formulas=formula
+        )
+        _check_finite(zscores)
+        zone_names = [
+            scoring.zone_name(code)
+            for code in scoring.calc_zones(zscores, formula).tolist()
+        ]
+        result: Dict[str, Any]
+        if columnar:
+            result = dict(year=columns["year"], zscore=zscores, zone=zone_names)
+        else:
+            result = dict(
+                scores=[
+                    {"year": year, "zscore": zscore, "zone": zone}
+                    for year, zscore, zone in zip(
+                        columns["year"].tolist(), zscores.tolist(), zone_names
+                    )
+                ]
+            )
+        cached = render_json(result)
+        zscore_cache.set(key, cached)
+
+    return Response(content=cached, media_type="application/json")
+
+
+@router.put(
+    "/{country_iso_code}/{id}/models",
+    name="Company Multi-Model Scores",
+    summary="Calcuation of several bankruptcy scores side by side for given company.",
+    description="Calculate the requested scores, by default the Altman Z-Score of the \
+             country, the Ohlson O-Score and the Zmijewski score, in one pass sharing \
+             the ratios they have in common. The Ohlson and Zmijewski scores need the \
+             optional `current_assets`, `current_liabilities`, `funds_from_operations` \
+             and `net_income` fields, and are `null` without them.",
+    response_description="Dict of scores per each model per each year",
+    response_model=schemas.CompanyModelScores,
+    response_class=ORJSONResponse,
+    responses={
+        422: {
+            "description": "Validation Error.",
+            "content": {"application/json": {"example": {"detail": "Invalid formula"}}},
+        },
+    },
+)
+async def financial_model_scores(
+    payload: schemas.FinancialPayload,
+    country_iso_code: str = Path(..., description="Country ISO Code."),
+    id: str = Path(..., description="Company ID."),
+    formulas: Optional[List[str]] = Query(
+        None, description="Score formulas, any of the Z-score formulas."
+    ),
+) -> Any:
+    """
+    Get several scores for 5 financial years
+
     Args:
         iso_code (str): country iso code
         id (str): company id
         financial (Financial): financial data
+        formulas (List[str]): score formulas
     """
-    if not utils.validate_country_code(country_iso_code):
-        raise HTTPException(status_code=422, detail="Invalid country code")
+    _validate_company(country_iso_code, id)
+    if not formulas:
+        formulas = [
+            _get_formula(country_iso_code),
+            scoring.OHLSON_O.name,
+            scoring.ZMIJEWSKI.name,
+        ]
+    if not all(utils.validate_formula(formula) for formula in formulas):
+        raise HTTPException(status_code=422, detail="Invalid formula")
 
-    if not utils.validate_id(id):
-        raise HTTPException(status_code=422, detail="Invalid company id")
+    formulas = list(dict.fromkeys(formulas))
+    columns = scoring.financials_to_columns(payload.financials)
+    # Only the scores reading a missing optional field are `null`
+    _validate_financials(columns, formulas, OPTIONAL_FIELD_ERRORS)
+    scores = {}
+    for name, values in scoring.calc_scores(
+        columns, country_iso_code, formulas
+    ).items():
+        missing = np.zeros(len(values), dtype=bool)
+        for field in scoring.FORMULAS[name].fields:
+            if field in scoring.EXTRA_FINANCIAL_FIELDS:
+                missing |= np.isnan(columns[field])
+        _check_finite(values[~missing])
+        scores[name] = [
+            None if is_missing else score
+            for score, is_missing in zip(values.tolist(), missing.tolist())
+        ]
+
+    return ORJSONResponse(
+        dict(
+            scores=[
+                dict(year=year, scores={name: scores[name][i] for name in scores})
+                for i, year in enumerate(columns["year"].tolist())
+            ]
+        )
+    )
+
+
+@router.put(
+    "/{country_iso_code}/{id}/sensitivity",
+    name="Company Z-Score Sensitivity",
+    summary="What-if analysis of the Z-Score of given company for one financial year.",
+    description="Calculate the Z-Score over a grid of relative changes of each \
+             field in one vectorized computation, along with the partial \
+             derivative of the Z-Score with respect to each field and the values \
+             of each field at which the Z-Score reaches the zone thresholds.",
+    response_description="Z-score sensitivity per each field",
+    response_model=schemas.CompanySensitivity,
+    response_class=ORJSONResponse,
+    responses={
+        422: {
+            "description": "Validation Error.",
+            "content": {"application/json": {"example": {"detail": "Invalid field"}}},
+        },
+    },
+)
+async def financial_sensitivity(
+    payload: schemas.SensitivityPayload,
+    country_iso_code: str = Path(..., description="Country ISO Code."),
+    id: str = Path(..., description="Company ID."),
+    formula: Optional[str] = Query(None, description=FORMULA_DESCRIPTION),
+) -> Any:
+    """
+    Get Z-score sensitivity for one financial year
+
+    Args:
+        iso_code (str): country iso code
+        id (str): company id
+        payload (SensitivityPayload): financial data and changes per each field
+        formula (str): z-score formula
+    """
+    _validate_company(country_iso_code, id)
+    formula = _get_formula(country_iso_code, formula)
+    compiled = scoring.FORMULAS[formula]
+    if any(field in scoring.DERIVED_FIELDS for field in compiled.fields):
+        raise HTTPException(status_code=422, detail="Formula is not supported")
 
-    financials = payload.financials
+    perturbations = payload.perturbations or {
+        field: list(SENSITIVITY_CHANGES) for field in compiled.fields
+    }
+    fields = list(perturbations)
+    if not all(
+        field in scoring.FINANCIAL_FIELDS or field in scoring.EXTRA_FINANCIAL_FIELDS
+        for field in fields
+    ):
+        raise HTTPException(status_code=422, detail="Invalid field")
+    if sum(len(changes) for changes in perturbations.values()) > SENSITIVITY_MAX_POINTS:
+        raise HTTPException(status_code=422, detail="Too many perturbations")
+    _check_changes(compiled, perturbations, "Invalid change")
 
-    scores = []
-    for financial in financials:
-        score = schemas.ZScore(
-            year=financial.year,
-            zscore=utils.calc_zscore(financial, country_iso_code),
+    columns = scoring.financials_to_columns([payload.financial])
+    _validate_financials(columns, [formula])
+    coeffecients = scoring.coeffecient_registry.get()
+    zones = compiled.zones or ()
+
+    zscore = scoring.calc_zscores(
+        columns, country_iso_code, coeffecients, formulas=formula
+    )
+    _check_finite(zscore)
+    grid = scoring.calc_grid(
+        columns, country_iso_code, perturbations, formula, coeffecients
+    )
+    derivatives = scoring.calc_derivatives(
+        columns, country_iso_code, fields, formula, coeffecients
+    )
+    break_even = scoring.calc_break_even(
+        columns, country_iso_code, fields, zones, formula, coeffecients
+    )
+
+    def zone(zscores: Any) -> List[Optional[str]]:
+        if not compiled.zones:
+            return [None] * len(zscores)
+        codes = scoring.classify_zones(zscores, compiled.zones)
+        return [scoring.zone_name(code) for code in codes.tolist()]
+
+    results = []
+    for field in fields:
+        value = float(columns[field][0])
+        grid_zscores = grid[field]
+        points = [
+            dict(
+                change=change,
+                value=_finite(value * (1 + change)),
+                zscore=_finite(grid_zscore),
+                zone=grid_zone,
+            )
+            for change, grid_zscore, grid_zone in zip(
+                perturbations[field], grid_zscores.tolist(), zone(grid_zscores)
+            )
+        ]
+        results.append(
+            dict(
+                field=field,
+                value=_finite(value),
+                derivative=_finite(float(derivatives[field][0])),
+                break_even={
+                    name: _finite(threshold_value)
+                    for name, threshold_value in zip(
+                        ("distress", "safe"), break_even[field][0].tolist()
+                    )
+                },
+                grid=points,
+            )
+        )
+
+    return ORJSONResponse(
+        dict(
+            year=payload.financial.year,
+            zscore=_finite(float(zscore[0])),
+            zone=zone(zscore)[0],
+            fields=results,
+        )
+    )
+
+
+@router.put(
+    "/{country_iso_code}/{id}/distribution",
+    name="Company Z-Score Distribution",
+    summary="Monte Carlo distribution of Z-Scores under uncertainty of the financials.",
+    description="Draw `samples` scenarios per each financial year from the uncertainty \
+             of each field in one vectorized draw, score them with the batch \
+             kernel, and summarize the Z-Scores with percentiles and the \
+             probability of each zone. Results are reproducible with a `seed`.",
+    response_description="Z-score distribution per each year",
+    response_model=schemas.CompanyZScoreDistribution,
+    response_class=ORJSONResponse,
+    responses={
+        422: {
+            "description": "Validation Error.",
+            "content": {"application/json": {"example": {"detail": "Invalid field"}}},
+        },
+    },
+)
+async def financial_distribution(
+    payload: schemas.DistributionPayload,
+    country_iso_code: str = Path(..., description="Country ISO Code."),
+    id: str = Path(..., description="Company ID."),
+    formula: Optional[str] = Query(None, description=FORMULA_DESCRIPTION),
+    samples: int = Query(
+        10000,
+        ge=1,
+        le=settings.ZSCORE_SIMULATION_MAX_SAMPLES,
+        description="Scenarios per each financial year.",
+    ),
+    seed: Optional[int] = Query(None, ge=0, description="Seed of the random draw."),
+    percentiles: List[float] = Query(
+        DISTRIBUTION_PERCENTILES, description="Percentiles in [0, 100]."
+    ),
+) -> Any:
+    """
+    Get Z-score distribution for financial years
+
+    Args:
+        iso_code (str): country iso code
+        id (str): company id
+        payload (DistributionPayload): financial data and uncertainty per each field
+        formula (str): z-score formula
+        samples (int): scenarios per each year
+        seed (int): seed of the random draw
+        percentiles (List[float]): percentiles of the distribution
+    """
+    _validate_company(country_iso_code, id)
+    formula = _get_formula(country_iso_code, formula)
+    compiled = scoring.FORMULAS[formula]
+    if any(field in scoring.DERIVED_FIELDS for field in compiled.fields):
+        raise HTTPException(status_code=422, detail="Formula is not supported")
+    if not all(
+        field in scoring.FINANCIAL_FIELDS or field in scoring.EXTRA_FINANCIAL_FIELDS
+        for field in payload.uncertainty
+    ):
+        raise HTTPException(status_code=422, detail="Invalid field")
+    if not all(0 <= percentile <= 100 for percentile in percentiles):
+        raise HTTPException(status_code=422, detail="Invalid percentile")
+    _check_changes(
+        compiled,
+        {
+            field: field_uncertainty.bounds
+            for field, field_uncertainty in payload.uncertainty.items()
+            if field_uncertainty.bounds is not None
+        },
+        "Invalid bounds",
+    )
+
+    columns = scoring.financials_to_columns(payload.financials)
+    _validate_financials(columns, [formula])
+    coeffecients = scoring.coeffecient_registry.get()
+    uncertainty = {
+        field: scoring.Uncertainty(
+            relative_std=field_uncertainty.relative_std or 0.0,
+            bounds=field_uncertainty.bounds,
         )
-        scores.append(score)
+        for field, field_uncertainty in payload.uncertainty.items()
+    }
+
+    zscores = scoring.calc_zscores(
+        columns, country_iso_code, coeffecients, formulas=formula
+    )
+    _check_finite(zscores)
 
-    result = dict(scores=scores)
-    return result
+    means, values, probabilities = await _compute(
+        scoring.simulate_distribution,
+        columns,
+        country_iso_code,
+        uncertainty,
+        samples,
+        percentiles,
+        compiled.zones,
+        formula,
+        coeffecients,
+        seed,
+    )
+
+    scores = [
+        dict(
+            year=year,
+            zscore=_finite(zscore),
+            mean=_finite(mean),
+            percentiles={
+                f"p{percentile:g}": _finite(value)
+                for percentile, value in zip(percentiles, row_values)
+            },
+            zones=dict(zip(scoring.ZONES, row_probabilities)),
+        )
+        for year, zscore, mean, row_values, row_probabilities in zip(
+            columns["year"].tolist(),
+            zscores.tolist(),
+            means.tolist(),
+            values.tolist(),
+            probabilities.tolist(),
+        )
+    ]
+    return ORJSONResponse(dict(samples=samples, seed=seed, scores=scores))
+
+
+@router.patch(
+    "/{country_iso_code}/{id}",
+    name="Incremental Company Z-Scores",
+    summary="Store new or changed financial years of given company and score only those.",
+    description="Merge the financial years of the payload into the stored financials \
+             of given company. Only new or changed years are scored, and the merged \
+             score history of the company is returned from storage.",
+    response_description="Dict of stored z-scores data per each year, latest first, \
+        with their percentile within the country and year cohort",
+    response_model=schemas.CompanyRankedZScores,
+    response_class=ORJSONResponse,
+    responses={
+        422: {
+            "description": "Validation Error.",
+            "content": {
+                "application/json": {"example": {"detail": "Duplicate financial year"}}
+            },
+        },
+    },
+)
+async def merge_financial_scores(
+    payload: schemas.FinancialPayload,
+    country_iso_code: str = Path(..., description="Country ISO Code."),
+    id: str = Path(..., description="Company ID."),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get stored Z-scores after merging new or changed financial years
+
+    Args:
+        iso_code (str): country iso code
+        id (str): company id
+        financial (Financial): financial data of new or changed years
+    """
+    _validate_company(country_iso_code, id)
+
+    years = [financial.year for financial in payload.financials]
+    if len(set(years)) != len(years):
+        raise HTTPException(status_code=422, detail="Duplicate financial year")
+    # Nothing is stored unless every year can be scored
+    formula = _get_formula(country_iso_code)
+    _validate_financials(scoring.financials_to_columns(payload.financials), [formula])
+
+    scores = await crud.financial.amerge_by_company(
+        db,
+        country_iso_code=country_iso_code,
+        company_id=id,
+        financials=payload.financials,
+        coeffecients=scoring.coeffecient_registry.get(),
+        formula=formula,
+    )
+    ranked = await crud.financial.arank_scores(
+        db, country_iso_code=country_iso_code, scores=scores
+    )
+    return ORJSONResponse(dict(scores=ranked))
+
+
+@router.get(
+    "/{country_iso_code}/{id}",
+    name="Stored Company Z-Scores",
+    response_model=schemas.CompanyRankedZScores,
+    response_class=ORJSONResponse,
+)
+async def read_financial_scores(
+    country_iso_code: str = Path(..., description="Country ISO Code."),
+    id: str = Path(..., description="Company ID."),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get stored Z-scores of given company, latest year first, with their
+    percentile within the country and year cohort.
+
+    Scores calculated with other coeffecients than the current ones are
+    rescored, nothing is stored: they are stored by the next merge.
+    """
+    _validate_company(country_iso_code, id)
+
+    scores = await crud.financial.aget_history_by_company(
+        db,
+        country_iso_code=country_iso_code,
+        company_id=id,
+        coeffecients=scoring.coeffecient_registry.get(),
+        formula=_get_formula(country_iso_code),
+    )
+    if not scores:
+        raise HTTPException(status_code=404, detail="Company not found")
+    ranked = await crud.financial.arank_scores(
+        db, country_iso_code=country_iso_code, scores=scores
+    )
+    return ORJSONResponse(dict(scores=ranked))
+
+
+def _bulk_scores(
+    payload: schemas.BulkFinancialPayload, formula: Optional[str]
+) -> ORJSONResponse:
+    batch = _score_companies(payload, formula)
+
+    # Classify and count the scores of all companies at once
+    zones = scoring.calc_zones(batch.zscores, batch.formulas)
+    ids, histogram_years, counts = scoring.zone_histogram(
+        batch.countries[batch.groups], batch.years, zones
+    )
+    # Plain dicts with the fields of the response model, which is skipped
+    histogram = [
+        {
+            "country_iso_code": scoring.country_code(cid),
+            "year": year,
+            **dict(zip(scoring.ZONES, zone_counts)),
+        }
+        for cid, year, zone_counts in zip(
+            ids.tolist(), histogram_years.tolist(), counts.tolist()
+        )
+    ]
+
+    splits = np.cumsum(np.bincount(batch.groups, minlength=len(batch.companies)))[:-1]
+    results = []
+    for company, years, zscores, codes in zip(
+        batch.companies,
+        np.split(batch.years, splits),
+        np.split(batch.zscores, splits),
+        np.split(zones, splits),
+    ):
+        scores = [
+            {"year": year, "zscore": zscore, "zone": scoring.zone_name(code)}
+            for year, zscore, code in zip(
+                years.tolist(), zscores.tolist(), codes.tolist()
+            )
+        ]
+        results.append(
+            {
+                "country_iso_code": company.country_iso_code,
+                "id": company.id,
+                "scores": scores,
+            }
+        )
+
+    result = dict(results=results, errors=batch.errors, histogram=histogram)
+    return ORJSONResponse(result)
+
+
+@router.put(
+    "/bulk",
+    name="Bulk Company Z-Scores",
+    summary="Calcuation of Z-Scores for many companies in one request.",
+    description="Validate every company of the payload and calculate the Z-Scores of \
+             the valid ones with a single batched computation. Companies that fail \
+             validation are reported in `errors` instead of failing the request.",
+    response_description="Z-scores per each valid company and errors per each invalid one",
+    response_model=schemas.BulkCompanyZScores,
+    response_class=ORJSONResponse,
+    responses={
+        200: {
+            "content": {
+                "application/json": {
+                    "example": {
+                        "results": [
+                            {
+                                "country_iso_code": "gb",
+                                "id": "10149809",
+                                "scores": [
+                                    {
+                                        "year": 2020,
+                                        "zscore": 6.539547842049954,
+                                        "zone": "safe",
+                                    }
+                                ],
+                            }
+                        ],
+                        "errors": [
+                            {
+                                "index": 1,
+                                "country_iso_code": "gbh",
+                                "id": "10149809",
+                                "detail": "Invalid country code",
+                            }
+                        ],
+                        "histogram": [
+                            {
+                                "country_iso_code": "gb",
+                                "year": 2020,
+                                "distress": 0,
+                                "grey": 0,
+                                "safe": 1,
+                            }
+                        ],
+                    }
+                }
+            }
+        },
+    },
+)
+async def bulk_financial_scores(
+    payload: schemas.BulkFinancialPayload,
+    formula: Optional[str] = Query(None, description=FORMULA_DESCRIPTION),
+) -> Any:
+    """
+    Get Z-scores for many companies
+
+    Args:
+        payload (BulkFinancialPayload): financial data per each company
+        formula (str): z-score formula of every company
+    """
+    if formula is not None and not utils.validate_formula(formula):
+        raise HTTPException(status_code=422, detail="Invalid formula")
+
+    return await _compute(_bulk_scores, payload, formula)
+
+
+def _bulk_trends(
+    payload: schemas.BulkFinancialPayload, formula: Optional[str]
+) -> ORJSONResponse:
+    batch = _score_companies(payload, formula)
+    if len(batch.years) and batch.years.max() - batch.years.min() >= TRENDS_MAX_YEARS:
+        raise HTTPException(status_code=422, detail="Too many years")
+
+    trends = scoring.calc_trends(
+        batch.groups, batch.years, batch.zscores, len(batch.companies)
+    )
+
+    years = trends.years.tolist()
+    results = []
+    for company, zscores, deltas, slope, declines in zip(
+        batch.companies,
+        trends.zscores.tolist(),
+        trends.deltas.tolist(),
+        trends.slopes.tolist(),
+        trends.declines.tolist(),
+    ):
+        # Years the company has no valid financials for are left out
+        scores = [
+            schemas.ZScoreTrend(year=year, zscore=_finite(zscore), delta=_finite(delta))
+            for year, zscore, delta in zip(years, zscores, deltas)
+            if not math.isnan(zscore)
+        ]
+        results.append(
+            schemas.CompanyTrend(
+                country_iso_code=company.country_iso_code,
+                id=company.id,
+                slope=_finite(slope),
+                declines=declines,
+                scores=scores,
+            )
+        )
+
+    result = dict(results=results, errors=batch.errors)
+    return ORJSONResponse(result)
+
+
+@router.put(
+    "/trends",
+    name="Bulk Company Z-Score Trends",
+    summary="Z-Score trends for many companies in one request.",
+    description="Score every valid company of the payload, and calculate per each \
+             company the year-over-year deltas, the least-squares slope of the \
+             Z-Score per year, and the number of consecutive declines up to its \
+             latest year. Trends are calculated with matrix operations over all \
+             companies and years at once.",
+    response_description="Z-score trends per each valid company and errors per each invalid one",
+    response_model=schemas.BulkCompanyTrends,
+    response_class=ORJSONResponse,
+    responses={
+        200: {
+            "content": {
+                "application/json": {
+                    "example": {
+                        "results": [
+                            {
+                                "country_iso_code": "gb",
+                                "id": "10149809",
+                                "slope": -0.05,
+                                "declines": 1,
+                                "scores": [
+                                    {
+                                        "year": 2019,
+                                        "zscore": 6.786510311168614,
+                                        "delta": None,
+                                    },
+                                    {
+                                        "year": 2020,
+                                        "zscore": 6.539547842049954,
+                                        "delta": -0.24696246911866,
+                                    },
+                                ],
+                            }
+                        ],
+                        "errors": [],
+                    }
+                }
+            }
+        },
+    },
+)
+async def bulk_financial_trends(
+    payload: schemas.BulkFinancialPayload,
+    formula: Optional[str] = Query(None, description=FORMULA_DESCRIPTION),
+) -> Any:
+    """
+    Get Z-score trends for many companies
+
+    Args:
+        payload (BulkFinancialPayload): financial data per each company
+        formula (str): z-score formula of every company
+    """
+    if formula is not None and not utils.validate_formula(formula):
+        raise HTTPException(status_code=422, detail="Invalid formula")
+
+    return await _compute(_bulk_trends, payload, formula)
+
+
+@router.put(
+    "/ingest",
+    name="Bulk Company Ingestion",
+    summary="Store the financial years of many companies with their Z-Scores.",
+    description="Validate every company of the payload, score the valid financial \
+             years with a single batched computation, and store them with their \
+             scores in a few bulk statements. Stored years of a company are \
+             overwritten. Companies and years that fail validation are reported in \
+             `errors` and left out.",
+    response_description="Number of stored financial years and errors per each \
+        invalid company or year",
+    response_model=schemas.BulkIngestResult,
+    response_class=ORJSONResponse,
+    responses={
+        200: {
+            "content": {
+                "application/json": {
+                    "example": {
+                        "stored": 5,
+                        "errors": [
+                            {
+                                "index": 1,
+                                "country_iso_code": "gbh",
+                                "id": "10149809",
+                                "detail": "Invalid country code",
+                            }
+                        ],
+                    }
+                }
+            }
+        },
+    },
+)
+async def ingest_financial_scores(
+    payload: schemas.BulkFinancialPayload,
+    formula: Optional[str] = Query(None, description=FORMULA_DESCRIPTION),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Store financial years and Z-scores of many companies
+
+    Args:
+        payload (BulkFinancialPayload): financial data per each company
+        formula (str): z-score formula of every company
+    """
+    if formula is not None and not utils.validate_formula(formula):
+        raise HTTPException(status_code=422, detail="Invalid formula")
+
+    # Scoring runs on the compute executor, the COPY is awaited on the loop
+    batch = await _compute(_score_companies, payload, formula)
+    companies = batch.companies
+    stored = await crud.financial.aingest(
+        db,
+        country_iso_codes=[
+            companies[group].country_iso_code for group in batch.groups.tolist()
+        ],
+        company_ids=[companies[group].id for group in batch.groups.tolist()],
+        columns=batch.columns,
+        zscores=batch.zscores,
+        coeffecients=[
+            f"{name}:{batch.coeffecients.digest}" for name in batch.formulas.tolist()
+        ],
+    )
+    return ORJSONResponse(dict(stored=stored, errors=batch.errors))
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[Optional[bytes]]:
+    # Lines longer than `STREAM_LINE_SIZE` are dropped while they are read, and
+    # yielded as `None`, so a body without newlines doesn't fill the memory
+    buffer = b""
+    dropping = False
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield None if dropping or len(line) > STREAM_LINE_SIZE else line
+            dropping = False
+        if len(buffer) > STREAM_LINE_SIZE:
+            buffer = b""
+            dropping = True
+    if dropping:
+        yield None
+    elif buffer:
+        yield buffer
+
+
+def _score_chunk(
+    lines: List[Tuple[int, Optional[bytes]]], formula: Optional[str]
+) -> bytes:
+    # Records and errors are kept apart, by their position in the chunk
+    records: List[schemas.FinancialRecord] = []
+    positions: List[int] = []
+    errors: Dict[int, str] = {}
+    for position, (_, line) in enumerate(lines):
+        if line is None:
+            errors[position] = "Line too long"
+            continue
+        try:
+            records.append(schemas.FinancialRecord.parse_raw(line))
+            positions.append(position)
+        except ValidationError:
+            errors[position] = "Invalid financial record"
+
+    # Records of the whole chunk are validated with one mask per check
+    columns = scoring.financials_to_columns(records)
+    ids = scoring.country_ids([record.country_iso_code for record in records])
+    formulas = np.asarray(
+        [
+            utils.get_zscore_formula(record.country_iso_code, formula)
+            for record in records
+        ],
+        dtype=str,
+    )
+    groups = np.asarray(
+        [f"{cid}/{record.id}" for cid, record in zip(ids.tolist(), records)],
+        dtype=str,
+    )
+    row_errors = scoring.validate_rows(
+        columns,
+        formulas,
+        country_ids=ids,
+        company_ids=[record.id for record in records],
+        groups=groups,
+    )
+    invalid = scoring.invalid_rows(row_errors, len(records))
+    for row in np.flatnonzero(invalid).tolist():
+        errors[positions[row]] = "; ".join(scoring.error_details(row_errors, row))
+
+    output: List[bytes] = [b""] * len(lines)
+    for position, detail in errors.items():
+        output[position] = render_json({"line": lines[position][0], "detail": detail})
+    keep = ~invalid
+    if keep.any():
+        zscores = scoring.calc_zscores(
+            {field: values[keep] for field, values in columns.items()},
+            ids[keep],
+            formulas=formulas[keep],
+            groups=groups[keep],
+        )
+        zones = scoring.calc_zones(zscores, formulas[keep])
+        for row, zscore, code in zip(
+            np.flatnonzero(keep).tolist(), zscores.tolist(), zones.tolist()
+        ):
+            record = records[row]
+            output[positions[row]] = render_json(
+                {
+                    "country_iso_code": record.country_iso_code,
+                    "id": record.id,
+                    "year": record.year,
+                    "zscore": zscore,
+                    "zone": scoring.zone_name(code),
+                }
+            )
+    output.append(b"")
+    return b"\n".join(output)
+
+
+async def _stream_chunk(
+    lines: List[Tuple[int, Optional[bytes]]], formula: Optional[str]
+) -> bytes:
+    # The response has started by the time a chunk is scored, so a full
+    # executor can't be answered with 503: the stream waits for a slot, which
+    # stops reading the request body until then
+    return await compute_executor.run(_score_chunk, lines, formula, wait=True)
+
+
+async def _score_ndjson(
+    request: Request, formula: Optional[str]
+) -> AsyncIterator[bytes]:
+    lines: List[Tuple[int, Optional[bytes]]] = []
+    number = 0
+    async for line in _iter_lines(request):
+        number += 1
+        if line is not None and not line.strip():
+            continue
+        lines.append((number, line))
+        if len(lines) == STREAM_CHUNK_SIZE:
+            yield await _stream_chunk(lines, formula)
+            lines = []
+    if lines:
+        yield await _stream_chunk(lines, formula)
+
+
+@router.put(
+    "/stream",
+    name="Streaming Company Z-Scores",
+    summary="Calcuation of Z-Scores for a newline-delimited JSON stream of financials.",
+    description="Read one financial record per line, each with its `country_iso_code` \
+             and `id`, and write one Z-Score per line back while the request body is \
+             still being read. Records are scored in chunks, so memory stays flat \
+             regardless of the size of the stream. Invalid records, and lines over \
+             64 KiB, are reported in place with their line number.",
+    response_description="One z-score or error per line",
+    response_class=NDJSONStreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/x-ndjson": {
+                    "schema": schemas.FinancialRecord.schema(
+                        ref_template="#/components/schemas/{model}"
+                    )
+                }
+            },
+            "required": True,
+        }
+    },
+    responses={
+        200: {
+            "content": {
+                "application/x-ndjson": {
+                    "example": '{"country_iso_code": "gb", "id": "10149809", '
+                    '"year": 2020, "zscore": 6.539547842049954, "zone": "safe"}\n'
+                    '{"line": 2, "detail": "Invalid country code"}\n'
+                }
+            }
+        },
+    },
+)
+async def stream_financial_scores(
+    request: Request,
+    formula: Optional[str] = Query(None, description=FORMULA_DESCRIPTION),
+) -> Any:
+    """
+    Get Z-scores for a stream of financial records
+
+    Args:
+        request (Request): NDJSON financial records, one per line
+        formula (str): z-score formula of every record
+    """
+    if formula is not None and not utils.validate_formula(formula):
+        raise HTTPException(status_code=422, detail="Invalid formula")
+
+    return NDJSONStreamingResponse(_score_ndjson(request, formula))
+
+
+@router.get("/cache", response_model=schemas.CacheStats)
+def read_cache_stats(
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Retrieve hit and miss counters of the company Z-score cache.
+    """
+    return zscore_cache.stats()
@@ -1,99 +1,184 @@
-from typing import Any, List
+from typing import Any, List, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps
+from app.api.pagination import Pagination, paginated_response, pagination
+from app.api.responses import ORJSONResponse, model_fields
+from app.db.base_class import MAX_KEY
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[schemas.Item])
-def read_items(
-    db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+@router.get("/", response_model=List[schemas.Item], response_class=ORJSONResponse)
+async def read_items(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
+    page: Pagination = Depends(pagination),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve items.
+    Retrieve items, the next page is linked in the `Link` header.
     """
-    if crud.user.is_superuser(current_user):
-        items = crud.item.get_multi(db, skip=skip, limit=limit)
+    next_key = None
+    if page.skip is not None:
+        if crud.user.is_superuser(current_user):
+            items = await crud.item.aget_multi(db, skip=page.skip, limit=page.limit)
+        else:
+            items = await crud.item.aget_multi_by_owner(
+                db=db, owner_id=current_user.id, skip=page.skip, limit=page.limit
+            )
+    elif crud.user.is_superuser(current_user):
+        items, next_key = await crud.item.aget_page(
+            db, after=page.after, limit=page.limit
+        )
     else:
-        items = crud.item.get_multi_by_owner(
-            db=db, owner_id=current_user.id, skip=skip, limit=limit
+        items, next_key = await crud.item.aget_page_by_owner(
+            db=db, owner_id=current_user.id, after=page.after, limit=page.limit
         )
-    return items
+    return paginated_response(
+        request, [model_fields(schemas.Item, item) for item in items], next_key
+    )
 
 
-@router.post("/", response_model=schemas.Item)
-def create_item(
+@router.post("/", response_model=schemas.Item, response_class=ORJSONResponse)
+async def create_item(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     item_in: schemas.ItemCreate,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Create new item.
     """
-    item = crud.item.create_with_owner(db=db, obj_in=item_in, owner_id=current_user.id)
-    return item
+    item = await crud.item.acreate_with_owner(
+        db=db, obj_in=item_in, owner_id=current_user.id
+    )
+    return ORJSONResponse(model_fields(schemas.Item, item))
+
+
+async def _check_owner(
+    db: AsyncSession, *, ids: Sequence[int], current_user: models.User
+) -> None:
+    # One query for the items of a bulk request
+    owners = await crud.item.aget_owners(db, ids=ids)
+    if len(owners) != len(set(ids)):
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not crud.user.is_superuser(current_user) and any(
+        owner_id != current_user.id for owner_id in owners.values()
+    ):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+
+
+@router.post("/bulk", response_model=List[schemas.Item], response_class=ORJSONResponse)
+async def create_items(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    items_in: List[schemas.ItemCreate],
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Create new items in one transaction.
+    """
+    items = await crud.item.acreate_many_with_owner(
+        db=db, objs_in=items_in, owner_id=current_user.id
+    )
+    return ORJSONResponse([model_fields(schemas.Item, item) for item in items])
+
+
+@router.put("/bulk", response_model=List[schemas.Item], response_class=ORJSONResponse)
+async def update_items(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    items_in: List[schemas.ItemBulkUpdate],
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Update items in one transaction, each by its id.
+    """
+    ids = [item_in.id for item_in in items_in]
+    await _check_owner(db, ids=ids, current_user=current_user)
+    items = await crud.item.aupdate_many(
+        db=db,
+        objs_in={
+            item_in.id: item_in.dict(exclude_unset=True, exclude={"id"})
+            for item_in in items_in
+        },
+    )
+    return ORJSONResponse([model_fields(schemas.Item, item) for item in items])
+
+
+@router.delete(
+    "/bulk", response_model=List[schemas.Item], response_class=ORJSONResponse
+)
+async def delete_items(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    ids: List[int] = Query(..., alias="id", ge=0, le=MAX_KEY),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Delete items in one transaction.
+    """
+    await _check_owner(db, ids=ids, current_user=current_user)
+    items = await crud.item.aremove_many(db=db, ids=ids)
+    return ORJSONResponse([model_fields(schemas.Item, item) for item in items])
 
 
-@router.put("/{id}", response_model=schemas.Item)
-def update_item(
+@router.put("/{id}", response_model=schemas.Item, response_class=ORJSONResponse)
+async def update_item(
     *,
-    db: Session = Depends(deps.get_db),
-    id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    id: int = Path(..., ge=0, le=MAX_KEY),
     item_in: schemas.ItemUpdate,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Update an item.
     """
-    item = crud.item.get(db=db, id=id)
+    item = await crud.item.aget(db=db, id=id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not crud.user.is_superuser(current_user) and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    item = crud.item.update(db=db, db_obj=item, obj_in=item_in)
-    return item
+    item = await crud.item.aupdate(db=db, db_obj=item, obj_in=item_in)
+    return ORJSONResponse(model_fields(schemas.Item, item))
 
 
-@router.get("/{id}", response_model=schemas.Item)
-def read_item(
+@router.get("/{id}", response_model=schemas.Item, response_class=ORJSONResponse)
+async def read_item(
     *,
-    db: Session = Depends(deps.get_db),
-    id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    id: int = Path(..., ge=0, le=MAX_KEY),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get item by ID.
     """
-    item = crud.item.get(db=db, id=id)
+    item = await crud.item.aget(db=db, id=id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not crud.user.is_superuser(current_user) and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    return item
+    return ORJSONResponse(model_fields(schemas.Item, item))
 
 
-@router.delete("/{id}", response_model=schemas.Item)
-def delete_item(
+@router.delete("/{id}", response_model=schemas.Item, response_class=ORJSONResponse)
+async def delete_item(
     *,
-    db: Session = Depends(deps.get_db),
-    id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    id: int = Path(..., ge=0, le=MAX_KEY),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Delete an item.
     """
-    item = crud.item.get(db=db, id=id)
+    item = await crud.item.aget(db=db, id=id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not crud.user.is_superuser(current_user) and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    item = crud.item.remove(db=db, id=id)
-    return item
+    item = await crud.item.aremove(db=db, id=id)
+    return ORJSONResponse(model_fields(schemas.Item, item))
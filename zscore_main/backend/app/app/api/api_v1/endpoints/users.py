@@ -1,60 +1,75 @@
 from typing import Any, List
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Path, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.encoders import jsonable_encoder
 from pydantic.networks import EmailStr
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps
+from app.api.pagination import Pagination, paginated_response, pagination
+from app.api.responses import ORJSONResponse, model_fields
 from app.core.config import settings
+from app.db.base_class import MAX_KEY
 from app.utils import send_new_account_email
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[schemas.User])
-def read_users(
-    db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+@router.get("/", response_model=List[schemas.User], response_class=ORJSONResponse)
+async def read_users(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
+    page: Pagination = Depends(pagination),
     current_user: models.User = Depends(deps.get_current_active_superuser),
 ) -> Any:
     """
-    Retrieve users.
+    Retrieve users, the next page is linked in the `Link` header.
     """
-    users = crud.user.get_multi(db, skip=skip, limit=limit)
-    return users
+    next_key = None
+    if page.skip is not None:
+        users = await crud.user.aget_multi(db, skip=page.skip, limit=page.limit)
+    else:
+        users, next_key = await crud.user.aget_page(
+            db, after=page.after, limit=page.limit
+        )
+    return paginated_response(
+        request, [model_fields(schemas.User, user) for user in users], next_key
+    )
 
 
-@router.post("/", response_model=schemas.User)
-def create_user(
+@router.post("/", response_model=schemas.User, response_class=ORJSONResponse)
+async def create_user(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     user_in: schemas.UserCreate,
     current_user: models.User = Depends(deps.get_current_active_superuser),
 ) -> Any:
     """
     Create new user.
     """
-    user = crud.user.get_by_email(db, email=user_in.email)
+    user = await crud.user.aget_by_email(db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=400,
             detail="The user with this username already exists in the system.",
         )
-    user = crud.user.create(db, obj_in=user_in)
+    user = await crud.user.acreate(db, obj_in=user_in)
     if settings.EMAILS_ENABLED and user_in.email:
-        send_new_account_email(
-            email_to=user_in.email, username=user_in.email, password=user_in.password
+        await run_in_threadpool(
+            send_new_account_email,
+            email_to=user_in.email,
+            username=user_in.email,
+            password=user_in.password,
         )
-    return user
+    return ORJSONResponse(model_fields(schemas.User, user))
 
 
-@router.put("/me", response_model=schemas.User)
-def update_user_me(
+@router.put("/me", response_model=schemas.User, response_class=ORJSONResponse)
+async def update_user_me(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     password: str = Body(None),
     full_name: str = Body(None),
     email: EmailStr = Body(None),
@@ -71,25 +86,25 @@ def update_user_me(
         user_in.full_name = full_name
     if email is not None:
         user_in.email = email
-    user = crud.user.update(db, db_obj=current_user, obj_in=user_in)
-    return user
+    user = await crud.user.aupdate(db, db_obj=current_user, obj_in=user_in)
+    return ORJSONResponse(model_fields(schemas.User, user))
 
 
-@router.get("/me", response_model=schemas.User)
-def read_user_me(
-    db: Session = Depends(deps.get_db),
+@router.get("/me", response_model=schemas.User, response_class=ORJSONResponse)
+async def read_user_me(
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get current user.
     """
-    return current_user
+    return ORJSONResponse(model_fields(schemas.User, current_user))
 
 
-@router.post("/open", response_model=schemas.User)
-def create_user_open(
+@router.post("/open", response_model=schemas.User, response_class=ORJSONResponse)
+async def create_user_open(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     password: str = Body(...),
     email: EmailStr = Body(...),
     full_name: str = Body(None),
@@ -102,52 +117,52 @@ def create_user_open(
             status_code=403,
             detail="Open user registration is forbidden on this server",
         )
-    user = crud.user.get_by_email(db, email=email)
+    user = await crud.user.aget_by_email(db, email=email)
     if user:
         raise HTTPException(
             status_code=400,
             detail="The user with this username already exists in the system",
         )
     user_in = schemas.UserCreate(password=password, email=email, full_name=full_name)
-    user = crud.user.create(db, obj_in=user_in)
-    return user
+    user = await crud.user.acreate(db, obj_in=user_in)
+    return ORJSONResponse(model_fields(schemas.User, user))
 
 
-@router.get("/{user_id}", response_model=schemas.User)
-def read_user_by_id(
-    user_id: int,
+@router.get("/{user_id}", response_model=schemas.User, response_class=ORJSONResponse)
+async def read_user_by_id(
+    user_id: int = Path(..., ge=0, le=MAX_KEY),
     current_user: models.User = Depends(deps.get_current_active_user),
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
 ) -> Any:
     """
     Get a specific user by id.
     """
-    user = crud.user.get(db, id=user_id)
+    user = await crud.user.aget(db, id=user_id)
     if user == current_user:
-        return user
+        return ORJSONResponse(model_fields(schemas.User, user))
     if not crud.user.is_superuser(current_user):
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
         )
-    return user
+    return ORJSONResponse(model_fields(schemas.User, user))
 
 
-@router.put("/{user_id}", response_model=schemas.User)
-def update_user(
+@router.put("/{user_id}", response_model=schemas.User, response_class=ORJSONResponse)
+async def update_user(
     *,
-    db: Session = Depends(deps.get_db),
-    user_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    user_id: int = Path(..., ge=0, le=MAX_KEY),
     user_in: schemas.UserUpdate,
     current_user: models.User = Depends(deps.get_current_active_superuser),
 ) -> Any:
     """
     Update a user.
     """
-    user = crud.user.get(db, id=user_id)
+    user = await crud.user.aget(db, id=user_id)
     if not user:
         raise HTTPException(
             status_code=404,
             detail="The user with this username does not exist in the system",
         )
-    user = crud.user.update(db, db_obj=user, obj_in=user_in)
-    return user
+    user = await crud.user.aupdate(db, db_obj=user, obj_in=user_in)
+    return ORJSONResponse(model_fields(schemas.User, user))
@@ -0,0 +1,240 @@
+import zlib
+from typing import Dict, Optional, Union
+
+import brotli
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+BROTLI = "br"
+GZIP = "gzip"
+# Brotli is picked when the client accepts both equally
+ENCODINGS = (BROTLI, GZIP)
+
+# Complete bodies from this size up are compressed in the threadpool, zlib and
+# brotli release the GIL
+THREADPOOL_MIN_SIZE = 1 << 20
+
+
+def header_qualities(header: Optional[str]) -> Dict[str, float]:
+    """
+    Parse an `Accept` or `Accept-Encoding` header.
+
+    Args:
+        header (str): header value
+
+    Returns:
+        Dict[str, float]: quality per each lowercase media type or encoding
+    """
+    qualities: Dict[str, float] = {}
+    for entry in (header or "").split(","):
+        token, *params = entry.split(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[token] = max(qualities.get(token, 0.0), quality)
+    return qualities
+
+
+def preferred_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick brotli or gzip for the `Accept-Encoding` header of a request.
+
+    Args:
+        accept_encoding (str): accept-encoding header
+
+    Returns:
+        str: `BROTLI` or `GZIP`, None when the client accepts neither
+    """
+    qualities = header_qualities(accept_encoding)
+    wildcard = qualities.get("*", 0.0)
+    encoding, best = None, 0.0
+    for candidate in ENCODINGS:
+        quality = qualities.get(candidate, wildcard)
+        if quality > best:
+            encoding, best = candidate, quality
+    return encoding
+
+
+class GzipEncoder:
+    def __init__(self, level: int = 6) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        # Everything compressed so far can be decompressed by the client
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int = 4) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+Encoder = Union[GzipEncoder, BrotliEncoder]
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip, as negotiated with the
+    `Accept-Encoding` header of the request.
+
+    Complete responses smaller than `minimum_size` are sent as is, compressing
+    them costs more CPU than it saves. Streaming responses are always
+    compressed, each chunk flushed so that the client can decode it as soon as
+    it arrives. Responses with a `Content-Encoding` of their own are left
+    alone.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def encoder(self, encoding: str) -> Encoder:
+        if encoding == BROTLI:
+            return BrotliEncoder(self.brotli_quality)
+        return GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = preferred_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(
+        self, middleware: CompressionMiddleware, encoding: str, send: Send
+    ) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Optional[Message] = None
+        self.encoder: Optional[Encoder] = None
+        self.identity = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk tells whether to compress
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.identity:
+            await self._send(message)
+            return
+
+        assert self.start is not None
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is None:
+            headers = MutableHeaders(raw=self.start["headers"])
+            if "content-encoding" in headers or (
+                not more_body and len(body) < self.middleware.minimum_size
+            ):
+                self.identity = True
+                await self._send(self.start)
+                await self._send(message)
+                return
+
+            self.encoder = self.middleware.encoder(self.encoding)
+            headers["content-encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body:
+                if len(body) >= THREADPOOL_MIN_SIZE:
+                    body = await run_in_threadpool(self._compress, body)
+                else:
+                    body = self._compress(body)
+                headers["content-length"] = str(len(body))
+                await self._send(self.start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            if "content-length" in headers:
+                del headers["content-length"]
+            await self._send(self.start)
+
+        if more_body:
+            body = self.encoder.compress(body) + self.encoder.flush()
+        else:
+            body = self.encoder.compress(body) + self.encoder.finish()
+        await self._send(
+            {"type": "http.response.body", "body": body, "more_body": more_body}
+        )
+
+    def _compress(self, body: bytes) -> bytes:
+        assert self.encoder is not None
+        return self.encoder.compress(body) + self.encoder.finish()
+
+
+def decompress_receive(receive: Receive, max_size: int) -> Receive:
+    """
+    Wrap the `receive` of a request with a gzip body, decompressing the body
+    chunk by chunk as it is read.
+
+    Args:
+        receive (Receive): receive of the request
+        max_size (int): size in bytes of the largest decompressed body, larger
+            bodies are answered with 413
+
+    Returns:
+        Receive: receive of the decompressed body
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    size = 0
+
+    async def wrapped() -> Message:
+        nonlocal size
+        message = await receive()
+        if message["type"] != "http.request":
+            return message
+        try:
+            # One byte over the limit is enough to tell the body is too large
+            body = decompressor.decompress(
+                message.get("body", b""), max_size - size + 1
+            )
+            if not message.get("more_body", False) and len(body) <= max_size - size:
+                body += decompressor.flush()
+                if not decompressor.eof:
+                    raise zlib.error("Truncated body")
+        except zlib.error:
+            raise HTTPException(status_code=400, detail="Invalid gzip body")
+        size += len(body)
+        if size > max_size:
+            raise HTTPException(status_code=413, detail="Request body too large")
+        return {**message, "body": body}
+
+    return wrapped
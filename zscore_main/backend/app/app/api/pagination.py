@@ -0,0 +1,92 @@
+import base64
+import binascii
+from typing import Any, NamedTuple, Optional
+
+import orjson
+from fastapi import HTTPException, Query, Request
+
+from app.api.responses import ORJSONResponse
+from app.db.base_class import MAX_KEY
+
+SKIP_DESCRIPTION = "Rows to skip, for offset pagination. Slower than `cursor` \
+    on deep pages, as every skipped row is still read."
+CURSOR_DESCRIPTION = "Cursor of the page, taken from the `next` link of the \
+    previous page. Leave out `skip` and `cursor` for the first page."
+
+
+class Pagination(NamedTuple):
+    # Offset mode when `skip` is set, keyset mode otherwise
+    skip: Optional[int]
+    # Primary key of the last row of the previous page
+    after: Optional[int]
+    limit: int
+
+
+def encode_cursor(key: int) -> str:
+    """
+    Encode the primary key of the last row of a page into an opaque cursor.
+
+    Args:
+        key (int): primary key
+
+    Returns:
+        str: URL safe cursor
+    """
+    return base64.urlsafe_b64encode(orjson.dumps(key)).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decode a cursor of `encode_cursor`, or raise 400 if it is not one.
+
+    Args:
+        cursor (str): URL safe cursor
+
+    Returns:
+        int: primary key of the last row of the previous page
+    """
+    try:
+        key = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        key = None
+    if not isinstance(key, int) or isinstance(key, bool) or not 0 <= key <= MAX_KEY:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
+def pagination(
+    skip: Optional[int] = Query(None, ge=0, description=SKIP_DESCRIPTION),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    limit: int = Query(100, ge=0),
+) -> Pagination:
+    """
+    Query parameters of a list route, in offset or keyset mode.
+    """
+    if skip is not None and cursor is not None:
+        raise HTTPException(status_code=400, detail="Use either skip or cursor")
+    after = None if cursor is None else decode_cursor(cursor)
+    return Pagination(skip=skip, after=after, limit=limit)
+
+
+def paginated_response(
+    request: Request, content: Any, next_key: Optional[int] = None
+) -> ORJSONResponse:
+    """
+    Respond with a page, linking the next one when there is one.
+
+    The link is sent in the `Link` header with `rel="next"`, so the body stays
+    the list of rows it was before keyset pagination.
+
+    Args:
+        request (Request): request of the page
+        content (Any): rows of the page
+        next_key (int): primary key of the last row, if more rows follow
+
+    Returns:
+        ORJSONResponse: response
+    """
+    response = ORJSONResponse(content)
+    if next_key is not None:
+        url = request.url.include_query_params(cursor=encode_cursor(next_key))
+        response.headers["link"] = f'<{url}>; rel="next"'
+    return response
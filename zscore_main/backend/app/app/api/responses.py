@@ -0,0 +1,105 @@
+from typing import Any, Dict, Type
+
+import msgpack
+import numpy as np
+import orjson
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+# NumPy scalars and arrays are serialized natively, without `tolist()`
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _msgpack_default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Type is not MessagePack serializable: {type(obj).__name__}")
+
+
+def render_json(content: Any) -> bytes:
+    """
+    Serialize content to compact UTF-8 JSON with orjson.
+
+    Pydantic models are serialized with `dict()`, and non-finite floats as
+    `null`.
+    """
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+def render_msgpack(content: Any) -> bytes:
+    """
+    Serialize content to MessagePack, with the same types as `render_json`.
+
+    Unlike JSON, MessagePack has non-finite floats, so they are kept.
+    """
+    return msgpack.packb(content, default=_msgpack_default)
+
+
+def model_fields(model: Type[BaseModel], obj: Any) -> Dict[str, Any]:
+    """
+    Read the fields of a response model off a trusted object, such as an ORM
+    row, without validating them.
+
+    Args:
+        model (Type[BaseModel]): response model
+        obj (Any): object with an attribute per each field of the model
+
+    Returns:
+        Dict[str, Any]: value per each field of the model
+    """
+    return {name: getattr(obj, name) for name in model.__fields__}
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response serialized with orjson.
+
+    Returning it from an endpoint skips the validation of the content against
+    the `response_model` of the route, which is then only used for the
+    OpenAPI schema. Only return content built by the app itself, with the
+    fields of the response model.
+    """
+
+    def render(self, content: Any) -> bytes:
+        # Kept to render the content again in another format, see `MsgPackRoute`
+        self.content = content
+        return render_json(content)
+
+
+class MsgPackResponse(Response):
+    """
+    MessagePack response, rendering the same content as `ORJSONResponse`.
+    """
+
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return render_msgpack(content)
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Newline-delimited JSON response streamed while the request body is read.
+
+    `StreamingResponse` listens for the client disconnect on `receive`, which
+    would consume the request body chunks the endpoint is still reading. Here
+    the body iterator owns `receive`: a disconnect surfaces as
+    `ClientDisconnect` from `Request.stream()` instead.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,143 @@
+from typing import Any, Callable, Coroutine, Optional
+
+import msgpack
+import orjson
+from fastapi import HTTPException, Request, Response
+from fastapi.routing import APIRoute
+
+from app.api.compression import GZIP, decompress_receive, header_qualities
+from app.api.responses import MsgPackResponse, ORJSONResponse
+from app.core.config import settings
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def _media_type(content_type: Optional[str]) -> str:
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
+
+def preferred_media_type(accept: Optional[str]) -> str:
+    """
+    Pick JSON or MessagePack for the `Accept` header of a request.
+
+    JSON is picked when it is preferred at least as much as MessagePack, and
+    when the header asks for neither.
+
+    Args:
+        accept (str): accept header
+
+    Returns:
+        str: `JSON_MEDIA_TYPE`, or the first of `MSGPACK_MEDIA_TYPES`
+    """
+    json_quality = msgpack_quality = 0.0
+    for media_type, quality in header_qualities(accept).items():
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif media_type in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            json_quality = max(json_quality, quality)
+
+    if msgpack_quality > json_quality:
+        return MSGPACK_MEDIA_TYPES[0]
+    return JSON_MEDIA_TYPE
+
+
+class MsgPackRequest(Request):
+    """
+    Request with a MessagePack body, decoded wherever FastAPI reads the JSON
+    body, so both formats share the same validation.
+    """
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = msgpack.unpackb(await self.body())
+        return self._json
+
+
+class DecompressingRoute(APIRoute):
+    """
+    Route accepting gzip request bodies, as announced by `Content-Encoding`.
+
+    The body is decompressed while it is read, so streaming endpoints get it
+    chunk by chunk too.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            encoding = request.headers.get("content-encoding", "").strip().lower()
+            if encoding in ("", "identity"):
+                return await handler(request)
+            if encoding != GZIP:
+                raise HTTPException(
+                    status_code=415, detail="Unsupported content encoding"
+                )
+
+            # The request class is kept, e.g. `MsgPackRequest`
+            scope = dict(request.scope)
+            scope["headers"] = [
+                (name, value)
+                for name, value in request.scope["headers"]
+                if name not in (b"content-encoding", b"content-length")
+            ]
+            request = type(request)(
+                scope,
+                decompress_receive(
+                    request.receive, settings.MAX_DECOMPRESSED_BODY_SIZE
+                ),
+            )
+            return await handler(request)
+
+        return route_handler
+
+
+class MsgPackRoute(DecompressingRoute):
+    """
+    Route accepting MessagePack request bodies and returning MessagePack
+    responses when the `Accept` header prefers them. JSON stays the default.
+    Request bodies may be gzip compressed, see `DecompressingRoute`.
+
+    Only JSON responses are converted: error responses raised as exceptions
+    and other media types, such as NDJSON streams, are returned as is.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if _media_type(request.headers.get("content-type")) in MSGPACK_MEDIA_TYPES:
+                # FastAPI only reads JSON bodies, so the body is announced as
+                # JSON and decoded from MessagePack by the request
+                scope = dict(request.scope)
+                scope["headers"] = [
+                    (name, value)
+                    for name, value in request.scope["headers"]
+                    if name != b"content-type"
+                ] + [(b"content-type", JSON_MEDIA_TYPE.encode())]
+                request = MsgPackRequest(scope, request.receive)
+
+            response = await handler(request)
+            if preferred_media_type(request.headers.get("accept")) == JSON_MEDIA_TYPE:
+                return response
+            if _media_type(response.media_type) != JSON_MEDIA_TYPE:
+                return response
+
+            if isinstance(response, ORJSONResponse) and hasattr(response, "content"):
+                content = response.content
+            else:
+                content = orjson.loads(response.body)
+            headers = {
+                name.decode("latin-1"): value.decode("latin-1")
+                for name, value in response.raw_headers
+                if name not in (b"content-length", b"content-type")
+            }
+            headers["vary"] = "Accept"
+            return MsgPackResponse(
+                content,
+                status_code=response.status_code,
+                headers=headers,
+                background=response.background,
+            )
+
+        return route_handler
@@ -51,6 +51,20 @@ class Settings(BaseSettings):
             path=f"/{values.get('POSTGRES_DB') or ''}",
         )
 
+    # The same database through asyncpg, for the async sessions
+    ASYNC_SQLALCHEMY_DATABASE_URI: Optional[str] = None
+
+    @validator("ASYNC_SQLALCHEMY_DATABASE_URI", pre=True)
+    def assemble_async_db_connection(
+        cls, v: Optional[str], values: Dict[str, Any]
+    ) -> Any:
+        if isinstance(v, str):
+            return v
+        scheme, _, rest = str(values.get("SQLALCHEMY_DATABASE_URI") or "").partition(
+            "://"
+        )
+        return f"{scheme.split('+')[0]}+asyncpg://{rest}"
+
     SMTP_TLS: bool = True
     SMTP_PORT: Optional[int] = None
     SMTP_HOST: Optional[str] = None
@@ -82,6 +96,37 @@ class Settings(BaseSettings):
     FIRST_SUPERUSER_PASSWORD: str
     USERS_OPEN_REGISTRATION: bool = False
 
+    # JSON file of Z-score coeffecients, shared by all workers
+    ZSCORE_COEFFECIENTS_FILE: Optional[str] = None
+    ZSCORE_COEFFECIENTS_CHECK_INTERVAL: float = 5.0
+    # Z-score formula per country code, e.g. '{"br": "z_emerging_markets"}'
+    ZSCORE_COUNTRY_FORMULAS: Dict[str, str] = {}
+
+    # Company Z-score responses cached per country and financials
+    ZSCORE_CACHE_SIZE: int = 10000
+    ZSCORE_CACHE_TTL: float = 60 * 60
+
+    # Seconds before the sorted scores of a country and year cohort are reloaded
+    ZSCORE_COHORT_TTL: float = 60
+
+    # Upper bound of the Monte Carlo samples per company year
+    ZSCORE_SIMULATION_MAX_SAMPLES: int = 100000
+
+    # Threads scoring bulk requests, one per CPU by default, and the requests
+    # that may wait for one before the endpoints answer 503
+    ZSCORE_EXECUTOR_WORKERS: Optional[int] = None
+    ZSCORE_EXECUTOR_QUEUE: int = 64
+
+    # Responses are compressed from this size in bytes up, streaming responses
+    # always are
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Largest gzip request body once decompressed, in bytes, larger bodies are
+    # answered with 413
+    MAX_DECOMPRESSED_BODY_SIZE: int = 64 * 1024 * 1024
+
     class Config:
         case_sensitive = True
 
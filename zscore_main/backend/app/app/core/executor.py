@@ -0,0 +1,156 @@
+import asyncio
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+
+ResultType = TypeVar("ResultType")
+
+
+class ExecutorBusy(Exception):
+    """
+    The queue of a `BoundedExecutor` is full.
+    """
+
+
+class BoundedExecutor:
+    """
+    Thread pool for the CPU-heavy work of async endpoints, with a bounded queue.
+
+    At most `max_workers` calls run at once and `max_pending` more wait for a
+    worker. Further calls fail with `ExecutorBusy` right away instead of
+    queueing without bound, or wait on the event loop for a call to end when
+    run with `wait`. NumPy releases the GIL in its kernels, so the calls do
+    run in parallel.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 64):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # Running and waiting calls
+        self._pending = 0
+        # Callers waiting for a slot, woken one per ended call
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    def configure(
+        self, *, max_workers: Optional[int] = None, max_pending: Optional[int] = None
+    ) -> None:
+        if max_workers is not None:
+            self.max_workers = max_workers
+        if max_pending is not None:
+            self.max_pending = max_pending
+        self.shutdown(wait=False)
+
+    def _done(self, future: Future) -> None:
+        # Released when the call ends, even if its caller was cancelled
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+        self._wake_next()
+
+    def _wake_next(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                return
+            loop, waiter = self._waiters.popleft()
+        try:
+            loop.call_soon_threadsafe(self._wake, waiter)
+        except RuntimeError:
+            # The loop of the waiter is closed, the slot goes to the next one
+            self._wake_next()
+
+    def _wake(self, waiter: asyncio.Future) -> None:
+        # A waiter cancelled in the meantime passes the slot on
+        if waiter.done():
+            self._wake_next()
+        else:
+            waiter.set_result(None)
+
+    def _submit(self, func: Callable[..., ResultType], *args: Any) -> Optional[Future]:
+        # Called with the lock held, `None` if the queue is full
+        if self._pending >= self.max_workers + self.max_pending:
+            return None
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="compute"
+            )
+        future = self._pool.submit(func, *args)
+        self._pending += 1
+        return future
+
+    def submit(self, func: Callable[..., ResultType], *args: Any) -> Future:
+        """
+        Submit a call, or raise `ExecutorBusy` if the queue is full.
+        """
+        with self._lock:
+            future = self._submit(func, *args)
+            if future is None:
+                self.rejected += 1
+                raise ExecutorBusy(f"{self._pending} calls pending")
+        future.add_done_callback(self._done)
+        return future
+
+    async def run(
+        self, func: Callable[..., ResultType], *args: Any, wait: bool = False
+    ) -> ResultType:
+        """
+        Run a call in the pool and await its result.
+
+        With `wait`, a full queue makes the caller wait for a call to end
+        instead of raising `ExecutorBusy`.
+        """
+        if not wait:
+            return await asyncio.wrap_future(self.submit(func, *args))
+
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                future = self._submit(func, *args)
+                if future is None:
+                    waiter = loop.create_future()
+                    self._waiters.append((loop, waiter))
+            if future is not None:
+                break
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    woken = (loop, waiter) not in self._waiters
+                    if not woken:
+                        self._waiters.remove((loop, waiter))
+                # Woken just before the cancellation, the slot goes to the next
+                if woken and not waiter.cancelled():
+                    self._wake_next()
+                raise
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "waiting": len(self._waiters),
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+# CPU-heavy bulk scoring of the async company endpoints
+compute_executor = BoundedExecutor(
+    max_workers=settings.ZSCORE_EXECUTOR_WORKERS,
+    max_pending=settings.ZSCORE_EXECUTOR_QUEUE,
+)
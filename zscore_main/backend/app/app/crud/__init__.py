@@ -1,3 +1,4 @@
+from .crud_financial import financial
 from .crud_item import item
 from .crud_user import user
 
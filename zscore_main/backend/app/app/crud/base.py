@@ -1,8 +1,27 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Generic,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import column, delete, insert, inspect, select, update, values
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 
 from app.db.base_class import Base
 
@@ -10,6 +29,14 @@ ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Rows per statement of the bulk writes, far below the bind parameter limit
+BULK_CHUNK_SIZE = 1000
+
+
+def _chunks(rows: Sequence[Any]) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        yield rows[start : start + BULK_CHUNK_SIZE]
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
@@ -22,6 +49,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         * `schema`: A Pydantic model (schema) class
         """
         self.model = model
+        self.table = model.__table__
+        # Attribute per each column, read and written without the ORM
+        self.columns = {
+            attr.key: attr.columns[0] for attr in model.__mapper__.column_attrs
+        }
 
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
         return db.query(self.model).filter(self.model.id == id).first()
@@ -31,12 +63,44 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     ) -> List[ModelType]:
         return db.query(self.model).offset(skip).limit(limit).all()
 
+    def get_page(
+        self, db: Session, *, after: Optional[int] = None, limit: int = 100
+    ) -> Tuple[List[ModelType], Optional[int]]:
+        """
+        Read a page of rows in primary key order, after the key of the last
+        row of the previous page.
+
+        Unlike `get_multi`, deep pages cost the same as the first one, as the
+        rows before the page are skipped with the primary key index.
+
+        **Parameters**
+
+        * `after`: Primary key of the last row of the previous page, none for
+          the first page
+        * `limit`: Rows per page
+
+        **Returns**
+
+        The rows of the page, and the primary key of its last row if more rows
+        follow
+        """
+        return self._page(db.query(self.model), after=after, limit=limit)
+
+    def _page(
+        self, query: Query, *, after: Optional[int], limit: int
+    ) -> Tuple[List[ModelType], Optional[int]]:
+        key = self.model.id
+        if after is not None:
+            query = query.filter(key > after)
+        # One row more than the page tells whether another page follows
+        rows = query.order_by(key).limit(limit + 1).all()
+        if limit and len(rows) > limit:
+            return rows[:limit], rows[limit - 1].id
+        return rows[:limit], None
+
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data)  # type: ignore
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        (db_obj,) = self._insert_many(db, [obj_in_data])
         return db_obj
 
     def update(
@@ -44,23 +108,238 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db: Session,
         *,
         db_obj: ModelType,
-        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        (key,) = self.table.primary_key
+        data = self._column_values(update_data)
+        data.pop(key.name, None)
+        if not data:
+            return db_obj
 
-    def remove(self, db: Session, *, id: int) -> ModelType:
-        obj = db.query(self.model).get(id)
-        db.delete(obj)
+        # The key is read from the identity, which never loads an expired object
+        (id,) = inspect(db_obj).identity
+        statement = (
+            update(self.table).where(key == id).values(data).returning(*self.table.c)
+        )
+        row = db.execute(statement).one()
         db.commit()
+        return self._load(db, row, obj=db_obj)
+
+    def _column_values(self, data: Mapping[str, Any]) -> Dict[str, Any]:
+        return {
+            self.columns[key].name: value
+            for key, value in data.items()
+            if key in self.columns
+        }
+
+    def _load(
+        self,
+        db: Session,
+        row: Row,
+        *,
+        obj: Optional[ModelType] = None,
+        attach: bool = True,
+    ) -> ModelType:
+        # Rows written with RETURNING become session objects without a SELECT.
+        # Only call it once committed, as the commit expires session objects.
+        data = row._mapping
+        values = {key: data[column.name] for key, column in self.columns.items()}
+        if obj is None:
+            obj = db.identity_map.get(
+                identity_key(
+                    self.model, tuple(data[c.name] for c in self.table.primary_key)
+                )
+            )
+        if obj is None:
+            obj = self.model(**values)  # type: ignore
+            make_transient_to_detached(obj)
+            if attach:
+                db.add(obj)
+        else:
+            if not attach and obj in db:
+                db.expunge(obj)
+            for key, value in values.items():
+                set_committed_value(obj, key, value)
         return obj
+
+    def create_many(
+        self, db: Session, *, objs_in: Sequence[CreateSchemaType]
+    ) -> List[ModelType]:
+        """
+        Create many rows with one `INSERT ... RETURNING` per `BULK_CHUNK_SIZE`
+        rows, in one transaction.
+
+        **Parameters**
+
+        * `objs_in`: A Pydantic model (schema) per each row
+
+        **Returns**
+
+        The created rows in the order of `objs_in`, with their generated
+        columns
+        """
+        return self._insert_many(db, [obj_in.dict() for obj_in in objs_in])
+
+    def _insert_many(
+        self, db: Session, rows: Sequence[Mapping[str, Any]]
+    ) -> List[ModelType]:
+        returned: List[Row] = []
+        for chunk in _chunks([self._column_values(row) for row in rows]):
+            # Postgres returns the rows of a multi-row VALUES in order
+            statement = insert(self.table).values(list(chunk)).returning(*self.table.c)
+            returned.extend(db.execute(statement).all())
+        db.commit()
+        return [self._load(db, row) for row in returned]
+
+    def update_many(
+        self,
+        db: Session,
+        *,
+        objs_in: Mapping[Any, Union[UpdateSchemaType, Dict[str, Any]]],
+    ) -> List[ModelType]:
+        """
+        Update many rows by primary key, in one transaction.
+
+        Rows setting the same columns are updated together, with one
+        `UPDATE ... FROM (VALUES ...) RETURNING` per `BULK_CHUNK_SIZE` rows.
+
+        **Parameters**
+
+        * `objs_in`: A Pydantic model (schema), or a dict of the columns to
+          set, per each primary key
+
+        **Returns**
+
+        The updated rows in the order of `objs_in`, leaving out missing ones
+        """
+        (key,) = self.table.primary_key
+        groups: Dict[FrozenSet[str], List[Dict[str, Any]]] = {}
+        for id, obj_in in objs_in.items():
+            if isinstance(obj_in, dict):
+                update_data = obj_in
+            else:
+                update_data = obj_in.dict(exclude_unset=True)
+            data = self._column_values(update_data)
+            data.pop(key.name, None)
+            groups.setdefault(frozenset(data), []).append({**data, key.name: id})
+
+        returned: Dict[Any, Row] = {}
+        for names, rows in groups.items():
+            if not names:
+                # Rows setting no column are read as they are
+                ids = [row[key.name] for row in rows]
+                for chunk in _chunks(ids):
+                    query = select(self.table).where(key.in_(list(chunk)))
+                    for row in db.execute(query):
+                        returned[row._mapping[key.name]] = row
+                continue
+            names_in_order = [key.name, *sorted(names)]
+            for chunk in _chunks(rows):
+                source = values(
+                    *(column(name, self.table.c[name].type) for name in names_in_order),
+                    name="source",
+                ).data([tuple(row[name] for name in names_in_order) for row in chunk])
+                statement = (
+                    update(self.table)
+                    .where(key == source.c[key.name])
+                    .values({name: source.c[name] for name in names})
+                    .returning(*self.table.c)
+                )
+                for row in db.execute(statement):
+                    returned[row._mapping[key.name]] = row
+        db.commit()
+        return [self._load(db, returned[id]) for id in objs_in if id in returned]
+
+    def remove_many(self, db: Session, *, ids: Sequence[Any]) -> List[ModelType]:
+        """
+        Delete many rows by primary key with one `DELETE ... RETURNING`, in
+        one transaction.
+
+        **Parameters**
+
+        * `ids`: Primary keys of the rows
+
+        Rows are deleted by the database: only the cascades of their foreign
+        keys apply, not those of the ORM relationships.
+
+        **Returns**
+
+        The deleted rows, detached from the session, leaving out missing ones
+        """
+        (key,) = self.table.primary_key
+        returned: List[Row] = []
+        for chunk in _chunks(list(ids)):
+            statement = (
+                delete(self.table).where(key.in_(list(chunk))).returning(*self.table.c)
+            )
+            returned.extend(db.execute(statement).all())
+        db.commit()
+        return [self._load(db, row, attach=False) for row in returned]
+
+    def remove(self, db: Session, *, id: int) -> Optional[ModelType]:
+        """
+        Delete a row by primary key with one `DELETE ... RETURNING`.
+
+        Like `remove_many`, the row is deleted by the database: only the
+        cascades of its foreign keys apply, not those of the ORM relationships.
+
+        **Returns**
+
+        The deleted row detached from the session, none if missing
+        """
+        removed = self.remove_many(db, ids=[id])
+        return removed[0] if removed else None
+
+    # Async variants, for async endpoints. Each runs its sync method with
+    # `AsyncSession.run_sync`, on the event loop: the statements are the same,
+    # and their I/O is awaited through asyncpg instead of blocking a thread.
+
+    async def aget(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        return await db.run_sync(self.get, id)
+
+    async def aget_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[ModelType]:
+        return await db.run_sync(self.get_multi, skip=skip, limit=limit)
+
+    async def aget_page(
+        self, db: AsyncSession, *, after: Optional[int] = None, limit: int = 100
+    ) -> Tuple[List[ModelType], Optional[int]]:
+        return await db.run_sync(self.get_page, after=after, limit=limit)
+
+    async def acreate(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        return await db.run_sync(self.create, obj_in=obj_in)
+
+    async def aupdate(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+    ) -> ModelType:
+        return await db.run_sync(self.update, db_obj=db_obj, obj_in=obj_in)
+
+    async def aremove(self, db: AsyncSession, *, id: int) -> Optional[ModelType]:
+        return await db.run_sync(self.remove, id=id)
+
+    async def acreate_many(
+        self, db: AsyncSession, *, objs_in: Sequence[CreateSchemaType]
+    ) -> List[ModelType]:
+        return await db.run_sync(self.create_many, objs_in=objs_in)
+
+    async def aupdate_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Mapping[Any, Union[UpdateSchemaType, Dict[str, Any]]],
+    ) -> List[ModelType]:
+        return await db.run_sync(self.update_many, objs_in=objs_in)
+
+    async def aremove_many(
+        self, db: AsyncSession, *, ids: Sequence[Any]
+    ) -> List[ModelType]:
+        return await db.run_sync(self.remove_many, ids=ids)
@@ -0,0 +1,528 @@
+import io
+import math
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+
+from app import schemas, scoring
+from app.crud.base import CRUDBase
+from app.models.company import Company
+from app.models.financial import Financial
+from app.models.score import Score
+
+STORED_FIELDS = scoring.FINANCIAL_FIELDS + scoring.EXTRA_FINANCIAL_FIELDS
+
+KEY_COLUMNS = ("country_iso_code", "company_id", "year")
+
+# Rows of a bulk ingestion are copied here first, and merged from here into
+# the company, financial and score tables
+_INGEST_TABLE = f"""
+CREATE TEMPORARY TABLE financial_ingest (
+    ordinal integer,
+    country_iso_code varchar(2),
+    company_id varchar,
+    year integer,
+    {", ".join(f"{field} double precision" for field in STORED_FIELDS)},
+    zscore double precision,
+    coeffecients varchar
+) ON COMMIT DROP
+"""
+
+_INGEST_COPY = "COPY financial_ingest FROM STDIN"
+
+_INGEST_COMPANIES = """
+INSERT INTO company (country_iso_code, company_id)
+SELECT DISTINCT country_iso_code, company_id FROM financial_ingest
+ON CONFLICT DO NOTHING
+"""
+
+# The last row of a company year wins, one upsert can't write a row twice
+_INGEST_FINANCIALS = f"""
+WITH latest AS (
+    SELECT DISTINCT ON (country_iso_code, company_id, year) *
+    FROM financial_ingest
+    ORDER BY country_iso_code, company_id, year, ordinal DESC
+), stored AS (
+    INSERT INTO financial ({", ".join(KEY_COLUMNS + STORED_FIELDS)})
+    SELECT {", ".join(KEY_COLUMNS + STORED_FIELDS)} FROM latest
+    ON CONFLICT ({", ".join(KEY_COLUMNS)}) DO UPDATE SET
+    {", ".join(f"{field} = excluded.{field}" for field in STORED_FIELDS)}
+    RETURNING id, {", ".join(KEY_COLUMNS)}
+)
+INSERT INTO score (financial_id, zscore, coeffecients)
+SELECT stored.id, latest.zscore, latest.coeffecients
+FROM stored JOIN latest USING ({", ".join(KEY_COLUMNS)})
+ON CONFLICT (financial_id) DO UPDATE SET
+zscore = excluded.zscore, coeffecients = excluded.coeffecients
+"""
+
+
+def _copy_value(value: Any) -> str:
+    # Text format of COPY, where `\N` is null
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return (
+            value.replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
+    return repr(value)
+
+
+def _ingest_rows(
+    country_iso_codes: Sequence[str],
+    company_ids: Sequence[str],
+    columns: Mapping[str, np.ndarray],
+    zscores: ArrayLike,
+    coeffecients: Sequence[str],
+) -> List[Tuple[Any, ...]]:
+    # Rows of `financial_ingest`, missing optional fields are null
+    fields = [
+        [None if math.isnan(value) else value for value in column]
+        for column in (
+            np.asarray(columns[field], dtype=np.float64).tolist()
+            for field in STORED_FIELDS
+        )
+    ]
+    rows = zip(
+        [country_iso_code.lower() for country_iso_code in country_iso_codes],
+        company_ids,
+        np.asarray(columns["year"]).tolist(),
+        *fields,
+        # Scores are never null, non-finite ones are kept as is
+        np.asarray(zscores, dtype=np.float64).tolist(),
+        coeffecients,
+    )
+    return [(ordinal, *row) for ordinal, row in enumerate(rows)]
+
+
+def _discard_cohorts(rows: Iterable[Tuple[Any, ...]]) -> None:
+    # Country iso code and year of each row of `financial_ingest`
+    for country_iso_code, year in {(row[1], row[3]) for row in rows}:
+        scoring.cohort_index.discard(country_iso_code, year)
+
+
+class CRUDFinancial(CRUDBase[Financial, schemas.Financial, schemas.Financial]):
+    def get_multi_by_company(
+        self, db: Session, *, country_iso_code: str, company_id: str
+    ) -> List[Financial]:
+        return (
+            db.query(self.model)
+            .options(joinedload(Financial.score))
+            .filter(
+                Financial.country_iso_code == country_iso_code.lower(),
+                Financial.company_id == company_id,
+            )
+            .order_by(Financial.year.desc())
+            .all()
+        )
+
+    def store_companies(self, db: Session, *, keys: Iterable[Tuple[str, str]]) -> None:
+        """
+        Create the companies missing, in one statement.
+
+        Args:
+            db (Session): session, the companies are created in its transaction
+            keys (Iterable[Tuple[str, str]]): country iso code and company id
+                per each company
+        """
+        values = [
+            {"country_iso_code": country_iso_code.lower(), "company_id": company_id}
+            for country_iso_code, company_id in set(keys)
+        ]
+        if values:
+            db.execute(insert(Company).values(values).on_conflict_do_nothing())
+
+    def get_cohort_scores(
+        self, db: Session, *, country_iso_code: str, years: Iterable[int]
+    ) -> Dict[int, List[float]]:
+        """
+        Get the stored scores of the country and year cohorts in one query.
+        """
+        rows = (
+            db.query(Financial.year, Score.zscore)
+            .join(Score, Score.financial_id == Financial.id)
+            .filter(
+                Financial.country_iso_code == country_iso_code.lower(),
+                Financial.year.in_(list(years)),
+            )
+            .all()
+        )
+        cohorts: Dict[int, List[float]] = defaultdict(list)
+        for year, zscore in rows:
+            cohorts[year].append(zscore)
+        return cohorts
+
+    def rank_scores(
+        self, db: Session, *, country_iso_code: str, scores: Sequence[schemas.ZScore]
+    ) -> List[schemas.RankedZScore]:
+        """
+        Rank scores within the stored scores of their country and year cohort.
+
+        Cohorts are read from the cohort index, and loaded into it with a
+        single query for those missing.
+        """
+        cohorts = {
+            score.year: scoring.cohort_index.get(country_iso_code, score.year)
+            for score in scores
+        }
+        missing = [year for year, cohort in cohorts.items() if cohort is None]
+        if missing:
+            stored = self.get_cohort_scores(
+                db, country_iso_code=country_iso_code, years=missing
+            )
+            for year in missing:
+                cohorts[year] = scoring.cohort_index.load(
+                    country_iso_code, year, stored.get(year, [])
+                )
+
+        ranked = []
+        for score in scores:
+            # Missing cohorts are loaded by now
+            cohort = cohorts[score.year]
+            assert cohort is not None
+            percentile = float(scoring.percentile_ranks(cohort, [score.zscore])[0])
+            ranked.append(
+                schemas.RankedZScore(
+                    **score.dict(),
+                    percentile=percentile if math.isfinite(percentile) else None,
+                )
+            )
+        return ranked
+
+    def _score_history(
+        self,
+        db: Session,
+        *,
+        country_iso_code: str,
+        company_id: str,
+        financials: Sequence[schemas.Financial],
+        coeffecients: scoring.CoeffecientTable,
+        formula: str,
+    ) -> Tuple[Dict[int, Financial], Dict[int, Any], Dict[int, float]]:
+        # Stored rows, and the rows to score with the scores they get: new or
+        # changed years as given, and stored years scored with another formula
+        # or other coeffecients. Everything is scored with a single kernel call
+        version = f"{formula}:{coeffecients.digest}"
+        stored = {
+            db_obj.year: db_obj
+            for db_obj in self.get_multi_by_company(
+                db, country_iso_code=country_iso_code, company_id=company_id
+            )
+        }
+        rescore: Dict[int, Any] = {}
+        for financial in financials:
+            db_obj = stored.get(financial.year)
+            if db_obj is None or any(
+                getattr(db_obj, field) != getattr(financial, field)
+                for field in STORED_FIELDS
+            ):
+                rescore[financial.year] = financial
+        for year, db_obj in stored.items():
+            if year not in rescore and (
+                db_obj.score is None or db_obj.score.coeffecients != version
+            ):
+                rescore[year] = db_obj
+
+        zscores: Dict[int, float] = {}
+        if rescore:
+            scored = scoring.calc_zscores(
+                # ORM rows have the fields of `schemas.Financial`
+                scoring.financials_to_columns(list(rescore.values())),
+                country_iso_code,
+                coeffecients,
+                formulas=formula,
+            )
+            zscores = dict(zip(rescore, scored.tolist()))
+        return stored, rescore, zscores
+
+    @staticmethod
+    def _history(
+        stored: Mapping[int, Financial], zscores: Mapping[int, float], formula: str
+    ) -> List[schemas.ZScore]:
+        # Score history of a company, latest year first
+        years = sorted(set(stored) | set(zscores), reverse=True)
+        history_zscores = [
+            zscores[year] if year in zscores else stored[year].score.zscore
+            for year in years
+        ]
+        zones = scoring.calc_zones(history_zscores, formula)
+        return [
+            schemas.ZScore(year=year, zscore=zscore, zone=scoring.zone_name(code))
+            for year, zscore, code in zip(years, history_zscores, zones.tolist())
+        ]
+
+    def get_history_by_company(
+        self,
+        db: Session,
+        *,
+        country_iso_code: str,
+        company_id: str,
+        coeffecients: scoring.CoeffecientTable,
+        formula: str = scoring.DEFAULT_FORMULA,
+    ) -> List[schemas.ZScore]:
+        """
+        Get the score history of a company, without writing anything.
+
+        Stored years whose score was calculated with another formula or other
+        coeffecients are rescored in memory, they are stored by the next merge.
+
+        Returns the score history of the company, latest year first.
+        """
+        stored, _, zscores = self._score_history(
+            db,
+            country_iso_code=country_iso_code.lower(),
+            company_id=company_id,
+            financials=[],
+            coeffecients=coeffecients,
+            formula=formula,
+        )
+        return self._history(stored, zscores, formula)
+
+    def merge_by_company(
+        self,
+        db: Session,
+        *,
+        country_iso_code: str,
+        company_id: str,
+        financials: Sequence[schemas.Financial],
+        coeffecients: scoring.CoeffecientTable,
+        formula: str = scoring.DEFAULT_FORMULA,
+    ) -> List[schemas.ZScore]:
+        """
+        Store new or changed financial years of a company and score only those.
+
+        Stored years whose score was calculated with another formula or other
+        coeffecients are rescored as well. Everything is scored with a single
+        kernel call.
+
+        Years and scores are written with `INSERT ... ON CONFLICT`, so that
+        concurrent merges adding the same year don't conflict: the last one
+        wins.
+
+        Returns the merged score history of the company, latest year first.
+        """
+        country_iso_code = country_iso_code.lower()
+        stored, rescore, zscores = self._score_history(
+            db,
+            country_iso_code=country_iso_code,
+            company_id=company_id,
+            financials=financials,
+            coeffecients=coeffecients,
+            formula=formula,
+        )
+        history = self._history(stored, zscores, formula)
+        if not rescore:
+            return history
+
+        # Financial ids of the rows already stored and unchanged
+        ids = {
+            year: stored[year].id
+            for year, row in rescore.items()
+            if row is stored.get(year)
+        }
+        written = [row for year, row in rescore.items() if year not in ids]
+        if written:
+            if any(row.year not in stored for row in written):
+                self.store_companies(db, keys=[(country_iso_code, company_id)])
+            statement = insert(Financial).values(
+                [
+                    {
+                        "country_iso_code": country_iso_code,
+                        "company_id": company_id,
+                        "year": row.year,
+                        **{field: getattr(row, field) for field in STORED_FIELDS},
+                    }
+                    for row in written
+                ]
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=list(KEY_COLUMNS),
+                set_={field: statement.excluded[field] for field in STORED_FIELDS},
+            ).returning(Financial.year, Financial.id)
+            ids.update(db.execute(statement).all())
+
+        version = f"{formula}:{coeffecients.digest}"
+        statement = insert(Score).values(
+            [
+                {"financial_id": ids[year], "zscore": zscore, "coeffecients": version}
+                for year, zscore in zscores.items()
+            ]
+        )
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["financial_id"],
+                set_={
+                    "zscore": statement.excluded.zscore,
+                    "coeffecients": statement.excluded.coeffecients,
+                },
+            )
+        )
+        # Previous scores are read before committing, which expires the rows
+        updates = [
+            (
+                year,
+                (
+                    stored[year].score.zscore
+                    if year in stored and stored[year].score is not None
+                    else None
+                ),
+                zscore,
+            )
+            for year, zscore in zscores.items()
+        ]
+        db.commit()
+        for year, old, new in updates:
+            scoring.cohort_index.update(country_iso_code, year, old, new)
+        return history
+
+    def ingest(
+        self,
+        db: Session,
+        *,
+        country_iso_codes: Sequence[str],
+        company_ids: Sequence[str],
+        columns: Mapping[str, np.ndarray],
+        zscores: ArrayLike,
+        coeffecients: Sequence[str],
+    ) -> int:
+        """
+        Store the financial years of many companies with their scores.
+
+        All rows are copied into a temporary table with a single `COPY`, and
+        merged from there with `INSERT ... ON CONFLICT`: missing companies are
+        created, and stored years are overwritten along with their scores.
+        When a company year is given more than once, the last one wins.
+
+        Cohorts of the stored years are dropped from the cohort index.
+
+        Args:
+            db (Session): session, committed once stored
+            country_iso_codes (Sequence[str]): country iso code per each row
+            company_ids (Sequence[str]): company id per each row
+            columns (Mapping[str, np.ndarray]): `year` and `STORED_FIELDS`,
+                missing optional fields are `nan`
+            zscores (ArrayLike): score per each row
+            coeffecients (Sequence[str]): formula and digest of the
+                coeffecients per each row, as in `Score.coeffecients`
+
+        Returns:
+            int: number of financial years stored
+        """
+        rows = _ingest_rows(
+            country_iso_codes, company_ids, columns, zscores, coeffecients
+        )
+        if not rows:
+            return 0
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_value(value) for value in row))
+            buffer.write("\n")
+        buffer.seek(0)
+
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.execute(_INGEST_TABLE)
+            cursor.copy_expert(_INGEST_COPY, buffer)
+            cursor.execute(_INGEST_COMPANIES)
+            cursor.execute(_INGEST_FINANCIALS)
+            stored = cursor.rowcount
+        finally:
+            cursor.close()
+        db.commit()
+        _discard_cohorts(rows)
+        return stored
+
+    async def arank_scores(
+        self,
+        db: AsyncSession,
+        *,
+        country_iso_code: str,
+        scores: Sequence[schemas.ZScore],
+    ) -> List[schemas.RankedZScore]:
+        return await db.run_sync(
+            self.rank_scores, country_iso_code=country_iso_code, scores=scores
+        )
+
+    async def aget_history_by_company(
+        self,
+        db: AsyncSession,
+        *,
+        country_iso_code: str,
+        company_id: str,
+        coeffecients: scoring.CoeffecientTable,
+        formula: str = scoring.DEFAULT_FORMULA,
+    ) -> List[schemas.ZScore]:
+        return await db.run_sync(
+            self.get_history_by_company,
+            country_iso_code=country_iso_code,
+            company_id=company_id,
+            coeffecients=coeffecients,
+            formula=formula,
+        )
+
+    async def amerge_by_company(
+        self,
+        db: AsyncSession,
+        *,
+        country_iso_code: str,
+        company_id: str,
+        financials: Sequence[schemas.Financial],
+        coeffecients: scoring.CoeffecientTable,
+        formula: str = scoring.DEFAULT_FORMULA,
+    ) -> List[schemas.ZScore]:
+        # Scoring a single company takes microseconds, it stays on the loop
+        return await db.run_sync(
+            self.merge_by_company,
+            country_iso_code=country_iso_code,
+            company_id=company_id,
+            financials=financials,
+            coeffecients=coeffecients,
+            formula=formula,
+        )
+
+    async def aingest(
+        self,
+        db: AsyncSession,
+        *,
+        country_iso_codes: Sequence[str],
+        company_ids: Sequence[str],
+        columns: Mapping[str, np.ndarray],
+        zscores: ArrayLike,
+        coeffecients: Sequence[str],
+    ) -> int:
+        """
+        Store the financial years of many companies with their scores, as
+        `ingest` does, awaiting the database.
+
+        The `COPY` runs on the asyncpg connection of the session, with
+        `copy_records_to_table`, in the transaction the session opened by
+        creating the temporary table.
+        """
+        rows = _ingest_rows(
+            country_iso_codes, company_ids, columns, zscores, coeffecients
+        )
+        if not rows:
+            return 0
+        await db.execute(text(_INGEST_TABLE))
+        connection = await (await db.connection()).get_raw_connection()
+        await connection.driver_connection.copy_records_to_table(
+            "financial_ingest", records=rows
+        )
+        await db.execute(text(_INGEST_COMPANIES))
+        result = await db.execute(text(_INGEST_FINANCIALS))
+        stored = result.rowcount
+        await db.commit()
+        _discard_cohorts(rows)
+        return stored
+
+
+financial = CRUDFinancial(Financial)
@@ -1,6 +1,7 @@
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
@@ -13,12 +14,24 @@ class CRUDItem(CRUDBase[Item, ItemCreate, ItemUpdate]):
         self, db: Session, *, obj_in: ItemCreate, owner_id: int
     ) -> Item:
         obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data, owner_id=owner_id)  # type:ignore
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        (db_obj,) = self._insert_many(db, [dict(obj_in_data, owner_id=owner_id)])
         return db_obj
 
+    def create_many_with_owner(
+        self, db: Session, *, objs_in: Sequence[ItemCreate], owner_id: int
+    ) -> List[Item]:
+        return self._insert_many(
+            db, [dict(obj_in.dict(), owner_id=owner_id) for obj_in in objs_in]
+        )
+
+    def get_owners(self, db: Session, *, ids: Sequence[int]) -> Dict[int, int]:
+        """
+        Get the owner of each existing item of `ids`, in one query.
+        """
+        return dict(
+            db.query(Item.id, Item.owner_id).filter(Item.id.in_(list(ids))).all()
+        )
+
     def get_multi_by_owner(
         self, db: Session, *, owner_id: int, skip: int = 0, limit: int = 100
     ) -> List[Item]:
@@ -30,5 +43,57 @@ class CRUDItem(CRUDBase[Item, ItemCreate, ItemUpdate]):
             .all()
         )
 
+    def get_page_by_owner(
+        self,
+        db: Session,
+        *,
+        owner_id: int,
+        after: Optional[int] = None,
+        limit: int = 100
+    ) -> Tuple[List[Item], Optional[int]]:
+        return self._page(
+            db.query(self.model).filter(Item.owner_id == owner_id),
+            after=after,
+            limit=limit,
+        )
+
+    async def acreate_with_owner(
+        self, db: AsyncSession, *, obj_in: ItemCreate, owner_id: int
+    ) -> Item:
+        return await db.run_sync(
+            self.create_with_owner, obj_in=obj_in, owner_id=owner_id
+        )
+
+    async def acreate_many_with_owner(
+        self, db: AsyncSession, *, objs_in: Sequence[ItemCreate], owner_id: int
+    ) -> List[Item]:
+        return await db.run_sync(
+            self.create_many_with_owner, objs_in=objs_in, owner_id=owner_id
+        )
+
+    async def aget_owners(
+        self, db: AsyncSession, *, ids: Sequence[int]
+    ) -> Dict[int, int]:
+        return await db.run_sync(self.get_owners, ids=ids)
+
+    async def aget_multi_by_owner(
+        self, db: AsyncSession, *, owner_id: int, skip: int = 0, limit: int = 100
+    ) -> List[Item]:
+        return await db.run_sync(
+            self.get_multi_by_owner, owner_id=owner_id, skip=skip, limit=limit
+        )
+
+    async def aget_page_by_owner(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        after: Optional[int] = None,
+        limit: int = 100
+    ) -> Tuple[List[Item], Optional[int]]:
+        return await db.run_sync(
+            self.get_page_by_owner, owner_id=owner_id, after=after, limit=limit
+        )
+
 
 item = CRUDItem(Item)
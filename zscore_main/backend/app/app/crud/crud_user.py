@@ -1,6 +1,8 @@
 from typing import Any, Dict, Optional, Union
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.security import get_password_hash, verify_password
 from app.crud.base import CRUDBase
@@ -13,15 +15,20 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         return db.query(User).filter(User.email == email).first()
 
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
-        db_obj = User(  # type: ignore
-            email=obj_in.email,  # type: ignore
-            hashed_password=get_password_hash(obj_in.password),  # type: ignore
-            full_name=obj_in.full_name,  # type: ignore
-            is_superuser=obj_in.is_superuser,  # type: ignore
+        return self._create(db, obj_in, get_password_hash(obj_in.password))
+
+    def _create(self, db: Session, obj_in: UserCreate, hashed_password: str) -> User:
+        (db_obj,) = self._insert_many(
+            db,
+            [
+                dict(
+                    email=obj_in.email,
+                    hashed_password=hashed_password,
+                    full_name=obj_in.full_name,
+                    is_superuser=obj_in.is_superuser,
+                )
+            ],
         )
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
         return db_obj
 
     def update(
@@ -37,6 +44,32 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             update_data["hashed_password"] = hashed_password
         return super().update(db, db_obj=db_obj, obj_in=update_data)
 
+    async def aget_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
+        return await db.run_sync(self.get_by_email, email=email)
+
+    async def acreate(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
+        # Hashing takes a lot of CPU, it runs in the threadpool instead of the
+        # event loop
+        hashed_password = await run_in_threadpool(get_password_hash, obj_in.password)
+        return await db.run_sync(self._create, obj_in, hashed_password)
+
+    async def aupdate(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: User,
+        obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> User:
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if update_data.get("password"):
+            update_data["hashed_password"] = await run_in_threadpool(
+                get_password_hash, update_data.pop("password")
+            )
+        return await db.run_sync(super().update, db_obj=db_obj, obj_in=update_data)
+
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         user = self.get_by_email(db, email=email)
         if not user:
@@ -1,5 +1,8 @@
 # Import all the models, so that Base has them before being
 # imported by Alembic
 from app.db.base_class import Base  # noqa: F401
+from app.models.company import Company  # noqa: F401
+from app.models.financial import Financial  # noqa: F401
 from app.models.item import Item  # noqa: F401
+from app.models.score import Score  # noqa: F401
 from app.models.user import User  # noqa: F401
@@ -2,11 +2,15 @@ from typing import Any
 
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
 
+# Primary keys are Postgres `integer` columns
+MAX_KEY = 2**31 - 1
+
 
 @as_declarative()
 class Base:
     id: Any
     __name__: str
+
     # Generate __tablename__ automatically
     @declared_attr
     def __tablename__(cls) -> str:
@@ -1,7 +1,22 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
 engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async endpoints await the database instead of holding a threadpool worker.
+# Objects stay loaded after a commit, as an expired attribute can't be loaded
+# lazily outside of `AsyncSession.run_sync`.
+async_engine = create_async_engine(
+    settings.ASYNC_SQLALCHEMY_DATABASE_URI, pool_pre_ping=True
+)
+AsyncSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=async_engine,
+    class_=AsyncSession,
+)
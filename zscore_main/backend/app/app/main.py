@@ -2,7 +2,11 @@ from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.api_v1.api import api_router
+from app.api.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.executor import compute_executor
+from app.db.session import async_engine
+from app.scoring import coeffecient_registry, cohort_index
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -21,4 +25,29 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# Brotli or gzip, as negotiated per request
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+coeffecient_registry.configure(
+    path=settings.ZSCORE_COEFFECIENTS_FILE,
+    check_interval=settings.ZSCORE_COEFFECIENTS_CHECK_INTERVAL,
+)
+cohort_index.configure(ttl=settings.ZSCORE_COHORT_TTL)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
+
+
+@app.on_event("shutdown")
+def shutdown_compute_executor() -> None:
+    compute_executor.shutdown()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine() -> None:
+    # Pooled asyncpg connections belong to the event loop that opened them
+    await async_engine.dispose()
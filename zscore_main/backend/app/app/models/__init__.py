@@ -1,2 +1,5 @@
+from .company import Company
+from .financial import Financial
 from .item import Item
+from .score import Score
 from .user import User
@@ -0,0 +1,23 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+
+if TYPE_CHECKING:
+    from .financial import Financial  # noqa: F401
+
+
+class Company(Base):
+    __table_args__ = (UniqueConstraint("country_iso_code", "company_id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    country_iso_code = Column(String(2), nullable=False)
+    company_id = Column(String, nullable=False)
+    financials = relationship(
+        "Financial",
+        back_populates="company",
+        cascade="all, delete",
+        passive_deletes=True,
+    )
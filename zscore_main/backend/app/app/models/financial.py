@@ -0,0 +1,52 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import (
+    Column,
+    Float,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+
+if TYPE_CHECKING:
+    from .company import Company  # noqa: F401
+    from .score import Score  # noqa: F401
+
+
+class Financial(Base):
+    __table_args__ = (
+        # Also the index of the reads per company
+        UniqueConstraint("country_iso_code", "company_id", "year"),
+        ForeignKeyConstraint(
+            ["country_iso_code", "company_id"],
+            ["company.country_iso_code", "company.company_id"],
+            ondelete="CASCADE",
+        ),
+        # Country and year cohorts are read without a company
+        Index("ix_financial_country_iso_code_year", "country_iso_code", "year"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    country_iso_code = Column(String(2), nullable=False)
+    company_id = Column(String, nullable=False)
+    year = Column(Integer, nullable=False)
+    ebit = Column(Float, nullable=False)
+    equity = Column(Float, nullable=False)
+    retained_earnings = Column(Float, nullable=False)
+    sales = Column(Float, nullable=False)
+    total_assets = Column(Float, nullable=False)
+    total_liabilities = Column(Float, nullable=False)
+    working_capital = Column(Float, nullable=False)
+    current_assets = Column(Float)
+    current_liabilities = Column(Float)
+    funds_from_operations = Column(Float)
+    net_income = Column(Float)
+    company = relationship("Company", back_populates="financials")
+    score = relationship(
+        "Score", back_populates="financial", uselist=False, cascade="all, delete"
+    )
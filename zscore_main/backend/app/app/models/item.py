@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
@@ -10,6 +10,9 @@ if TYPE_CHECKING:
 
 
 class Item(Base):
+    # Pages of the items of an owner are read in primary key order
+    __table_args__ = (Index("ix_item_owner_id_id", "owner_id", "id"),)
+
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(String, index=True)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Float, ForeignKey, Integer, String
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+
+from .financial import Financial  # noqa: F401
+
+
+class Score(Base):
+    id = Column(Integer, primary_key=True, index=True)
+    financial_id = Column(
+        Integer, ForeignKey("financial.id", ondelete="CASCADE"), unique=True
+    )
+    zscore = Column(Float, nullable=False)
+    # Formula and digest of the coeffecients the score was calculated with
+    coeffecients = Column(String, nullable=False)
+    financial = relationship("Financial", back_populates="score")
@@ -1,6 +1,44 @@
-from .financial import Financial, FinancialPayload
-from .item import Item, ItemCreate, ItemInDB, ItemUpdate
+from .cache import CacheStats
+from .coeffecients import Coeffecients
+from .distribution import (
+    CompanyZScoreDistribution,
+    DistributionPayload,
+    FieldUncertainty,
+    ZScoreDistribution,
+)
+from .financial import (
+    BulkFinancial,
+    BulkFinancialPayload,
+    ColumnarFinancialPayload,
+    CompanyFinancials,
+    Financial,
+    FinancialPayload,
+    FinancialRecord,
+)
+from .item import Item, ItemBulkUpdate, ItemCreate, ItemInDB, ItemUpdate
 from .msg import Msg
+from .sensitivity import (
+    CompanySensitivity,
+    FieldSensitivity,
+    SensitivityPayload,
+    SensitivityPoint,
+)
 from .token import Token, TokenPayload
 from .user import User, UserCreate, UserInDB, UserUpdate
-from .zscore import CompanyZScores, ZScore
+from .zscore import (
+    BulkCompanyTrends,
+    BulkCompanyZScores,
+    BulkIngestResult,
+    ColumnarZScores,
+    CompanyError,
+    CompanyModelScores,
+    CompanyRankedZScores,
+    CompanyTrend,
+    CompanyZScores,
+    CompanyZScoresResult,
+    ModelScores,
+    RankedZScore,
+    ZoneCount,
+    ZScore,
+    ZScoreTrend,
+)
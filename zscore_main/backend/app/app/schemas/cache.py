@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    ttl: float
+    hits: int
+    misses: int
+    evictions: int
@@ -0,0 +1,23 @@
+from typing import Dict
+
+from pydantic import BaseModel, conlist
+
+
+class Coeffecients(BaseModel):
+    """
+    Z-score formula coeffecients per each country.
+    """
+
+    default: conlist(float, min_items=5, max_items=5)  # type: ignore
+    countries: Dict[str, conlist(float, min_items=5, max_items=5)]  # type: ignore
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "default": [1.0, 1.2, 3.1, 0.4, 1.2],
+                "countries": {
+                    "gb": [1.2, 1.4, 3.3, 0.6, 1.0],
+                    "fr": [1.1, 1.3, 3.2, 0.5, 1.1],
+                },
+            }
+        }
@@ -0,0 +1,82 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, confloat, conlist, root_validator
+
+from .financial import Financial
+
+
+class FieldUncertainty(BaseModel):
+    """
+    Uncertainty of one financial field, relative to its value.
+
+    Either a relative standard deviation of a normal distribution, or the
+    relative bounds of a uniform distribution.
+    """
+
+    relative_std: Optional[confloat(ge=0)] = None  # type: ignore
+    bounds: Optional[conlist(float, min_items=2, max_items=2)] = None  # type: ignore
+
+    @root_validator
+    def check_distribution(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        relative_std, bounds = values.get("relative_std"), values.get("bounds")
+        if (relative_std is None) == (bounds is None):
+            raise ValueError("Either relative_std or bounds is required")
+        if bounds is not None and bounds[0] > bounds[1]:
+            raise ValueError("Lower bound is greater than upper bound")
+        return values
+
+
+# Distribution payload
+class DistributionPayload(BaseModel):
+    """
+    Z-score distribution payload model.
+    """
+
+    financials: List[Financial]
+    uncertainty: Dict[str, FieldUncertainty]
+
+    class Config:
+        schema_extra = {
+            "description": "Financial data for given company, and the uncertainty \
+                of its fields.",
+            "example": {
+                "financials": [
+                    {
+                        "year": 2020,
+                        "ebit": 123.45,
+                        "equity": 234.56,
+                        "retained_earnings": 345.67,
+                        "sales": 1234.56,
+                        "total_assets": 345.67,
+                        "total_liabilities": 456.78,
+                        "working_capital": 23.45,
+                    }
+                ],
+                "uncertainty": {
+                    "ebit": {"relative_std": 0.1},
+                    "total_assets": {"bounds": [-0.05, 0.05]},
+                },
+            },
+        }
+
+
+class ZScoreDistribution(BaseModel):
+    """
+    Z-score distribution of one year.
+    """
+
+    year: int
+    zscore: Optional[float]
+    mean: Optional[float]
+    percentiles: Dict[str, Optional[float]]
+    zones: Dict[str, float]
+
+
+class CompanyZScoreDistribution(BaseModel):
+    """
+    Company Z-score distribution response model.
+    """
+
+    samples: int
+    seed: Optional[int]
+    scores: List[ZScoreDistribution]
@@ -1,6 +1,75 @@
-from typing import List
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
-from pydantic import BaseModel
+import numpy as np
+from pydantic import BaseModel, conint, root_validator
+
+
+class FloatColumn(np.ndarray):
+    """
+    Column of floats validated as a whole into a float64 array.
+    """
+
+    nullable = False
+
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable[..., Any]]:
+        yield cls.validate
+
+    @classmethod
+    def __modify_schema__(cls, field_schema: Dict[str, Any]) -> None:
+        field_schema.update(type="array", items={"type": "number"})
+
+    @classmethod
+    def validate(cls, value: Any) -> np.ndarray:
+        if not isinstance(value, (list, tuple, np.ndarray)):
+            raise TypeError("array required")
+        try:
+            column = np.array(value, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError("array of numbers required")
+        if column.ndim != 1:
+            raise ValueError("flat array required")
+        if not cls.nullable and np.isnan(column).any():
+            raise ValueError("array without nulls required")
+        return column
+
+
+class NullableFloatColumn(FloatColumn):
+    """
+    Column of floats validated as a whole into a float64 array, `null` values
+    are kept as `nan`.
+    """
+
+    nullable = True
+
+    @classmethod
+    def __modify_schema__(cls, field_schema: Dict[str, Any]) -> None:
+        field_schema.update(type="array", items={"type": "number", "nullable": True})
+
+
+class IntColumn(FloatColumn):
+    """
+    Column of integers validated as a whole into an int64 array.
+    """
+
+    @classmethod
+    def __modify_schema__(cls, field_schema: Dict[str, Any]) -> None:
+        field_schema.update(type="array", items={"type": "integer"})
+
+    @classmethod
+    def validate(cls, value: Any) -> np.ndarray:
+        column = super().validate(value)
+        # Casting wraps values out of the int64 range around instead of failing
+        if not np.all(np.isfinite(column) & (np.abs(column) < 2.0**63)):
+            raise ValueError("array of 64-bit integers required")
+        if not np.all(np.mod(column, 1) == 0):
+            raise ValueError("array of integers required")
+        return column.astype(np.int64)
+
+
+# Years are stored in a Postgres `integer` column
+MIN_YEAR = -(2**31)
+MAX_YEAR = 2**31 - 1
 
 
 # Financial data
@@ -9,7 +78,7 @@ class Financial(BaseModel):
     Financial data model depending on given year.
     """
 
-    year: int
+    year: conint(ge=MIN_YEAR, le=MAX_YEAR)  # type: ignore
     ebit: float
     equity: float
     retained_earnings: float
@@ -17,6 +86,21 @@ class Financial(BaseModel):
     total_assets: float
     total_liabilities: float
     working_capital: float
+    # Used by the Ohlson and Zmijewski scores only
+    current_assets: Optional[float] = None
+    current_liabilities: Optional[float] = None
+    funds_from_operations: Optional[float] = None
+    net_income: Optional[float] = None
+
+
+# Financial data of one company, one record per line of a NDJSON stream
+class FinancialRecord(Financial):
+    """
+    Financial data model of given company depending on given year.
+    """
+
+    country_iso_code: str
+    id: str
 
 
 # Financial payload
@@ -96,3 +180,129 @@ class FinancialPayload(BaseModel):
                 },
             },
         }
+
+
+# Financial data of a bulk payload, a missing year is reported per row
+class BulkFinancial(Financial):
+    """
+    Financial data model of a bulk payload depending on given year.
+    """
+
+    year: Optional[conint(ge=MIN_YEAR, le=MAX_YEAR)] = None  # type: ignore
+
+
+# Columnar financial payload
+class ColumnarFinancialPayload(BaseModel):
+    """
+    Financial data payload model with one array per field.
+
+    Each array is validated as a whole and scored as is, without one model
+    per year.
+    """
+
+    year: IntColumn
+    ebit: FloatColumn
+    equity: FloatColumn
+    retained_earnings: FloatColumn
+    sales: FloatColumn
+    total_assets: FloatColumn
+    total_liabilities: FloatColumn
+    working_capital: FloatColumn
+    # Used by the Ohlson and Zmijewski scores only
+    current_assets: Optional[NullableFloatColumn] = None
+    current_liabilities: Optional[NullableFloatColumn] = None
+    funds_from_operations: Optional[NullableFloatColumn] = None
+    net_income: Optional[NullableFloatColumn] = None
+
+    @root_validator(skip_on_failure=True)
+    def check_lengths(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        lengths = {len(column) for column in values.values() if column is not None}
+        if len(lengths) > 1:
+            raise ValueError("All fields need the same number of years")
+        return values
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Get the columns of the payload, missing fields as arrays of `nan`.
+        """
+        size = len(self.year)
+        return {
+            field: np.full(size, np.nan) if column is None else column
+            for field, column in self.__dict__.items()
+        }
+
+    class Config:
+        schema_extra = {
+            "description": "Financial data for given company, one array per field.",
+            "example": {
+                "year": [2020, 2019],
+                "ebit": [123.45, 122.63],
+                "equity": [234.56, 224.56],
+                "retained_earnings": [345.67, 325.33],
+                "sales": [1234.56, 1214.99],
+                "total_assets": [345.67, 325.04],
+                "total_liabilities": [456.78, 426.78],
+                "working_capital": [23.45, 23.45],
+            },
+        }
+
+
+# Financials of one company in a bulk payload
+class CompanyFinancials(BaseModel):
+    """
+    Financial data of one company in a bulk payload.
+    """
+
+    country_iso_code: str
+    id: str
+    financials: List[BulkFinancial]
+
+
+# Bulk financial payload
+class BulkFinancialPayload(BaseModel):
+    """
+    Financial data payload model for many companies.
+    """
+
+    companies: List[CompanyFinancials]
+
+    class Config:
+        schema_extra = {
+            "description": "Financial data for many companies.",
+            "example": {
+                "companies": [
+                    {
+                        "country_iso_code": "gb",
+                        "id": "10149809",
+                        "financials": [
+                            {
+                                "year": 2020,
+                                "ebit": 123.45,
+                                "equity": 234.56,
+                                "retained_earnings": 345.67,
+                                "sales": 1234.56,
+                                "total_assets": 345.67,
+                                "total_liabilities": 456.78,
+                                "working_capital": 23.45,
+                            }
+                        ],
+                    },
+                    {
+                        "country_iso_code": "fr",
+                        "id": "10213542",
+                        "financials": [
+                            {
+                                "year": 2020,
+                                "ebit": 123.45,
+                                "equity": 234.56,
+                                "retained_earnings": 345.67,
+                                "sales": 1234.56,
+                                "total_assets": 345.67,
+                                "total_liabilities": 456.78,
+                                "working_capital": 23.45,
+                            }
+                        ],
+                    },
+                ]
+            },
+        }
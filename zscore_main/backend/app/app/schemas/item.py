@@ -1,6 +1,8 @@
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, conint
+
+from app.db.base_class import MAX_KEY
 
 
 # Shared properties
@@ -19,6 +21,11 @@ class ItemUpdate(ItemBase):
     pass
 
 
+# Properties to receive on bulk update
+class ItemBulkUpdate(ItemUpdate):
+    id: conint(ge=0, le=MAX_KEY)  # type: ignore
+
+
 # Properties shared by models stored in DB
 class ItemInDBBase(ItemBase):
     id: int
@@ -0,0 +1,75 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from .financial import Financial
+
+
+# Sensitivity payload
+class SensitivityPayload(BaseModel):
+    """
+    Sensitivity analysis payload model.
+    """
+
+    financial: Financial
+    perturbations: Dict[str, List[float]] = {}
+
+    class Config:
+        schema_extra = {
+            "description": "Financial data of one year, and relative changes per \
+                each field. Every field of the formula is changed from -50% to \
+                +50% by default.",
+            "example": {
+                "financial": {
+                    "year": 2020,
+                    "ebit": 123.45,
+                    "equity": 234.56,
+                    "retained_earnings": 345.67,
+                    "sales": 1234.56,
+                    "total_assets": 345.67,
+                    "total_liabilities": 456.78,
+                    "working_capital": 23.45,
+                },
+                "perturbations": {
+                    "ebit": [-0.5, -0.25, 0.25, 0.5],
+                    "total_assets": [-0.1, 0.1, 1.0],
+                },
+            },
+        }
+
+
+class SensitivityPoint(BaseModel):
+    """
+    Z-score with one field changed.
+    """
+
+    change: float
+    value: Optional[float]
+    zscore: Optional[float]
+    zone: Optional[str]
+
+
+class FieldSensitivity(BaseModel):
+    """
+    Sensitivity of the Z-score to one field.
+
+    `break_even` holds the values of the field at which the Z-score reaches
+    the distress and the safe zone thresholds.
+    """
+
+    field: str
+    value: Optional[float]
+    derivative: Optional[float]
+    break_even: Dict[str, Optional[float]]
+    grid: List[SensitivityPoint]
+
+
+class CompanySensitivity(BaseModel):
+    """
+    Company sensitivity analysis response model.
+    """
+
+    year: int
+    zscore: Optional[float]
+    zone: Optional[str]
+    fields: List[FieldSensitivity]
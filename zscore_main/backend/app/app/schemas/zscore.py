@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -10,6 +10,15 @@ class ZScore(BaseModel):
 
     year: int
     zscore: float
+    zone: Optional[str]
+
+
+class RankedZScore(ZScore):
+    """
+    Z-score data model with its percentile within the country and year cohort.
+    """
+
+    percentile: Optional[float]
 
 
 class CompanyZScores(BaseModel):
@@ -18,3 +27,128 @@ class CompanyZScores(BaseModel):
     """
 
     scores: List[ZScore]
+
+
+class ColumnarZScores(BaseModel):
+    """
+    Company Z-Score data response model with one array per field.
+    """
+
+    year: List[int]
+    zscore: List[Optional[float]]
+    zone: List[Optional[str]]
+    # Only with cohort percentiles
+    percentile: Optional[List[Optional[float]]] = None
+
+
+class ModelScores(BaseModel):
+    """
+    Scores of several models for one year, `null` where the data is missing.
+    """
+
+    year: int
+    scores: Dict[str, Optional[float]]
+
+
+class CompanyModelScores(BaseModel):
+    """
+    Company multi-model scores response model.
+    """
+
+    scores: List[ModelScores]
+
+
+class CompanyRankedZScores(BaseModel):
+    """
+    Company Z-Score data response model with cohort percentiles.
+    """
+
+    scores: List[RankedZScore]
+
+
+class CompanyZScoresResult(BaseModel):
+    """
+    Z-scores of one company in a bulk response.
+    """
+
+    country_iso_code: str
+    id: str
+    scores: List[ZScore]
+
+
+class CompanyError(BaseModel):
+    """
+    Validation error of one company, or of one of its financial years, in a
+    bulk response.
+    """
+
+    index: int
+    country_iso_code: str
+    id: str
+    # Index of the financial year, none for errors of the whole company
+    row: Optional[int] = None
+    year: Optional[int] = None
+    detail: str
+
+
+class BulkIngestResult(BaseModel):
+    """
+    Financial years stored by a bulk ingestion, and the validation errors of
+    those left out.
+    """
+
+    stored: int
+    errors: List[CompanyError]
+
+
+class ZScoreTrend(BaseModel):
+    """
+    Z-score of one year with its change from the prior year.
+    """
+
+    year: int
+    zscore: Optional[float]
+    delta: Optional[float]
+
+
+class CompanyTrend(BaseModel):
+    """
+    Z-score trend of one company in a bulk response.
+    """
+
+    country_iso_code: str
+    id: str
+    slope: Optional[float]
+    declines: int
+    scores: List[ZScoreTrend]
+
+
+class BulkCompanyTrends(BaseModel):
+    """
+    Bulk Z-Score trends response model.
+    """
+
+    results: List[CompanyTrend]
+    errors: List[CompanyError]
+
+
+class ZoneCount(BaseModel):
+    """
+    Number of scores per each zone of one country and year.
+    """
+
+    country_iso_code: str
+    year: int
+    distress: int
+    grey: int
+    safe: int
+
+
+class BulkCompanyZScores(BaseModel):
+    """
+    Bulk Z-Score data response model.
+    """
+
+    results: List[CompanyZScoresResult]
+    errors: List[CompanyError]
+    histogram: List[ZoneCount]
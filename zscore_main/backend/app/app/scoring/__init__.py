@@ -0,0 +1,63 @@
+from .batch import (
+    DERIVED_FIELDS,
+    EXTRA_FINANCIAL_FIELDS,
+    FINANCIAL_FIELDS,
+    MISSING_YEAR,
+    calc_scores,
+    calc_zones,
+    calc_zscores,
+    derive_columns,
+    financials_to_columns,
+    fingerprint,
+    gather_coeffecients,
+)
+from .coeffecients import (
+    INVALID_COUNTRY_ID,
+    CoeffecientRegistry,
+    CoeffecientTable,
+    build_table,
+    coeffecient_registry,
+    country_code,
+    country_id,
+    country_ids,
+)
+from .cohorts import CohortIndex, cohort_index, percentile_ranks
+from .countries import (
+    COUNTRY_CODES,
+    VALID_COUNTRY_IDS,
+    validate_country_code,
+    validate_country_codes,
+    validate_country_ids,
+)
+from .formulas import (
+    ALTMAN_Z,
+    ALTMAN_Z_EMERGING_MARKETS,
+    ALTMAN_Z_NON_MANUFACTURING,
+    ALTMAN_Z_PRIVATE,
+    DEFAULT_FORMULA,
+    FORMULAS,
+    OHLSON_O,
+    ZMIJEWSKI,
+    CompiledFormula,
+    Formula,
+    Ratio,
+    calc_ratio,
+    register_formula,
+)
+from .sensitivity import calc_break_even, calc_derivatives, calc_grid, linearize
+from .simulation import (
+    SIMULATION_CHUNK_SIZE,
+    Uncertainty,
+    simulate_distribution,
+    simulate_zscores,
+    summarize_distribution,
+)
+from .trends import Trends, calc_trends, zscore_matrix
+from .validation import (
+    RowErrors,
+    error_details,
+    invalid_rows,
+    validate_ids,
+    validate_rows,
+)
+from .zones import NO_ZONE, ZONES, classify_zones, zone_histogram, zone_name
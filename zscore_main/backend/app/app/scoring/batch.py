@@ -0,0 +1,333 @@
+import hashlib
+from typing import Dict, Mapping, Optional, Sequence, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from app.schemas import Financial
+
+from .coeffecients import (
+    CoeffecientTable,
+    CountryCodes,
+    coeffecient_registry,
+    country_id,
+    country_ids,
+)
+from .formulas import (
+    DEFAULT_FORMULA,
+    FORMULAS,
+    CompiledFormula,
+    Ratio,
+    calc_ratio,
+)
+from .zones import classify_zones
+
+Formulas = Union[str, Sequence[str], np.ndarray]
+
+# Columns of the financial data used by the Z-score formula
+FINANCIAL_FIELDS = (
+    "ebit",
+    "equity",
+    "retained_earnings",
+    "sales",
+    "total_assets",
+    "total_liabilities",
+    "working_capital",
+)
+
+# Optional columns, missing values are `nan`
+EXTRA_FINANCIAL_FIELDS = (
+    "current_assets",
+    "current_liabilities",
+    "funds_from_operations",
+    "net_income",
+)
+
+# Year of the rows that have none, only bulk payloads allow them
+MISSING_YEAR = np.iinfo(np.int64).min
+
+# Columns calculated by `derive_columns`
+DERIVED_FIELDS = (
+    "liabilities_exceed_assets",
+    "log_total_assets",
+    "net_income_change",
+    "net_loss_two_years",
+)
+
+
+def financials_to_columns(financials: Sequence[Financial]) -> Dict[str, np.ndarray]:
+    """
+    Convert a sequence of financial rows to columnar arrays.
+
+    Args:
+        financials (Sequence[Financial]): financial data per each year
+
+    Returns:
+        Dict[str, np.ndarray]: one float64 array per financial field, plus `year`
+    """
+    # The extra fields are read with a default, ORM rows may not have them
+    columns = {
+        field: np.fromiter(
+            (getattr(financial, field) for financial in financials),
+            dtype=np.float64,
+            count=len(financials),
+        )
+        for field in FINANCIAL_FIELDS
+    }
+    for field in EXTRA_FINANCIAL_FIELDS:
+        columns[field] = np.array(
+            [getattr(financial, field, None) for financial in financials],
+            dtype=np.float64,
+        )
+    columns["year"] = np.fromiter(
+        (
+            MISSING_YEAR if financial.year is None else financial.year
+            for financial in financials
+        ),
+        dtype=np.int64,
+        count=len(financials),
+    )
+    return columns
+
+
+def fingerprint(columns: Mapping[str, np.ndarray]) -> bytes:
+    """
+    Canonical hash of columnar financial data.
+
+    Rows are compared by value, so payloads differing only in JSON formatting
+    (key order, `1` vs `1.0`) get the same fingerprint.
+
+    Args:
+        columns (Mapping[str, np.ndarray]): `year` and each of `FINANCIAL_FIELDS`
+            and `EXTRA_FINANCIAL_FIELDS`
+
+    Returns:
+        bytes: 16-byte digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for field in ("year",) + FINANCIAL_FIELDS + EXTRA_FINANCIAL_FIELDS:
+        digest.update(np.ascontiguousarray(columns[field]).tobytes())
+    return digest.digest()
+
+
+def derive_columns(
+    columns: Mapping[str, ArrayLike], groups: Optional[ArrayLike] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Add the columns of `DERIVED_FIELDS` to columnar financial data.
+
+    Terms comparing net income to the prior year look up the row of the same
+    group, i.e. company, with the previous year. Rows without one get 0.
+
+    Args:
+        columns (Mapping[str, ArrayLike]): `year` and each of `FINANCIAL_FIELDS`
+            and `EXTRA_FINANCIAL_FIELDS`
+        groups (ArrayLike): company per each row, all rows are one by default
+
+    Returns:
+        Dict[str, np.ndarray]: the columns, plus each of `DERIVED_FIELDS`
+    """
+    total_assets = np.asarray(columns["total_assets"], dtype=np.float64)
+    total_liabilities = np.asarray(columns["total_liabilities"], dtype=np.float64)
+    net_income = np.asarray(columns["net_income"], dtype=np.float64)
+    year = np.asarray(columns["year"])
+
+    # Link each row to the previous year of its group through one sort
+    group = np.zeros(len(year), dtype=np.intp) if groups is None else np.asarray(groups)
+    order = np.lexsort((year, group))
+    sorted_group = group[order]
+    sorted_year = year[order]
+    linked = (sorted_group[1:] == sorted_group[:-1]) & (
+        sorted_year[1:] == sorted_year[:-1] + 1
+    )
+    prior_net_income = np.full(len(year), np.nan)
+    prior_net_income[order[1:][linked]] = net_income[order[:-1][linked]]
+    has_prior = ~np.isnan(prior_net_income)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_total_assets = np.log(total_assets)
+        change = (net_income - prior_net_income) / (
+            np.abs(net_income) + np.abs(prior_net_income)
+        )
+    change[has_prior & (net_income == prior_net_income)] = 0.0
+    change[~has_prior] = 0.0
+
+    derived = {field: np.asarray(values) for field, values in columns.items()}
+    derived["liabilities_exceed_assets"] = (total_liabilities > total_assets).astype(
+        np.float64
+    )
+    derived["log_total_assets"] = log_total_assets
+    derived["net_income_change"] = change
+    derived["net_loss_two_years"] = ((net_income < 0) & (prior_net_income < 0)).astype(
+        np.float64
+    )
+    return derived
+
+
+def _with_derived_columns(
+    columns: Mapping[str, ArrayLike],
+    formulas: Sequence[CompiledFormula],
+    groups: Optional[ArrayLike],
+) -> Mapping[str, ArrayLike]:
+    if any(
+        field in DERIVED_FIELDS and field not in columns
+        for formula in formulas
+        for field in formula.fields
+    ):
+        return derive_columns(columns, groups)
+    return columns
+
+
+def gather_coeffecients(
+    country_codes: CountryCodes, coeffecients: Optional[CoeffecientTable] = None
+) -> np.ndarray:
+    """
+    Gather Z-score coeffecients for a country column.
+
+    Codes are mapped to integer country ids, which index the dense coeffecient
+    table with a single fancy-index. Integer country ids are used as is.
+
+    Args:
+        country_codes (CountryCodes): one country code or id, or one per row
+        coeffecients (CoeffecientTable): defaults to the current registry version
+
+    Returns:
+        np.ndarray: coeffecients of shape (5,) for a single code, (n, 5) otherwise
+    """
+    table = (coeffecients or coeffecient_registry.get()).table
+    codes = np.asarray(country_codes)
+    if np.issubdtype(codes.dtype, np.integer):
+        ids = codes
+    elif codes.ndim == 0:
+        ids = np.asarray(country_id(codes.item()))
+    else:
+        ids = country_ids(codes)
+
+    # Gather column-major so that each coeffecient column is contiguous
+    return np.take(table, ids, axis=1).T
+
+
+def _evaluate(
+    formula: CompiledFormula,
+    columns: Mapping[str, ArrayLike],
+    country_codes: CountryCodes,
+    coeffecients: Optional[CoeffecientTable],
+) -> np.ndarray:
+    if formula.coeffecients is not None:
+        return formula(columns)
+    return formula(columns, gather_coeffecients(country_codes, coeffecients))
+
+
+def calc_zscores(
+    columns: Mapping[str, ArrayLike],
+    country_codes: CountryCodes,
+    coeffecients: Optional[CoeffecientTable] = None,
+    formulas: Formulas = DEFAULT_FORMULA,
+    groups: Optional[ArrayLike] = None,
+) -> np.ndarray:
+    """
+    Calculate Z-scores for a batch of financial years in one vectorized pass.
+
+    Args:
+        columns (Mapping[str, ArrayLike]): arrays for each of `FINANCIAL_FIELDS`
+        country_codes (CountryCodes): one country code or id, or one per row
+        coeffecients (CoeffecientTable): defaults to the current registry version
+        formulas (Formulas): one formula name, or one per row
+        groups (ArrayLike): company per each row, all rows are one by default
+
+    Returns:
+        np.ndarray: z-scores, one per row
+    """
+    names = np.asarray(formulas)
+    if names.ndim == 0:
+        formula = FORMULAS[names.item()]
+        columns = _with_derived_columns(columns, [formula], groups)
+        return _evaluate(formula, columns, country_codes, coeffecients)
+
+    columns = _with_derived_columns(
+        columns, [FORMULAS[name] for name in np.unique(names).tolist()], groups
+    )
+
+    # One kernel call per distinct formula over the rows selecting it
+    codes = np.asarray(country_codes)
+    zscores = np.empty(names.shape, dtype=np.float64)
+    for name in np.unique(names).tolist():
+        formula = FORMULAS[name]
+        mask = names == name
+        subset = {field: np.asarray(columns[field])[mask] for field in formula.fields}
+        zscores[mask] = _evaluate(
+            formula, subset, codes[mask] if codes.ndim else codes, coeffecients
+        )
+    return zscores
+
+
+def calc_zones(zscores: ArrayLike, formulas: Formulas = DEFAULT_FORMULA) -> np.ndarray:
+    """
+    Classify Z-scores into zones with the thresholds of their formula.
+
+    Args:
+        zscores (ArrayLike): z-scores
+        formulas (Formulas): one formula name, or one per each score
+
+    Returns:
+        np.ndarray: zone codes, `NO_ZONE` for formulas without zones
+    """
+    names = np.asarray(formulas)
+    if names.ndim == 0:
+        zones = FORMULAS[names.item()].zones or (np.nan, np.nan)
+        return classify_zones(zscores, zones)
+
+    lower = np.full(names.shape, np.nan)
+    upper = np.full(names.shape, np.nan)
+    for name in np.unique(names).tolist():
+        thresholds = FORMULAS[name].zones
+        if thresholds is not None:
+            mask = names == name
+            lower[mask], upper[mask] = thresholds
+    return classify_zones(zscores, (lower, upper))
+
+
+def calc_scores(
+    columns: Mapping[str, ArrayLike],
+    country_codes: CountryCodes,
+    formulas: Sequence[str],
+    coeffecients: Optional[CoeffecientTable] = None,
+    groups: Optional[ArrayLike] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Calculate several scores for the same financial years in one fused pass.
+
+    Every distinct ratio of the formulas is calculated once, and each formula
+    is evaluated over the shared ratio arrays. The scores are exactly the same
+    as with `calc_zscores`.
+
+    Args:
+        columns (Mapping[str, ArrayLike]): arrays for each of `FINANCIAL_FIELDS`
+            and `EXTRA_FINANCIAL_FIELDS`
+        country_codes (CountryCodes): one country code or id, or one per row
+        formulas (Sequence[str]): formula names
+        coeffecients (CoeffecientTable): defaults to the current registry version
+        groups (ArrayLike): company per each row, all rows are one by default
+
+    Returns:
+        Dict[str, np.ndarray]: scores per each formula name, one per row
+    """
+    compiled = [FORMULAS[name] for name in formulas]
+    columns = _with_derived_columns(columns, compiled, groups)
+
+    ratios: Dict[Ratio, np.ndarray] = {}
+    for formula in compiled:
+        for ratio in formula.ratios:
+            if ratio not in ratios:
+                ratios[ratio] = calc_ratio(ratio, columns)
+
+    country_coeffecients = None
+    scores = {}
+    for formula in compiled:
+        if formula.coeffecients is not None:
+            scores[formula.name] = formula.combine(ratios)
+            continue
+        if country_coeffecients is None:
+            country_coeffecients = gather_coeffecients(country_codes, coeffecients)
+        scores[formula.name] = formula.combine(ratios, country_coeffecients)
+    return scores
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COEFFECIENTS_FILE = str(Path(__file__).parent / "coeffecients.json")
+
+# Every two-letter code has its own slot, the last slot is for invalid codes
+COUNTRY_SLOTS = 26 * 26
+INVALID_COUNTRY_ID = COUNTRY_SLOTS
+
+CountryCodes = Union[str, Sequence[str], np.ndarray]
+
+
+def country_id(code: str) -> int:
+    """
+    Get the integer country id of an alpha-2 code.
+
+    Args:
+        code (str): country iso code, in any case
+
+    Returns:
+        int: id in [0, 676), or `INVALID_COUNTRY_ID`
+    """
+    code = code.upper()
+    if len(code) != 2 or not ("A" <= code[0] <= "Z" and "A" <= code[1] <= "Z"):
+        return INVALID_COUNTRY_ID
+    return (ord(code[0]) - 65) * 26 + (ord(code[1]) - 65)
+
+
+def country_code(cid: int) -> str:
+    """
+    Get the lower case alpha-2 code of an integer country id.
+
+    Args:
+        cid (int): id in [0, 676)
+
+    Returns:
+        str: country iso code
+    """
+    return chr(97 + cid // 26) + chr(97 + cid % 26)
+
+
+def country_ids(codes: CountryCodes) -> np.ndarray:
+    """
+    Get the integer country ids of a column of alpha-2 codes.
+
+    Works on the code points of the strings, so no per-row Python call is made.
+
+    Args:
+        codes (CountryCodes): country iso codes, in any case
+
+    Returns:
+        np.ndarray: ids in [0, 676), or `INVALID_COUNTRY_ID`
+    """
+    chars = np.asarray(codes)
+    if chars.dtype.kind != "U":
+        chars = chars.astype(str)
+    if chars.dtype.itemsize < 8:
+        chars = chars.astype("<U2")
+    width = chars.dtype.itemsize // 4
+    points = np.ascontiguousarray(chars).reshape(-1).view(np.uint32).reshape(-1, width)
+
+    # Folding to lower case and wrapping around leaves letters, and only
+    # letters, in [0, 26)
+    first = (points[:, 0] | 32) - np.uint32(97)
+    second = (points[:, 1] | 32) - np.uint32(97)
+    valid = (first < 26) & (second < 26)
+    if width > 2:
+        valid &= points[:, 2] == 0
+
+    ids = (first * 26 + second).astype(np.intp)
+    ids[~valid] = INVALID_COUNTRY_ID
+    return ids.reshape(chars.shape)
+
+
+class CoeffecientTable(NamedTuple):
+    """
+    One immutable version of the Z-score coeffecients.
+    """
+
+    version: Tuple[int, int]
+    # Content hash, the same in every worker for the same coeffecients
+    digest: str
+    default: Tuple[float, ...]
+    countries: Dict[str, Tuple[float, ...]]
+    # (5, COUNTRY_SLOTS + 1), one contiguous row per coeffecient
+    table: np.ndarray
+
+
+def build_table(
+    default: Sequence[float],
+    countries: Dict[str, Sequence[float]],
+    version: Tuple[int, int] = (0, 0),
+) -> CoeffecientTable:
+    """
+    Build a dense coeffecient table indexed by country id.
+
+    Args:
+        default (Sequence[float]): coeffecients of countries not listed
+        countries (Dict[str, Sequence[float]]): coeffecients per each country code
+        version (Tuple[int, int]): version of the source of the coeffecients
+
+    Returns:
+        CoeffecientTable: coeffecient table
+    """
+    table = np.empty((COUNTRY_SLOTS + 1, 5), dtype=np.float64)
+    table[:] = default
+    for code, coeffecients in countries.items():
+        cid = country_id(code)
+        if cid == INVALID_COUNTRY_ID:
+            raise ValueError(f"Invalid country code: {code}")
+        table[cid] = coeffecients
+
+    default_row = tuple(float(c) for c in default)
+    country_rows = {
+        code.lower(): tuple(float(c) for c in coeffecients)
+        for code, coeffecients in countries.items()
+    }
+    content = json.dumps([default_row, sorted(country_rows.items())]).encode()
+
+    return CoeffecientTable(
+        version=version,
+        digest=hashlib.blake2b(content, digest_size=8).hexdigest(),
+        default=default_row,
+        countries=country_rows,
+        table=np.ascontiguousarray(table.T),
+    )
+
+
+class CoeffecientRegistry:
+    """
+    Hot-reloadable registry of Z-score coeffecients backed by a JSON file.
+
+    The file is checked for changes at most once per `check_interval` seconds
+    when the table is read, so every gunicorn worker picks up a new version
+    without a restart. A new version is swapped in with a single reference
+    assignment: a reader holding a `CoeffecientTable` never sees a mix of two
+    versions.
+    """
+
+    def __init__(
+        self, path: str = DEFAULT_COEFFECIENTS_FILE, check_interval: float = 5.0
+    ):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._table: Optional[CoeffecientTable] = None
+        self._checked_at = 0.0
+
+    def configure(
+        self, *, path: Optional[str] = None, check_interval: Optional[float] = None
+    ) -> None:
+        if path is not None:
+            self.path = path
+        if check_interval is not None:
+            self.check_interval = check_interval
+        self._table = None
+
+    def _file_version(self) -> Tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_ino
+
+    def load(self) -> CoeffecientTable:
+        """
+        Load the coeffecients file and swap in the new version.
+        """
+        with self._lock:
+            version = self._file_version()
+            with open(self.path) as f:
+                data = json.load(f)
+            table = build_table(data["default"], data["countries"], version=version)
+            self._table = table
+            self._checked_at = time.monotonic()
+            logger.info(f"Loaded Z-score coeffecients version {version}")
+            return table
+
+    def get(self) -> CoeffecientTable:
+        """
+        Get the current version, reloading it if the file has changed.
+        """
+        table = self._table
+        if table is None:
+            return self.load()
+
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return table
+
+        self._checked_at = now
+        try:
+            if self._file_version() != table.version:
+                return self.load()
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Keeping Z-score coeffecients version {table.version}: {e}")
+        return table
+
+    def save(
+        self, default: Sequence[float], countries: Dict[str, Sequence[float]]
+    ) -> CoeffecientTable:
+        """
+        Atomically write a new version of the coeffecients file and load it.
+        """
+        build_table(default, countries)
+
+        data = {"default": list(default), "countries": countries}
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, self.path)
+        return self.load()
+
+
+coeffecient_registry = CoeffecientRegistry()
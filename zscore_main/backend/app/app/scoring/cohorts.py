@@ -0,0 +1,123 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+
+def percentile_ranks(cohort: np.ndarray, zscores: ArrayLike) -> np.ndarray:
+    """
+    Rank Z-scores within a cohort with two binary searches each.
+
+    The percentile rank counts the cohort scores below a score and half of
+    those equal to it.
+
+    Args:
+        cohort (np.ndarray): sorted z-scores of the cohort
+        zscores (ArrayLike): z-scores to rank
+
+    Returns:
+        np.ndarray: percentile ranks in [0, 100], `nan` for an empty cohort or
+            a `nan` score
+    """
+    z = np.asarray(zscores, dtype=np.float64)
+    if not len(cohort):
+        return np.full(z.shape, np.nan)
+
+    below = np.searchsorted(cohort, z, side="left")
+    equal = np.searchsorted(cohort, z, side="right") - below
+    # Counted in halves so that the only rounding is the final division
+    ranks = (2 * below + equal) * 50.0 / len(cohort)
+    ranks[np.isnan(z)] = np.nan
+    return ranks
+
+
+class CohortIndex:
+    """
+    Sorted stored Z-scores per country and year cohort.
+
+    Cohorts are loaded from storage on first use, and kept sorted as scores
+    are written by this worker with a binary search per insertion or removal.
+    They expire after `ttl` seconds, so scores written by other workers are
+    picked up on the next load.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._cohorts: Dict[Tuple[str, int], Tuple[float, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self._cohorts)
+
+    def configure(self, *, ttl: Optional[float] = None) -> None:
+        if ttl is not None:
+            self.ttl = ttl
+        self.clear()
+
+    def get(self, country_iso_code: str, year: int) -> Optional[np.ndarray]:
+        """
+        Get the sorted scores of a cohort, `None` if not loaded or expired.
+        """
+        entry = self._cohorts.get((country_iso_code.lower(), year))
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def load(self, country_iso_code: str, year: int, zscores: ArrayLike) -> np.ndarray:
+        """
+        Swap in all scores of a cohort.
+        """
+        cohort = np.sort(np.asarray(zscores, dtype=np.float64))
+        with self._lock:
+            self._cohorts[(country_iso_code.lower(), year)] = (
+                time.monotonic() + self.ttl,
+                cohort,
+            )
+        return cohort
+
+    def update(
+        self,
+        country_iso_code: str,
+        year: int,
+        old: Optional[float],
+        new: Optional[float],
+    ) -> None:
+        """
+        Replace one score of a loaded cohort, keeping it sorted.
+
+        Args:
+            country_iso_code (str): country iso code
+            year (int): year
+            old (float): score to remove, if any
+            new (float): score to insert, if any
+        """
+        key = (country_iso_code.lower(), year)
+        with self._lock:
+            entry = self._cohorts.get(key)
+            if entry is None:
+                return
+            expires, cohort = entry
+            # Readers may hold the previous array, so it is never modified
+            if old is not None:
+                index = np.searchsorted(cohort, old)
+                if index < len(cohort) and cohort[index] == old:
+                    cohort = np.delete(cohort, index)
+            if new is not None:
+                cohort = np.insert(cohort, np.searchsorted(cohort, new), new)
+            self._cohorts[key] = (expires, cohort)
+
+    def discard(self, country_iso_code: str, year: int) -> None:
+        """
+        Drop a cohort, so that it is loaded again from storage on next use.
+        """
+        with self._lock:
+            self._cohorts.pop((country_iso_code.lower(), year), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cohorts.clear()
+
+
+cohort_index = CohortIndex()
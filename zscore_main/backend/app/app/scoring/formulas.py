@@ -0,0 +1,266 @@
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+
+class Ratio(NamedTuple):
+    """
+    Ratio of two financial fields, or a single field without a denominator.
+    """
+
+    numerator: str
+    denominator: Optional[str] = None
+
+
+def calc_ratio(
+    ratio: Ratio, columns: Mapping[str, ArrayLike], out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Calculate a ratio over columnar financial data.
+
+    Zero denominators yield `inf`/`nan` instead of raising.
+
+    Args:
+        ratio (Ratio): ratio to calculate
+        columns (Mapping[str, ArrayLike]): arrays for the fields of the ratio
+        out (np.ndarray): array to write the ratio to, a new one by default
+
+    Returns:
+        np.ndarray: ratio, one per row
+    """
+    numerator = np.asarray(columns[ratio.numerator], dtype=np.float64)
+    if ratio.denominator is None:
+        if out is None:
+            return numerator.copy()
+        np.copyto(out, numerator)
+        return out
+
+    denominator = np.asarray(columns[ratio.denominator], dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.divide(numerator, denominator, out=out)
+
+
+class Formula(NamedTuple):
+    """
+    Z-score formula as a linear combination of ratios.
+
+        Z = intercept + c1 * R1 + c2 * R2 + ... + cn * Rn
+
+    Formulas without `coeffecients` take the coeffecients of the country from
+    the coeffecient registry. Scores below the first of `zones` are in the
+    distress zone, above the second one in the safe zone, and in the grey zone
+    in between.
+    """
+
+    name: str
+    ratios: Tuple[Ratio, ...]
+    coeffecients: Optional[Tuple[float, ...]] = None
+    intercept: float = 0.0
+    zones: Optional[Tuple[float, float]] = None
+    description: str = ""
+
+
+class CompiledFormula:
+    """
+    Vectorized kernel of a `Formula`.
+
+    Compiling resolves the fields read by the formula and its fixed
+    coeffecients once, so evaluating it is a fixed sequence of in-place NumPy
+    operations over the columns.
+    """
+
+    def __init__(self, formula: Formula):
+        if formula.coeffecients is not None and len(formula.coeffecients) != len(
+            formula.ratios
+        ):
+            raise ValueError(f"One coeffecient per ratio is needed: {formula.name}")
+
+        self.formula = formula
+        self.name = formula.name
+        self.ratios = formula.ratios
+        self.fields = tuple(
+            sorted(
+                {
+                    field
+                    for ratio in formula.ratios
+                    for field in ratio
+                    if field is not None
+                }
+            )
+        )
+        self.coeffecients = (
+            None
+            if formula.coeffecients is None
+            else np.asarray(formula.coeffecients, dtype=np.float64)
+        )
+        self.intercept = formula.intercept
+        self.zones = formula.zones
+
+    def _coeffecients(self, coeffecients: Optional[ArrayLike]) -> np.ndarray:
+        if coeffecients is None:
+            coeffecients = self.coeffecients
+        if coeffecients is None:
+            raise ValueError(f"Coeffecients are needed for formula: {self.name}")
+        return np.asarray(coeffecients, dtype=np.float64).T
+
+    def __call__(
+        self,
+        columns: Mapping[str, ArrayLike],
+        coeffecients: Optional[ArrayLike] = None,
+    ) -> np.ndarray:
+        """
+        Evaluate the formula over columnar financial data.
+
+        Terms are summed left to right, so every row gets exactly the same float
+        result as the scalar formula. Zero denominators yield `inf`/`nan`
+        instead of raising.
+
+        Args:
+            columns (Mapping[str, ArrayLike]): arrays for each of `fields`
+            coeffecients (ArrayLike): coeffecients of shape (k,) or (n, k),
+                required if the formula has none of its own
+
+        Returns:
+            np.ndarray: z-scores
+        """
+        c = self._coeffecients(coeffecients)
+
+        # Accumulate in place to avoid one temporary array per ratio
+        z = calc_ratio(self.ratios[0], columns)
+        z *= c[0]
+        term = np.empty_like(z)
+        for i, ratio in enumerate(self.ratios[1:], start=1):
+            calc_ratio(ratio, columns, out=term)
+            term *= c[i]
+            z += term
+        if self.intercept:
+            z += self.intercept
+
+        return z
+
+    def combine(
+        self,
+        ratios: Mapping[Ratio, np.ndarray],
+        coeffecients: Optional[ArrayLike] = None,
+    ) -> np.ndarray:
+        """
+        Evaluate the formula over ratios calculated beforehand.
+
+        Gives exactly the same result as calling the formula, so several
+        formulas can share the ratios they have in common.
+
+        Args:
+            ratios (Mapping[Ratio, np.ndarray]): arrays for each of `ratios`
+            coeffecients (ArrayLike): coeffecients of shape (k,) or (n, k),
+                required if the formula has none of its own
+
+        Returns:
+            np.ndarray: z-scores
+        """
+        c = self._coeffecients(coeffecients)
+
+        z = ratios[self.ratios[0]] * c[0]
+        term = np.empty_like(z)
+        for i, ratio in enumerate(self.ratios[1:], start=1):
+            np.multiply(ratios[ratio], c[i], out=term)
+            z += term
+        if self.intercept:
+            z += self.intercept
+
+        return z
+
+
+ALTMAN_Z = Formula(
+    name="z",
+    ratios=(
+        Ratio("working_capital", "total_assets"),
+        Ratio("retained_earnings", "total_assets"),
+        Ratio("ebit", "total_assets"),
+        Ratio("equity", "total_liabilities"),
+        Ratio("sales", "total_assets"),
+    ),
+    zones=(1.81, 2.99),
+    description="Altman Z-score with the coeffecients of the country.",
+)
+
+ALTMAN_Z_PRIVATE = Formula(
+    name="z_private",
+    ratios=ALTMAN_Z.ratios,
+    coeffecients=(0.717, 0.847, 3.107, 0.420, 0.998),
+    zones=(1.23, 2.9),
+    description="Altman Z'-score for private firms.",
+)
+
+ALTMAN_Z_NON_MANUFACTURING = Formula(
+    name="z_non_manufacturing",
+    ratios=ALTMAN_Z.ratios[:4],
+    coeffecients=(6.56, 3.26, 6.72, 1.05),
+    zones=(1.1, 2.6),
+    description="Altman Z''-score for non-manufacturers.",
+)
+
+ALTMAN_Z_EMERGING_MARKETS = Formula(
+    name="z_emerging_markets",
+    ratios=ALTMAN_Z_NON_MANUFACTURING.ratios,
+    coeffecients=ALTMAN_Z_NON_MANUFACTURING.coeffecients,
+    intercept=3.25,
+    zones=(4.35, 5.85),
+    description="Altman Z''-score for emerging markets.",
+)
+
+# Size is the log of total assets as given, not deflated by a price index.
+# Without the prior year, both terms comparing net income to it are 0.
+OHLSON_O = Formula(
+    name="ohlson_o",
+    ratios=(
+        Ratio("log_total_assets"),
+        Ratio("total_liabilities", "total_assets"),
+        Ratio("working_capital", "total_assets"),
+        Ratio("current_liabilities", "current_assets"),
+        Ratio("liabilities_exceed_assets"),
+        Ratio("net_income", "total_assets"),
+        Ratio("funds_from_operations", "total_liabilities"),
+        Ratio("net_loss_two_years"),
+        Ratio("net_income_change"),
+    ),
+    coeffecients=(-0.407, 6.03, -1.43, 0.0757, -1.72, -2.37, -1.83, 0.285, -0.521),
+    intercept=-1.32,
+    description="Ohlson O-score.",
+)
+
+ZMIJEWSKI = Formula(
+    name="zmijewski",
+    ratios=(
+        Ratio("net_income", "total_assets"),
+        Ratio("total_liabilities", "total_assets"),
+        Ratio("current_assets", "current_liabilities"),
+    ),
+    coeffecients=(-4.513, 5.679, 0.004),
+    intercept=-4.336,
+    description="Zmijewski score.",
+)
+
+DEFAULT_FORMULA = ALTMAN_Z.name
+
+FORMULAS: Dict[str, CompiledFormula] = {}
+
+
+def register_formula(formula: Formula) -> CompiledFormula:
+    """
+    Compile a formula and make it selectable by its name.
+    """
+    compiled = CompiledFormula(formula)
+    FORMULAS[formula.name] = compiled
+    return compiled
+
+
+for _formula in (
+    ALTMAN_Z,
+    ALTMAN_Z_PRIVATE,
+    ALTMAN_Z_NON_MANUFACTURING,
+    ALTMAN_Z_EMERGING_MARKETS,
+    OHLSON_O,
+    ZMIJEWSKI,
+):
+    register_formula(_formula)
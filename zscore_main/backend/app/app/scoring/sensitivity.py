@@ -0,0 +1,186 @@
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .batch import DERIVED_FIELDS, calc_zscores, gather_coeffecients
+from .coeffecients import CoeffecientTable, CountryCodes
+from .formulas import DEFAULT_FORMULA, FORMULAS, CompiledFormula, calc_ratio
+
+
+def calc_grid(
+    columns: Mapping[str, ArrayLike],
+    country_code: str,
+    perturbations: Mapping[str, Sequence[float]],
+    formula: str = DEFAULT_FORMULA,
+    coeffecients: Optional[CoeffecientTable] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Calculate Z-scores of one financial year over a grid of perturbations.
+
+    Each field is scaled by `1 + change` for each of its changes while the
+    other fields keep their values. The whole grid is scored with a single
+    kernel call.
+
+    Args:
+        columns (Mapping[str, ArrayLike]): one row of financial data
+        country_code (str): country iso code
+        perturbations (Mapping[str, Sequence[float]]): relative changes per
+            each field
+        formula (str): formula name
+        coeffecients (CoeffecientTable): defaults to the current registry version
+
+    Returns:
+        Dict[str, np.ndarray]: z-scores per each field, one per each change
+    """
+    fields = list(perturbations)
+    changes = [np.asarray(perturbations[field], dtype=np.float64) for field in fields]
+    lengths = np.fromiter((len(change) for change in changes), dtype=np.intp)
+    offsets = np.cumsum(lengths)
+
+    grid = {
+        field: np.repeat(np.asarray(column)[:1], offsets[-1] if len(fields) else 0)
+        for field, column in columns.items()
+    }
+    for field, change, end, length in zip(fields, changes, offsets, lengths):
+        grid[field][end - length : end] *= 1 + change
+
+    zscores = calc_zscores(grid, country_code, coeffecients, formulas=formula)
+    return dict(zip(fields, np.split(zscores, offsets[:-1])))
+
+
+def linearize(
+    formula: CompiledFormula,
+    columns: Mapping[str, ArrayLike],
+    field: str,
+    coeffecients: ArrayLike,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Write a formula as a function of one field, the others being fixed.
+
+        Z(x) = a + b * x + d / x
+
+    Args:
+        formula (CompiledFormula): formula of ratios of financial fields only
+        columns (Mapping[str, ArrayLike]): arrays for each of `formula.fields`
+        field (str): financial field
+        coeffecients (ArrayLike): coeffecients of shape (k,) or (n, k)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: a, b and d, one per row
+    """
+    if any(name in DERIVED_FIELDS for name in formula.fields):
+        raise ValueError(f"Formula is not a function of ratios: {formula.name}")
+
+    c = np.asarray(coeffecients, dtype=np.float64).T
+    shape = np.shape(columns[formula.fields[0]])
+    a = np.full(shape, formula.intercept)
+    b = np.zeros(shape)
+    d = np.zeros(shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i, ratio in enumerate(formula.ratios):
+            numerator, denominator = ratio
+            if numerator == field and denominator == field:
+                a += c[i]
+            elif numerator == field:
+                b += (
+                    c[i]
+                    if denominator is None
+                    else c[i] / np.asarray(columns[denominator], dtype=np.float64)
+                )
+            elif denominator == field:
+                d += c[i] * np.asarray(columns[numerator], dtype=np.float64)
+            else:
+                a += c[i] * calc_ratio(ratio, columns)
+    return a, b, d
+
+
+def _formula_coeffecients(
+    formula: CompiledFormula,
+    country_codes: CountryCodes,
+    coeffecients: Optional[CoeffecientTable],
+) -> np.ndarray:
+    if formula.coeffecients is not None:
+        return formula.coeffecients
+    return gather_coeffecients(country_codes, coeffecients)
+
+
+def calc_derivatives(
+    columns: Mapping[str, ArrayLike],
+    country_codes: CountryCodes,
+    fields: Sequence[str],
+    formula: str = DEFAULT_FORMULA,
+    coeffecients: Optional[CoeffecientTable] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Calculate the partial derivatives of Z with respect to financial fields.
+
+    Args:
+        columns (Mapping[str, ArrayLike]): arrays for each of `FINANCIAL_FIELDS`
+        country_codes (CountryCodes): one country code or id, or one per row
+        fields (Sequence[str]): financial fields
+        formula (str): name of a formula of ratios of financial fields only
+        coeffecients (CoeffecientTable): defaults to the current registry version
+
+    Returns:
+        Dict[str, np.ndarray]: dZ/dx per each field, one per row
+    """
+    compiled = FORMULAS[formula]
+    c = _formula_coeffecients(compiled, country_codes, coeffecients)
+
+    derivatives = {}
+    for field in fields:
+        _, b, d = linearize(compiled, columns, field, c)
+        x = np.asarray(columns[field], dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            derivatives[field] = b - d / (x * x)
+    return derivatives
+
+
+def calc_break_even(
+    columns: Mapping[str, ArrayLike],
+    country_codes: CountryCodes,
+    fields: Sequence[str],
+    thresholds: Sequence[float],
+    formula: str = DEFAULT_FORMULA,
+    coeffecients: Optional[CoeffecientTable] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Calculate the values of financial fields at which Z reaches thresholds.
+
+    Solves `Z(x) = t` for each field alone, the others being fixed. Of two
+    solutions, the one closest to the current value is taken.
+
+    Args:
+        columns (Mapping[str, ArrayLike]): arrays for each of `FINANCIAL_FIELDS`
+        country_codes (CountryCodes): one country code or id, or one per row
+        fields (Sequence[str]): financial fields
+        thresholds (Sequence[float]): z-score thresholds
+        formula (str): name of a formula of ratios of financial fields only
+        coeffecients (CoeffecientTable): defaults to the current registry version
+
+    Returns:
+        Dict[str, np.ndarray]: values of shape (n, len(thresholds)) per each
+            field, `nan` where Z never reaches the threshold
+    """
+    compiled = FORMULAS[formula]
+    c = _formula_coeffecients(compiled, country_codes, coeffecients)
+    t = np.asarray(thresholds, dtype=np.float64)
+
+    break_even = {}
+    for field in fields:
+        a, b, d = linearize(compiled, columns, field, c)
+        x = np.asarray(columns[field], dtype=np.float64)[..., None]
+        a, b, d = a[..., None] - t, b[..., None], d[..., None]
+
+        # b * x^2 + (a - t) * x + d = 0, degenerating to a linear equation
+        # when x is only a numerator or only a denominator
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sqrt = np.sqrt(a * a - 4 * b * d)
+            first = (-a + sqrt) / (2 * b)
+            second = (-a - sqrt) / (2 * b)
+            closest = np.where(np.abs(first - x) <= np.abs(second - x), first, second)
+            values = np.where(d == 0, -a / b, np.where(b == 0, -d / a, closest))
+        values[~np.isfinite(values)] = np.nan
+        break_even[field] = values
+    return break_even
@@ -0,0 +1,223 @@
+import warnings
+from typing import Dict, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .batch import DERIVED_FIELDS, calc_zscores
+from .coeffecients import CoeffecientTable, CountryCodes, country_id, country_ids
+from .formulas import DEFAULT_FORMULA, FORMULAS
+from .zones import ZONES, classify_zones
+
+# Rows scored per kernel call, bounding the memory of the sampled financials
+SIMULATION_CHUNK_SIZE = 1 << 16
+
+
+class Uncertainty(NamedTuple):
+    """
+    Uncertainty of one financial field, relative to its value.
+
+    Values are drawn from a normal distribution with a relative standard
+    deviation of `relative_std`, or uniformly between the relative `bounds`.
+    """
+
+    relative_std: float = 0.0
+    bounds: Optional[Tuple[float, float]] = None
+
+
+def simulate_zscores(
+    columns: Mapping[str, ArrayLike],
+    country_codes: CountryCodes,
+    uncertainty: Mapping[str, Uncertainty],
+    samples: int,
+    formula: str = DEFAULT_FORMULA,
+    coeffecients: Optional[CoeffecientTable] = None,
+    seed: Optional[int] = None,
+    chunk_size: int = SIMULATION_CHUNK_SIZE,
+) -> np.ndarray:
+    """
+    Draw Z-scores of financial years under uncertainty of their fields.
+
+    Samples are drawn and scored in chunks of about `chunk_size` rows, so only
+    the z-scores are kept for all samples. With a seed the draw is
+    reproducible.
+
+    Args:
+        columns (Mapping[str, ArrayLike]): arrays for each of `FINANCIAL_FIELDS`
+        country_codes (CountryCodes): one country code, or one per row
+        uncertainty (Mapping[str, Uncertainty]): uncertainty per each field
+        samples (int): samples per each row
+        formula (str): name of a formula of ratios of financial fields only
+        coeffecients (CoeffecientTable): defaults to the current registry version
+        seed (int): seed of the random generator
+        chunk_size (int): rows scored per kernel call
+
+    Returns:
+        np.ndarray: z-scores of shape (n, samples)
+    """
+    base, ids = _simulation_inputs(columns, country_codes, formula)
+    return _draw_zscores(
+        base,
+        ids,
+        uncertainty,
+        samples,
+        formula,
+        coeffecients,
+        np.random.default_rng(seed),
+        chunk_size,
+    )
+
+
+def simulate_distribution(
+    columns: Mapping[str, ArrayLike],
+    country_codes: CountryCodes,
+    uncertainty: Mapping[str, Uncertainty],
+    samples: int,
+    percentiles: Sequence[float],
+    zones: Optional[Tuple[float, float]] = None,
+    formula: str = DEFAULT_FORMULA,
+    coeffecients: Optional[CoeffecientTable] = None,
+    seed: Optional[int] = None,
+    chunk_size: int = SIMULATION_CHUNK_SIZE,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Draw and summarize Z-scores of financial years under uncertainty.
+
+    Rows are simulated and summarized in blocks of about `chunk_size` z-scores,
+    so the memory does not grow with `rows * samples`. With a seed the draw is
+    reproducible.
+
+    Args:
+        columns (Mapping[str, ArrayLike]): arrays for each of `FINANCIAL_FIELDS`
+        country_codes (CountryCodes): one country code, or one per row
+        uncertainty (Mapping[str, Uncertainty]): uncertainty per each field
+        samples (int): samples per each row
+        percentiles (Sequence[float]): percentiles in [0, 100]
+        zones (Tuple[float, float]): distress and safe zone thresholds
+        formula (str): name of a formula of ratios of financial fields only
+        coeffecients (CoeffecientTable): defaults to the current registry version
+        seed (int): seed of the random generator
+        chunk_size (int): z-scores drawn per kernel call
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: as `summarize_distribution`
+    """
+    base, ids = _simulation_inputs(columns, country_codes, formula)
+    rows = len(ids)
+    rng = np.random.default_rng(seed)
+    means = np.empty(rows, dtype=np.float64)
+    values = np.empty((rows, len(percentiles)), dtype=np.float64)
+    probabilities = np.empty((rows, 0 if zones is None else len(ZONES)))
+    block = max(1, chunk_size // max(samples, 1))
+    for start in range(0, rows, block):
+        stop = min(start + block, rows)
+        zscores = _draw_zscores(
+            {field: column[start:stop] for field, column in base.items()},
+            ids[start:stop],
+            uncertainty,
+            samples,
+            formula,
+            coeffecients,
+            rng,
+            chunk_size,
+        )
+        (
+            means[start:stop],
+            values[start:stop],
+            probabilities[start:stop],
+        ) = summarize_distribution(zscores, percentiles, zones)
+    return means, values, probabilities
+
+
+def _simulation_inputs(
+    columns: Mapping[str, ArrayLike], country_codes: CountryCodes, formula: str
+) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    compiled = FORMULAS[formula]
+    if any(field in DERIVED_FIELDS for field in compiled.fields):
+        raise ValueError(f"Formula is not a function of ratios: {formula}")
+
+    rows = len(np.asarray(columns["year"]))
+    codes = np.asarray(country_codes)
+    if codes.ndim == 0:
+        ids = np.full(rows, country_id(codes.item()))
+    else:
+        ids = country_ids(codes)
+    base = {
+        field: np.asarray(columns[field], dtype=np.float64)[:, None]
+        for field in compiled.fields
+    }
+    return base, ids
+
+
+def _draw_zscores(
+    base: Mapping[str, np.ndarray],
+    ids: np.ndarray,
+    uncertainty: Mapping[str, Uncertainty],
+    samples: int,
+    formula: str,
+    coeffecients: Optional[CoeffecientTable],
+    rng: np.random.Generator,
+    chunk_size: int,
+) -> np.ndarray:
+    rows = len(ids)
+    zscores = np.empty((rows, samples), dtype=np.float64)
+    step = max(1, chunk_size // max(rows, 1))
+    for start in range(0, samples, step):
+        size = min(step, samples - start)
+        chunk = {}
+        for field, values in base.items():
+            field_uncertainty = uncertainty.get(field)
+            if field_uncertainty is None:
+                chunk[field] = np.broadcast_to(values, (rows, size)).ravel()
+                continue
+            if field_uncertainty.bounds is not None:
+                low, high = field_uncertainty.bounds
+                factor = rng.uniform(1 + low, 1 + high, (rows, size))
+            else:
+                factor = rng.normal(1.0, field_uncertainty.relative_std, (rows, size))
+            factor *= values
+            chunk[field] = factor.ravel()
+        zscores[:, start : start + size] = calc_zscores(
+            chunk, np.repeat(ids, size), coeffecients, formulas=formula
+        ).reshape(rows, size)
+    return zscores
+
+
+def summarize_distribution(
+    zscores: np.ndarray,
+    percentiles: Sequence[float],
+    zones: Optional[Tuple[float, float]] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Summarize sampled Z-scores per row.
+
+    Samples which could not be scored are left out of the mean and the
+    percentiles, and fall in no zone.
+
+    Args:
+        zscores (np.ndarray): z-scores of shape (n, samples)
+        percentiles (Sequence[float]): percentiles in [0, 100]
+        zones (Tuple[float, float]): distress and safe zone thresholds
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: means of shape (n,),
+            percentiles of shape (n, len(percentiles)), and probabilities of
+            each of `ZONES` of shape (n, 3), or (n, 0) without zones
+    """
+    rows, samples = zscores.shape
+    # Samples drawing a zero or negative denominator are not finite
+    zscores = np.where(np.isfinite(zscores), zscores, np.nan)
+    # Rows without any scored sample are `nan`
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        means = np.nanmean(zscores, axis=1)
+        values = np.nanpercentile(zscores, percentiles, axis=1).T.reshape(rows, -1)
+    if zones is None:
+        return means, values, np.empty((rows, 0))
+
+    codes = classify_zones(zscores, zones)
+    probabilities = np.stack(
+        [np.count_nonzero(codes == code, axis=1) for code in range(len(ZONES))],
+        axis=1,
+    ) / max(samples, 1)
+    return means, values, probabilities
@@ -0,0 +1,106 @@
+from typing import NamedTuple, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+
+class Trends(NamedTuple):
+    """
+    Z-score trends of companies over a dense companies x years matrix.
+    """
+
+    # (k,), every year from the first to the last one of all companies
+    years: np.ndarray
+    # (n, k), `nan` for the years a company has no score for
+    zscores: np.ndarray
+    # (n, k), change from the prior year, `nan` without both years
+    deltas: np.ndarray
+    # (n,), least-squares slope per year, `nan` with less than two years
+    slopes: np.ndarray
+    # (n,), consecutive declines up to the latest year of each company
+    declines: np.ndarray
+
+
+def zscore_matrix(
+    groups: ArrayLike, years: ArrayLike, zscores: ArrayLike, companies: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scatter Z-scores into a companies x years matrix.
+
+    Args:
+        groups (ArrayLike): company index in [0, companies) per each row
+        years (ArrayLike): year per each row
+        zscores (ArrayLike): z-score per each row
+        companies (int): number of companies
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: years of shape (k,), and z-scores of
+            shape (companies, k)
+    """
+    years = np.asarray(years, dtype=np.int64)
+    if not len(years):
+        return years, np.empty((companies, 0))
+
+    first = years.min()
+    axis = np.arange(first, years.max() + 1)
+    matrix = np.full((companies, len(axis)), np.nan)
+    matrix[np.asarray(groups), years - first] = zscores
+    return axis, matrix
+
+
+def calc_trends(
+    groups: ArrayLike, years: ArrayLike, zscores: ArrayLike, companies: int
+) -> Trends:
+    """
+    Calculate year-over-year deltas, slopes and consecutive declines.
+
+    Everything is calculated with matrix operations over all companies at
+    once. Years missing for a company are left out of its slope, and break
+    its declines.
+
+    Args:
+        groups (ArrayLike): company index in [0, companies) per each row
+        years (ArrayLike): year per each row
+        zscores (ArrayLike): z-score per each row
+        companies (int): number of companies
+
+    Returns:
+        Trends: trends per each company
+    """
+    axis, matrix = zscore_matrix(groups, years, zscores, companies)
+    if not len(axis):
+        return Trends(
+            years=axis,
+            zscores=matrix,
+            deltas=matrix,
+            slopes=np.full(companies, np.nan),
+            declines=np.zeros(companies, dtype=np.intp),
+        )
+
+    deltas = np.full_like(matrix, np.nan)
+    deltas[:, 1:] = matrix[:, 1:] - matrix[:, :-1]
+
+    # Least squares over the years each company has
+    present = ~np.isnan(matrix)
+    counts = present.sum(axis=1)
+    x = np.where(present, axis - axis[0], 0.0)
+    y = np.where(present, matrix, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = x.sum(axis=1) / counts
+        y_mean = y.sum(axis=1) / counts
+        dx = np.where(present, x - x_mean[:, None], 0.0)
+        slopes = (dx * (y - y_mean[:, None])).sum(axis=1) / (dx * dx).sum(axis=1)
+    slopes[counts < 2] = np.nan
+
+    # Length of the run of declines ending at each year, read at the latest
+    # year of each company
+    index = np.arange(len(axis))
+    declining = deltas < 0
+    last_break = np.maximum.accumulate(np.where(declining, -1, index), axis=1)
+    runs = index - last_break
+    latest = len(axis) - 1 - np.argmax(present[:, ::-1], axis=1)
+    declines = np.where(counts > 0, runs[np.arange(companies), latest], 0)
+
+    return Trends(
+        years=axis, zscores=matrix, deltas=deltas, slopes=slopes, declines=declines
+    )
@@ -0,0 +1,132 @@
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .batch import MISSING_YEAR, Formulas
+from .countries import validate_country_ids
+from .formulas import DEFAULT_FORMULA, FORMULAS
+
+RowErrors = Dict[str, np.ndarray]
+
+
+def validate_ids(ids: ArrayLike) -> np.ndarray:
+    """
+    Validate a column of company ids without a per-row Python call.
+
+    Args:
+        ids (ArrayLike): company ids
+
+    Returns:
+        np.ndarray: validated values, like `str.isnumeric` per each id
+    """
+    ids = np.asarray(ids)
+    if not len(ids):
+        return np.empty(0, dtype=bool)
+    return np.char.isnumeric(ids.astype(str))
+
+
+def _duplicates(keys: np.ndarray, years: np.ndarray) -> np.ndarray:
+    # Equal neighbours after one sort by key and year are duplicates, both of
+    # them are flagged
+    order = np.lexsort((years, keys))
+    sorted_keys, sorted_years = keys[order], years[order]
+    same = (sorted_keys[1:] == sorted_keys[:-1]) & (
+        sorted_years[1:] == sorted_years[:-1]
+    )
+    duplicate = np.zeros(len(years), dtype=bool)
+    duplicate[order[1:][same]] = True
+    duplicate[order[:-1][same]] = True
+    return duplicate
+
+
+def validate_rows(
+    columns: Mapping[str, ArrayLike],
+    formulas: Formulas = DEFAULT_FORMULA,
+    country_ids: Optional[ArrayLike] = None,
+    company_ids: Optional[ArrayLike] = None,
+    groups: Optional[ArrayLike] = None,
+) -> RowErrors:
+    """
+    Validate a batch of financial years with one mask per check.
+
+    Every row is checked, so a single bad row doesn't hide the others. The
+    fields read by the formula of each row must be present, and its
+    denominators positive.
+
+    Args:
+        columns (Mapping[str, ArrayLike]): `year` and the fields of the formulas
+        formulas (Formulas): one formula name, or one per row
+        country_ids (ArrayLike): country id per each row, not checked by default
+        company_ids (ArrayLike): company id per each row, not checked by default
+        groups (ArrayLike): company per each row, all rows are one by default
+
+    Returns:
+        RowErrors: mask of the failing rows per each error detail
+    """
+    years = np.asarray(columns["year"], dtype=np.int64)
+    errors: RowErrors = {}
+    if country_ids is not None:
+        errors["Invalid country code"] = ~validate_country_ids(country_ids)
+    if company_ids is not None:
+        errors["Invalid company id"] = ~validate_ids(company_ids)
+
+    missing_year = years == MISSING_YEAR
+    errors["Missing year"] = missing_year
+    keys = np.zeros(len(years), dtype=np.intp) if groups is None else groups
+    keys = np.unique(np.asarray(keys), return_inverse=True)[1].reshape(-1)
+    errors["Duplicate year"] = _duplicates(keys, years) & ~missing_year
+
+    def flag(detail: str, mask: np.ndarray) -> None:
+        errors[detail] = errors[detail] | mask if detail in errors else mask
+
+    # Only the fields read by the formula of each row are checked, derived
+    # fields are left to the fields they are derived from
+    names = np.asarray(formulas)
+    for name in np.unique(names).tolist():
+        formula = FORMULAS.get(name)
+        if formula is None:
+            continue
+        rows = names == name if names.ndim else np.ones(len(years), dtype=bool)
+        denominators = {ratio.denominator for ratio in formula.ratios}
+        for field in formula.fields:
+            if field not in columns:
+                continue
+            values = np.asarray(columns[field], dtype=np.float64)
+            missing = rows & np.isnan(values)
+            flag(f"Missing {field}", missing)
+            if field in denominators:
+                flag(f"Zero or negative {field}", rows & ~missing & ~(values > 0))
+
+    return {detail: mask for detail, mask in errors.items() if mask.any()}
+
+
+def invalid_rows(errors: RowErrors, size: int) -> np.ndarray:
+    """
+    Combine the masks of `validate_rows` into one.
+
+    Args:
+        errors (RowErrors): mask of the failing rows per each error detail
+        size (int): number of rows
+
+    Returns:
+        np.ndarray: true for the rows failing any check
+    """
+    invalid = np.zeros(size, dtype=bool)
+    for mask in errors.values():
+        invalid |= mask
+    return invalid
+
+
+def error_details(errors: RowErrors, index: int) -> List[str]:
+    """
+    Get the error details of one row.
+
+    Args:
+        errors (RowErrors): mask of the failing rows per each error detail
+        index (int): index of the row
+
+    Returns:
+        List[str]: details of the checks the row fails, in check order
+    """
+    return [detail for detail, mask in errors.items() if mask[index]]
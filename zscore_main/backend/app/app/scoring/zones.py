@@ -0,0 +1,84 @@
+from typing import Optional, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .coeffecients import CountryCodes, country_ids
+
+# Zone names by zone code
+ZONES = ("distress", "grey", "safe")
+
+# Zone code of scores that could not be calculated or classified
+NO_ZONE = -1
+
+
+def classify_zones(
+    zscores: ArrayLike, zones: Tuple[ArrayLike, ArrayLike]
+) -> np.ndarray:
+    """
+    Classify Z-scores into the distress, grey and safe zones.
+
+    Args:
+        zscores (ArrayLike): z-scores
+        zones (Tuple[ArrayLike, ArrayLike]): distress and safe zone thresholds,
+            or one per score, `nan` for formulas without zones
+
+    Returns:
+        np.ndarray: int8 zone codes indexing `ZONES`, `NO_ZONE` for
+            scores that are not finite
+    """
+    z = np.asarray(zscores, dtype=np.float64)
+    lower, upper = (np.asarray(threshold, dtype=np.float64) for threshold in zones)
+    codes = np.asarray(z >= lower).astype(np.int8)
+    codes += z > upper
+    codes[~np.isfinite(z) | np.isnan(lower)] = NO_ZONE
+    return codes
+
+
+def zone_name(code: int) -> Optional[str]:
+    """
+    Get the name of a zone code, `None` for `NO_ZONE`.
+    """
+    return None if code == NO_ZONE else ZONES[code]
+
+
+def zone_histogram(
+    country_codes: CountryCodes, years: ArrayLike, codes: ArrayLike
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Count zones per country and year.
+
+    Rows are bucketed by their pair of country id and year, so the counts take
+    one sort and one `bincount` whatever the number of rows.
+
+    Args:
+        country_codes (CountryCodes): country code or id per each row
+        years (ArrayLike): year per each row
+        codes (ArrayLike): zone code per each row, `NO_ZONE` rows are skipped
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: country ids and years of
+            each bucket, sorted, and counts per each of `ZONES` of shape (m, 3)
+    """
+    zone_codes = np.asarray(codes)
+    row_years = np.asarray(years, dtype=np.int64)
+    ids = np.asarray(country_codes)
+    if not np.issubdtype(ids.dtype, np.integer):
+        ids = country_ids(ids) if len(ids) else np.empty(0, dtype=np.intp)
+
+    classified = zone_codes != NO_ZONE
+    ids, row_years = ids[classified], row_years[classified]
+    zone_codes = zone_codes[classified]
+    if not len(zone_codes):
+        return ids, row_years, np.empty((0, len(ZONES)), dtype=np.int64)
+
+    # Pairs are compared as rows, a key computed from both could overflow
+    keys, buckets = np.unique(
+        np.stack([ids.astype(np.int64), row_years], axis=1),
+        axis=0,
+        return_inverse=True,
+    )
+    counts = np.bincount(
+        buckets.ravel() * len(ZONES) + zone_codes, minlength=len(keys) * len(ZONES)
+    ).reshape(-1, len(ZONES))
+    return keys[:, 0], keys[:, 1], counts
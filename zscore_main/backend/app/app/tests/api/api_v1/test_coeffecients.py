@@ -0,0 +1,91 @@
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Generator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.scoring import coeffecient_registry
+from app.tests.utils.utils import financial_payload, uk_scores
+
+
+@pytest.fixture
+def coeffecients_file(tmp_path: Path) -> Generator:
+    path = tmp_path / "coeffecients.json"
+    shutil.copy(coeffecient_registry.path, path)
+    original = coeffecient_registry.path
+    coeffecient_registry.configure(path=str(path))
+    yield path
+    coeffecient_registry.configure(path=original)
+
+
+def test_read_coeffecients(
+    client: TestClient, normal_user_token_headers: Dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/coeffecients/", headers=normal_user_token_headers
+    )
+
+    assert r.status_code == 200
+    content = r.json()
+    assert content["default"] == [1.0, 1.2, 3.1, 0.4, 1.2]
+    assert content["countries"]["gb"] == [1.2, 1.4, 3.3, 0.6, 1.0]
+
+
+def test_update_coeffecients(
+    client: TestClient,
+    superuser_token_headers: Dict[str, str],
+    coeffecients_file: Path,
+) -> None:
+    data: Dict[str, Any] = {
+        "default": [1.0, 1.2, 3.1, 0.4, 1.2],
+        "countries": {"GB": [2.4, 2.8, 6.6, 1.2, 2.0]},
+    }
+    r = client.put(
+        f"{settings.API_V1_STR}/coeffecients/",
+        headers=superuser_token_headers,
+        json=data,
+    )
+    assert r.status_code == 200
+    assert r.json()["countries"] == {"gb": [2.4, 2.8, 6.6, 1.2, 2.0]}
+
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809",
+        headers=superuser_token_headers,
+        json=financial_payload(),
+    )
+    zscores = [score["zscore"] for score in r.json()["scores"]]
+    expected = [2 * score["zscore"] for score in uk_scores()["scores"]]
+    assert zscores == pytest.approx(expected)
+
+
+def test_update_coeffecients_with_bad_country_code(
+    client: TestClient,
+    superuser_token_headers: Dict[str, str],
+    coeffecients_file: Path,
+) -> None:
+    data: Dict[str, Any] = {"default": [1.0] * 5, "countries": {"xx": [1.0] * 5}}
+    r = client.put(
+        f"{settings.API_V1_STR}/coeffecients/",
+        headers=superuser_token_headers,
+        json=data,
+    )
+
+    assert r.status_code == 422
+    assert r.json() == {"detail": "Invalid country code"}
+
+
+def test_update_coeffecients_by_normal_user(
+    client: TestClient,
+    normal_user_token_headers: Dict[str, str],
+    coeffecients_file: Path,
+) -> None:
+    data: Dict[str, Any] = {"default": [1.0] * 5, "countries": {}}
+    r = client.put(
+        f"{settings.API_V1_STR}/coeffecients/",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+
+    assert r.status_code == 400
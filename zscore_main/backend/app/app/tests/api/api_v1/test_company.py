@@ -1,10 +1,23 @@
+import gzip
+import json
 from typing import Dict
 
+import msgpack
+import numpy as np
+import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from app import schemas, scoring
+from app.core.cache import zscore_cache
 from app.core.config import settings
-from app.tests.utils.utils import default_scores, financial_payload, uk_scores
+from app.core.executor import compute_executor
+from app.tests.utils.utils import (
+    default_scores,
+    financial_payload,
+    random_company_id,
+    uk_scores,
+)
 
 
 def test_financial_scores_in_germany_are_default(
@@ -37,6 +50,184 @@ def test_financial_scores_in_uk(
     assert scores == uk_scores()
 
 
+def test_financial_scores_with_msgpack(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809",
+        headers={
+            **superuser_token_headers,
+            "Content-Type": "application/msgpack",
+            "Accept": "application/msgpack",
+        },
+        data=msgpack.packb(financial_payload()),
+    )
+
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(r.content) == uk_scores()
+
+
+@pytest.mark.parametrize(
+    "accept",
+    [None, "application/json", "application/json, application/msgpack;q=0.5"],
+)
+def test_financial_scores_with_msgpack_body_default_to_json(
+    client: TestClient, superuser_token_headers: Dict[str, str], accept: str
+) -> None:
+    headers = {**superuser_token_headers, "Content-Type": "application/msgpack"}
+    if accept is not None:
+        headers["Accept"] = accept
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809",
+        headers=headers,
+        data=msgpack.packb(financial_payload()),
+    )
+
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    assert r.json() == uk_scores()
+
+
+def test_financial_scores_with_bad_msgpack(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    headers = {**superuser_token_headers, "Content-Type": "application/msgpack"}
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809",
+        headers=headers,
+        data=b"\xc1",
+    )
+    assert r.status_code == 400
+
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809",
+        headers=headers,
+        data=msgpack.packb({"financials": [{"year": "now"}]}),
+    )
+    assert r.status_code == 422
+
+
+def columnar_payload() -> dict:
+    financials = financial_payload()["financials"]
+    return {field: [row[field] for row in financials] for field in financials[0]}
+
+
+def test_financial_scores_with_columnar_payload(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809",
+        headers=superuser_token_headers,
+        json=columnar_payload(),
+    )
+
+    assert r.status_code == 200
+    assert r.json() == uk_scores()
+
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809",
+        headers=superuser_token_headers,
+        params={"columnar": True},
+        json=columnar_payload(),
+    )
+
+    assert r.status_code == 200
+    scores = uk_scores()["scores"]
+    assert r.json() == {
+        field: [score[field] for score in scores]
+        for field in ("year", "zscore", "zone")
+    }
+
+
+def test_financial_scores_columnar_with_ranks(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809",
+        headers=superuser_token_headers,
+        params={"columnar": True, "ranks": True},
+        json=financial_payload(),
+    )
+
+    assert r.status_code == 200
+    content = r.json()
+    assert set(content) == {"year", "zscore", "zone", "percentile"}
+    assert content["zscore"] == [score["zscore"] for score in uk_scores()["scores"]]
+    assert len(content["percentile"]) == 5
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"ebit": [1.0]},
+        {"year": [2020.5, 2019, 2018, 2017, 2016]},
+        {"year": [1e30, 2019, 2018, 2017, 2016]},
+        {"sales": [1.0, None, 1.0, 1.0, 1.0]},
+        {"equity": "1.0"},
+    ],
+)
+def test_financial_scores_with_bad_columnar_payload(
+    client: TestClient, superuser_token_headers: Dict[str, str], change: dict
+) -> None:
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809",
+        headers=superuser_token_headers,
+        json={**columnar_payload(), **change},
+    )
+
+    assert r.status_code == 422
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_financial_scores_with_year_out_of_range(
+    client: TestClient, superuser_token_headers: Dict[str, str], bulk: bool
+) -> None:
+    financials = financial_payload()["financials"]
+    financials[0]["year"] = 2**63
+    if bulk:
+        url = f"{settings.API_V1_STR}/company/bulk"
+        data: dict = {
+            "companies": [
+                {"country_iso_code": "gb", "id": "10149809", "financials": financials}
+            ]
+        }
+    else:
+        url = f"{settings.API_V1_STR}/company/gb/10149809"
+        data = {"financials": financials}
+    r = client.put(url, headers=superuser_token_headers, json=data)
+
+    assert r.status_code == 422
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_financial_scores_with_zero_total_assets(
+    client: TestClient, superuser_token_headers: Dict[str, str], columnar: bool
+) -> None:
+    financials = financial_payload()["financials"]
+    financials[2]["total_assets"] = 0
+    payload: dict = {"financials": financials}
+    if columnar:
+        payload = {field: [row[field] for row in financials] for field in financials[0]}
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/{random_company_id()}",
+        headers=superuser_token_headers,
+        params={"columnar": columnar},
+        json=payload,
+    )
+
+    assert r.status_code == 422
+    assert r.json() == {
+        "detail": [
+            {
+                "row": 2,
+                "year": financials[2]["year"],
+                "detail": "Zero or negative total_assets",
+            }
+        ]
+    }
+
+
 def test_financial_scores_in_france_are_not_same_as_in_uk(
     client: TestClient, superuser_token_headers: Dict[str, str]
 ) -> None:
@@ -76,3 +267,774 @@ def test_financial_scores_with_bad_company_id(
 
     assert r.status_code == 422
     assert r.json() == {"detail": "Invalid company id"}
+
+
+def test_financial_scores_with_formula(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809",
+        headers=superuser_token_headers,
+        params={"formula": "z_emerging_markets"},
+        json=financial_payload(),
+    )
+
+    assert r.status_code == 200
+    scores = r.json()["scores"]
+    columns = scoring.financials_to_columns(
+        schemas.FinancialPayload(**financial_payload()).financials
+    )
+    expected = scoring.calc_zscores(columns, "gb", formulas="z_emerging_markets")
+    assert [s["zscore"] for s in scores] == expected.tolist()
+    assert scores != uk_scores()["scores"]
+
+
+def test_financial_scores_with_bad_formula(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809",
+        headers=superuser_token_headers,
+        params={"formula": "altman"},
+        json=financial_payload(),
+    )
+
+    assert r.status_code == 422
+    assert r.json() == {"detail": "Invalid formula"}
+
+
+def test_financial_model_scores(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    data = financial_payload()
+    data["financials"][0].update(
+        current_assets=100.0,
+        current_liabilities=80.0,
+        funds_from_operations=40.0,
+        net_income=10.0,
+    )
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809/models",
+        headers=superuser_token_headers,
+        json=data,
+    )
+
+    assert r.status_code == 200
+    scores = r.json()["scores"]
+    assert [s["year"] for s in scores] == [s["year"] for s in uk_scores()["scores"]]
+    assert [s["scores"]["z"] for s in scores] == [
+        s["zscore"] for s in uk_scores()["scores"]
+    ]
+    assert set(scores[0]["scores"]) == {"z", "ohlson_o", "zmijewski"}
+    assert scores[0]["scores"]["zmijewski"] is not None
+    assert scores[1]["scores"]["zmijewski"] is None
+
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809/models",
+        headers=superuser_token_headers,
+        params={"formulas": ["z_private", "altman"]},
+        json=data,
+    )
+    assert r.status_code == 422
+    assert r.json() == {"detail": "Invalid formula"}
+
+
+def test_financial_sensitivity(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    data = {
+        "financial": financial_payload()["financials"][0],
+        "perturbations": {"ebit": [-0.5, 0.0, 0.5], "total_assets": [1.0, 5.0]},
+    }
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809/sensitivity",
+        headers=superuser_token_headers,
+        json=data,
+    )
+
+    assert r.status_code == 200
+    content = r.json()
+    assert content["zscore"] == uk_scores()["scores"][0]["zscore"]
+    assert content["zone"] == "safe"
+    ebit, total_assets = content["fields"]
+    assert ebit["field"] == "ebit"
+    assert [p["change"] for p in ebit["grid"]] == [-0.5, 0.0, 0.5]
+    assert ebit["grid"][1]["zscore"] == content["zscore"]
+    assert ebit["derivative"] > 0
+    assert set(ebit["break_even"]) == {"distress", "safe"}
+    assert total_assets["derivative"] < 0
+    assert total_assets["grid"][1]["zone"] == "distress"
+
+
+def test_financial_model_scores_with_zero_total_assets(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    data = financial_payload()
+    data["financials"][0]["total_assets"] = 0
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809/models",
+        headers=superuser_token_headers,
+        json=data,
+    )
+
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["detail"] == "Zero or negative total_assets"
+
+
+def test_financial_sensitivity_with_bad_field(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    data = {
+        "financial": financial_payload()["financials"][0],
+        "perturbations": {"year": [0.1]},
+    }
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809/sensitivity",
+        headers=superuser_token_headers,
+        json=data,
+    )
+
+    assert r.status_code == 422
+    assert r.json() == {"detail": "Invalid field"}
+
+
+def test_financial_distribution(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    data = {
+        **financial_payload(),
+        "uncertainty": {
+            "ebit": {"relative_std": 0.5},
+            "total_assets": {"bounds": [-0.5, 1.0]},
+        },
+    }
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809/distribution",
+        headers=superuser_token_headers,
+        params={"samples": 2000, "seed": 42},
+        json=data,
+    )
+
+    assert r.status_code == 200
+    content = r.json()
+    assert content["samples"] == 2000
+    assert content["seed"] == 42
+    scores = content["scores"]
+    assert [s["zscore"] for s in scores] == [s["zscore"] for s in uk_scores()["scores"]]
+    for score in scores:
+        assert list(score["percentiles"]) == ["p5", "p25", "p50", "p75", "p95"]
+        assert score["percentiles"]["p5"] < score["percentiles"]["p95"]
+        assert sum(score["zones"].values()) == pytest.approx(1.0)
+
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809/distribution",
+        headers=superuser_token_headers,
+        params={"samples": 2000, "seed": 42},
+        json=data,
+    )
+    assert r.json() == content
+
+
+@pytest.mark.parametrize(
+    "route,data,detail",
+    [
+        (
+            "sensitivity",
+            {"perturbations": {"total_assets": [-1.0]}},
+            "Invalid change",
+        ),
+        (
+            "distribution",
+            {"uncertainty": {"total_assets": {"bounds": [-1.0, 0.0]}}},
+            "Invalid bounds",
+        ),
+    ],
+)
+def test_financial_what_if_with_zero_total_assets(
+    client: TestClient,
+    superuser_token_headers: Dict[str, str],
+    route: str,
+    data: dict,
+    detail: str,
+) -> None:
+    financials = financial_payload()["financials"]
+    payload = (
+        {"financial": financials[0]}
+        if route == "sensitivity"
+        else {"financials": financials}
+    )
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809/{route}",
+        headers=superuser_token_headers,
+        json={**payload, **data},
+    )
+    assert r.status_code == 422
+    assert r.json() == {"detail": detail}
+
+    financials[0]["total_assets"] = 0
+    payload = (
+        {"financial": financials[0]}
+        if route == "sensitivity"
+        else {"financials": financials, "uncertainty": {}}
+    )
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809/{route}",
+        headers=superuser_token_headers,
+        json=payload,
+    )
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["detail"] == "Zero or negative total_assets"
+
+
+def test_financial_distribution_with_bad_uncertainty(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    data = {
+        **financial_payload(),
+        "uncertainty": {"ebit": {"relative_std": 0.1, "bounds": [-0.1, 0.1]}},
+    }
+    r = client.put(
+        f"{settings.API_V1_STR}/company/gb/10149809/distribution",
+        headers=superuser_token_headers,
+        json=data,
+    )
+
+    assert r.status_code == 422
+
+
+def test_bulk_financial_scores(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    financials = financial_payload()["financials"]
+    data = {
+        "companies": [
+            {"country_iso_code": "gb", "id": "10149809", "financials": financials},
+            {"country_iso_code": "gbh", "id": "10149809", "financials": financials},
+            {"country_iso_code": "de", "id": "10212356", "financials": financials},
+            {"country_iso_code": "gb", "id": "abc123", "financials": financials},
+        ]
+    }
+    r = client.put(
+        f"{settings.API_V1_STR}/company/bulk",
+        headers=superuser_token_headers,
+        json=data,
+    )
+
+    assert r.status_code == 200
+    content = r.json()
+    assert content["results"] == [
+        {"country_iso_code": "gb", "id": "10149809", **uk_scores()},
+        {"country_iso_code": "de", "id": "10212356", **default_scores()},
+    ]
+    assert content["errors"] == [
+        {
+            "index": 1,
+            "country_iso_code": "gbh",
+            "id": "10149809",
+            "row": None,
+            "year": None,
+            "detail": "Invalid country code",
+        },
+        {
+            "index": 3,
+            "country_iso_code": "gb",
+            "id": "abc123",
+            "row": None,
+            "year": None,
+            "detail": "Invalid company id",
+        },
+    ]
+    assert content["histogram"] == [
+        {
+            "country_iso_code": country,
+            "year": year,
+            "distress": 0,
+            "grey": 0,
+            "safe": 1,
+        }
+        for country in ("de", "gb")
+        for year in range(2016, 2021)
+    ]
+
+
+def test_bulk_financial_scores_with_bad_years(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    financials = financial_payload()["financials"]
+    bad = [
+        {**financials[0], "total_assets": 0.0},
+        financials[1],
+        {**financials[1], "total_liabilities": -1.0},
+        {key: value for key, value in financials[2].items() if key != "year"},
+        financials[3],
+        financials[4],
+    ]
+    data = {
+        "companies": [
+            {"country_iso_code": "gb", "id": "10149809", "financials": bad},
+            {"country_iso_code": "de", "id": "10212356", "financials": financials},
+        ]
+    }
+    r = client.put(
+        f"{settings.API_V1_STR}/company/bulk",
+        headers=superuser_token_headers,
+        json=data,
+    )
+
+    assert r.status_code == 200
+    content = r.json()
+    assert content["results"] == [
+        {
+            "country_iso_code": "gb",
+            "id": "10149809",
+            "scores": uk_scores()["scores"][3:],
+        },
+        {"country_iso_code": "de", "id": "10212356", **default_scores()},
+    ]
+    company = {"index": 0, "country_iso_code": "gb", "id": "10149809"}
+    assert content["errors"] == [
+        {
+            **company,
+            "row": 0,
+            "year": 2020,
+            "detail": "Zero or negative total_assets",
+        },
+        {**company, "row": 1, "year": 2019, "detail": "Duplicate year"},
+        {
+            **company,
+            "row": 2,
+            "year": 2019,
+            "detail": "Duplicate year; Zero or negative total_liabilities",
+        },
+        {**company, "row": 3, "year": None, "detail": "Missing year"},
+    ]
+
+
+def test_bulk_financial_scores_with_msgpack(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    financials = financial_payload()["financials"]
+    data = {
+        "companies": [
+            {"country_iso_code": "gb", "id": "10149809", "financials": financials},
+            {"country_iso_code": "gbh", "id": "10149809", "financials": financials},
+        ]
+    }
+    r = client.put(
+        f"{settings.API_V1_STR}/company/bulk",
+        headers={**superuser_token_headers, "Accept": "application/x-msgpack"},
+        json=data,
+    )
+
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/msgpack"
+    assert r.headers["vary"] == "Accept"
+    content = msgpack.unpackb(r.content)
+    assert content["results"] == [
+        {"country_iso_code": "gb", "id": "10149809", **uk_scores()}
+    ]
+    assert [error["detail"] for error in content["errors"]] == ["Invalid country code"]
+
+
+def test_bulk_financial_scores_empty(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    r = client.put(
+        f"{settings.API_V1_STR}/company/bulk",
+        headers=superuser_token_headers,
+        json={"companies": []},
+    )
+
+    assert r.status_code == 200
+    assert r.json() == {"results": [], "errors": [], "histogram": []}
+
+
+def test_bulk_financial_scores_with_gzip(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    financials = financial_payload()["financials"]
+    data = {
+        "companies": [
+            {
+                "country_iso_code": "gb",
+                "id": str(10149809 + i),
+                "financials": financials,
+            }
+            for i in range(20)
+        ]
+    }
+    r = client.put(
+        f"{settings.API_V1_STR}/company/bulk",
+        headers={
+            **superuser_token_headers,
+            "content-type": "application/json",
+            "content-encoding": "gzip",
+            "accept-encoding": "gzip",
+        },
+        data=gzip.compress(json.dumps(data).encode()),
+    )
+
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    results = r.json()["results"]
+    assert [result["id"] for result in results] == [
+        str(10149809 + i) for i in range(20)
+    ]
+    assert results[0]["scores"] == uk_scores()["scores"]
+
+
+@pytest.mark.parametrize(
+    "encoding,body,status_code",
+    [("gzip", b"not gzip", 400), ("br", b"", 415)],
+)
+def test_bulk_financial_scores_with_bad_encoding(
+    client: TestClient,
+    superuser_token_headers: Dict[str, str],
+    encoding: str,
+    body: bytes,
+    status_code: int,
+) -> None:
+    r = client.put(
+        f"{settings.API_V1_STR}/company/bulk",
+        headers={
+            **superuser_token_headers,
+            "content-type": "application/json",
+            "content-encoding": encoding,
+        },
+        data=body,
+    )
+
+    assert r.status_code == status_code
+
+
+def test_bulk_financial_scores_when_executor_busy(
+    client: TestClient,
+    superuser_token_headers: Dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(compute_executor, "max_workers", 0)
+    monkeypatch.setattr(compute_executor, "max_pending", 0)
+    financials = financial_payload()["financials"]
+    data = {
+        "companies": [
+            {"country_iso_code": "gb", "id": "10149809", "financials": financials}
+        ]
+    }
+    r = client.put(
+        f"{settings.API_V1_STR}/company/bulk",
+        headers=superuser_token_headers,
+        json=data,
+    )
+
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "1"
+    assert r.json() == {"detail": "Too many requests in progress"}
+
+
+def test_ingest_financial_scores(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    company_id = random_company_id()
+    financials = financial_payload()["financials"]
+    data = {
+        "companies": [
+            {"country_iso_code": "gb", "id": company_id, "financials": financials},
+            {"country_iso_code": "gbh", "id": company_id, "financials": financials},
+        ]
+    }
+    r = client.put(
+        f"{settings.API_V1_STR}/company/ingest",
+        headers=superuser_token_headers,
+        json=data,
+    )
+
+    assert r.status_code == 200
+    content = r.json()
+    assert content["stored"] == len(financials)
+    assert [error["index"] for error in content["errors"]] == [1]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/company/gb/{company_id}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    scores = r.json()["scores"]
+    assert [
+        {key: score[key] for key in ("year", "zscore", "zone")} for score in scores
+    ] == uk_scores()["scores"]
+
+
+def test_bulk_financial_trends(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    financials = financial_payload()["financials"]
+    data = {
+        "companies": [
+            {"country_iso_code": "gb", "id": "10149809", "financials": financials},
+            {"country_iso_code": "gbh", "id": "10149809", "financials": financials},
+            {"country_iso_code": "de", "id": "10212356", "financials": financials[:1]},
+        ]
+    }
+    r = client.put(
+        f"{settings.API_V1_STR}/company/trends",
+        headers=superuser_token_headers,
+        json=data,
+    )
+
+    assert r.status_code == 200
+    content = r.json()
+    gb, de = content["results"]
+    expected = [s["zscore"] for s in reversed(uk_scores()["scores"])]
+    assert [s["year"] for s in gb["scores"]] == [2016, 2017, 2018, 2019, 2020]
+    assert [s["zscore"] for s in gb["scores"]] == expected
+    assert gb["scores"][0]["delta"] is None
+    assert gb["scores"][-1]["delta"] == expected[-1] - expected[-2]
+    assert gb["declines"] == 1
+    assert gb["slope"] == pytest.approx(np.polyfit(range(5), expected, 1)[0])
+    assert de["scores"] == [
+        {"year": 2020, "zscore": default_scores()["scores"][0]["zscore"], "delta": None}
+    ]
+    assert de["slope"] is None
+    assert de["declines"] == 0
+    assert content["errors"][0]["index"] == 1
+
+
+def test_stream_financial_scores(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    records = [
+        {"country_iso_code": "gb", "id": "10149809", **financial}
+        for financial in financial_payload()["financials"]
+    ]
+    lines = [json.dumps(record) for record in records]
+    lines.insert(2, json.dumps({**records[0], "country_iso_code": "gbh"}))
+    lines.insert(4, "")
+    lines.insert(5, "{not json")
+    lines.append(json.dumps({**records[0], "id": "10149810", "total_assets": 0}))
+    r = client.put(
+        f"{settings.API_V1_STR}/company/stream",
+        headers=superuser_token_headers,
+        data="\n".join(lines),
+    )
+
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert rows[2] == {"line": 3, "detail": "Invalid country code"}
+    assert rows[4] == {"line": 6, "detail": "Invalid financial record"}
+    assert rows[7] == {"line": 9, "detail": "Zero or negative total_assets"}
+    del rows[7], rows[4], rows[2]
+    assert rows == [
+        {"country_iso_code": "gb", "id": "10149809", **score}
+        for score in uk_scores()["scores"]
+    ]
+
+
+def test_stream_financial_scores_with_long_lines(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    first, second = [
+        {"country_iso_code": "gb", "id": "10149809", **financial}
+        for financial in financial_payload()["financials"][:2]
+    ]
+    long = json.dumps({**first, "id": "1" * 100000})
+    body = "\n".join([long, json.dumps(first), long, json.dumps(second), long])
+    data = body.encode()
+    r = client.put(
+        f"{settings.API_V1_STR}/company/stream",
+        headers=superuser_token_headers,
+        # Sent in chunks, long lines span many of them
+        data=(data[start : start + 4096] for start in range(0, len(data), 4096)),
+    )
+
+    assert r.status_code == 200
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    scores = [
+        {"country_iso_code": "gb", "id": "10149809", **score}
+        for score in uk_scores()["scores"][:2]
+    ]
+    assert rows == [
+        {"line": 1, "detail": "Line too long"},
+        scores[0],
+        {"line": 3, "detail": "Line too long"},
+        scores[1],
+        {"line": 5, "detail": "Line too long"},
+    ]
+
+
+def test_stream_financial_scores_with_gzip(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    lines = [
+        json.dumps({"country_iso_code": "gb", "id": "10149809", **financial})
+        for financial in financial_payload()["financials"]
+    ]
+    r = client.put(
+        f"{settings.API_V1_STR}/company/stream",
+        headers={
+            **superuser_token_headers,
+            "content-encoding": "gzip",
+            "accept-encoding": "gzip",
+        },
+        data=gzip.compress("\n".join(lines).encode()),
+    )
+
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert rows == [
+        {"country_iso_code": "gb", "id": "10149809", **score}
+        for score in uk_scores()["scores"]
+    ]
+
+
+def test_financial_scores_are_cached(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    zscore_cache.clear()
+    reordered = {
+        "financials": [
+            {key: float(value) for key, value in reversed(financial.items())}
+            for financial in financial_payload()["financials"]
+        ]
+    }
+
+    for country_iso_code, id, payload in [
+        ("gb", "10149809", financial_payload()),
+        ("GB", "10149810", reordered),
+    ]:
+        r = client.put(
+            f"{settings.API_V1_STR}/company/{country_iso_code}/{id}",
+            headers=superuser_token_headers,
+            json=payload,
+        )
+        assert r.status_code == 200
+        assert r.json() == uk_scores()
+
+    r = client.get(
+        f"{settings.API_V1_STR}/company/cache", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    stats = r.json()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+
+def test_merge_financial_scores(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    company_id = random_company_id()
+    financials = financial_payload()["financials"]
+    for delta in (financials[2:], financials[:3]):
+        r = client.patch(
+            f"{settings.API_V1_STR}/company/gb/{company_id}",
+            headers=superuser_token_headers,
+            json={"financials": delta},
+        )
+        assert r.status_code == 200
+
+    scores = r.json()["scores"]
+    assert [
+        {"year": s["year"], "zscore": s["zscore"], "zone": s["zone"]} for s in scores
+    ] == uk_scores()["scores"]
+    assert all(0 < s["percentile"] <= 100 for s in scores)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/company/gb/{company_id}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    assert r.json()["scores"] == scores
+
+
+def test_financial_scores_with_ranks(
+    client: TestClient, superuser_token_headers: Dict[str, str], db: Session
+) -> None:
+    country = "nr"
+    financials = financial_payload()["financials"]
+    # Every run adds one company below and one above, so the middle stays at 50
+    for factor in (1.0, 0.5, 2.0):
+        payload = [
+            {**f, "working_capital": f["working_capital"] * factor} for f in financials
+        ]
+        r = client.patch(
+            f"{settings.API_V1_STR}/company/{country}/{random_company_id()}",
+            headers=superuser_token_headers,
+            json={"financials": payload},
+        )
+        assert r.status_code == 200
+
+    r = client.put(
+        f"{settings.API_V1_STR}/company/{country}/10149809",
+        headers=superuser_token_headers,
+        params={"ranks": True},
+        json=financial_payload(),
+    )
+
+    assert r.status_code == 200
+    ranked = r.json()["scores"]
+    assert [s["zscore"] for s in ranked] == [
+        s["zscore"] for s in default_scores()["scores"]
+    ]
+    assert [s["percentile"] for s in ranked] == [50.0] * len(ranked)
+
+    r = client.put(
+        f"{settings.API_V1_STR}/company/tv/10149809",
+        headers=superuser_token_headers,
+        params={"ranks": True},
+        json=financial_payload(),
+    )
+    assert [s["percentile"] for s in r.json()["scores"]] == [None] * len(ranked)
+
+
+def test_merge_financial_scores_with_duplicate_years(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    financials = financial_payload()["financials"]
+    r = client.patch(
+        f"{settings.API_V1_STR}/company/gb/{random_company_id()}",
+        headers=superuser_token_headers,
+        json={"financials": [financials[0], financials[0]]},
+    )
+
+    assert r.status_code == 422
+    assert r.json() == {"detail": "Duplicate financial year"}
+
+
+def test_merge_financial_scores_with_invalid_rows(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    company_id = random_company_id()
+    financials = financial_payload()["financials"]
+    r = client.patch(
+        f"{settings.API_V1_STR}/company/gb/{company_id}",
+        headers=superuser_token_headers,
+        json={"financials": [financials[0], {**financials[1], "total_assets": 0}]},
+    )
+
+    assert r.status_code == 422
+    assert r.json() == {
+        "detail": [
+            {
+                "row": 1,
+                "year": financials[1]["year"],
+                "detail": "Zero or negative total_assets",
+            }
+        ]
+    }
+    r = client.get(
+        f"{settings.API_V1_STR}/company/gb/{company_id}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 404
+
+
+def test_read_financial_scores_not_found(
+    client: TestClient, superuser_token_headers: Dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/company/gb/{random_company_id()}",
+        headers=superuser_token_headers,
+    )
+
+    assert r.status_code == 404
@@ -1,8 +1,12 @@
+import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from app import crud, schemas
 from app.core.config import settings
 from app.tests.utils.item import create_random_item
+from app.tests.utils.user import authentication_token_from_email
+from app.tests.utils.utils import random_email
 
 
 def test_create_item(
@@ -36,3 +40,136 @@ def test_read_item(
     assert content["description"] == item.description
     assert content["id"] == item.id
     assert content["owner_id"] == item.owner_id
+
+
+@pytest.mark.parametrize(
+    "method, path, params, json",
+    [
+        ("GET", "/items/3000000000", None, None),
+        ("PUT", "/items/3000000000", None, {"title": "Foo"}),
+        ("DELETE", "/items/3000000000", None, None),
+        ("GET", "/items/-3000000000", None, None),
+        ("DELETE", "/items/bulk", {"id": [1, 3000000000]}, None),
+        ("PUT", "/items/bulk", None, [{"id": 3000000000, "title": "Foo"}]),
+    ],
+)
+def test_items_with_id_out_of_range(
+    client: TestClient,
+    superuser_token_headers: dict,
+    method: str,
+    path: str,
+    params: dict,
+    json: list,
+) -> None:
+    response = client.request(
+        method,
+        f"{settings.API_V1_STR}{path}",
+        headers=superuser_token_headers,
+        params=params,
+        json=json,
+    )
+    assert response.status_code == 422
+
+
+def test_read_items_match_response_model(
+    client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    item = create_random_item(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"limit": 10000},
+    )
+    assert response.status_code == 200
+    content = {entry["id"]: entry for entry in response.json()}
+    assert content[item.id] == schemas.Item.from_orm(item).dict()
+
+
+def test_read_items_by_cursor(client: TestClient, db: Session) -> None:
+    email = random_email()
+    headers = authentication_token_from_email(client=client, email=email, db=db)
+    owner = crud.user.get_by_email(db, email=email)
+    assert owner
+    items = [create_random_item(db, owner_id=owner.id) for _ in range(3)]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/items/", headers=headers, params={"limit": 2}
+    )
+    assert response.status_code == 200
+    ids = [entry["id"] for entry in response.json()]
+
+    response = client.get(response.links["next"]["url"], headers=headers)
+    assert response.status_code == 200
+    ids += [entry["id"] for entry in response.json()]
+    assert "next" not in response.links
+
+    assert ids == [item.id for item in items]
+
+
+def test_read_items_by_offset(client: TestClient, db: Session) -> None:
+    email = random_email()
+    headers = authentication_token_from_email(client=client, email=email, db=db)
+    owner = crud.user.get_by_email(db, email=email)
+    assert owner
+    items = [create_random_item(db, owner_id=owner.id) for _ in range(3)]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/items/", headers=headers, params={"skip": 1}
+    )
+
+    assert response.status_code == 200
+    assert "link" not in response.headers
+    assert {entry["id"] for entry in response.json()} < {item.id for item in items}
+
+
+def test_bulk_items(client: TestClient, db: Session) -> None:
+    email = random_email()
+    headers = authentication_token_from_email(client=client, email=email, db=db)
+    data = [{"title": f"Item {i}", "description": "Bulk"} for i in range(3)]
+
+    response = client.post(
+        f"{settings.API_V1_STR}/items/bulk", headers=headers, json=data
+    )
+    assert response.status_code == 200
+    created = response.json()
+    assert [item["title"] for item in created] == [item["title"] for item in data]
+    ids = [item["id"] for item in created]
+
+    response = client.put(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=headers,
+        json=[{"id": id, "description": "Updated"} for id in ids],
+    )
+    assert response.status_code == 200
+    assert [item["description"] for item in response.json()] == ["Updated"] * 3
+    assert [item["title"] for item in response.json()] == [
+        item["title"] for item in data
+    ]
+
+    response = client.delete(
+        f"{settings.API_V1_STR}/items/bulk", headers=headers, params={"id": ids}
+    )
+    assert response.status_code == 200
+    assert sorted(item["id"] for item in response.json()) == ids
+    assert crud.item.get_owners(db, ids=ids) == {}
+
+
+def test_bulk_items_of_another_owner(
+    client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    item = create_random_item(db)
+
+    response = client.put(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=[{"id": item.id, "title": "Stolen"}],
+    )
+    assert response.status_code == 400
+
+    response = client.delete(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        params={"id": [item.id, 0]},
+    )
+    assert response.status_code == 404
+    assert crud.item.get(db, id=item.id)
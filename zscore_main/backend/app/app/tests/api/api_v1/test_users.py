@@ -1,9 +1,10 @@
 from typing import Dict
 
+import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
-from app import crud
+from app import crud, schemas
 from app.core.config import settings
 from app.schemas.user import UserCreate
 from app.tests.utils.utils import random_email, random_lower_string
@@ -18,6 +19,7 @@ def test_get_users_superuser_me(
     assert current_user["is_active"] is True
     assert current_user["is_superuser"]
     assert current_user["email"] == settings.FIRST_SUPERUSER
+    assert set(current_user) == set(schemas.User.__fields__)
 
 
 def test_get_users_normal_user_me(
@@ -68,6 +70,17 @@ def test_get_existing_user(
     assert existing_user.email == api_user["email"]
 
 
+@pytest.mark.parametrize("user_id", [3000000000, -3000000000])
+def test_get_user_with_id_out_of_range(
+    client: TestClient, superuser_token_headers: dict, user_id: int
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/users/{user_id}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 422
+
+
 def test_create_user_existing_username(
     client: TestClient, superuser_token_headers: dict, db: Session
 ) -> None:
@@ -120,3 +133,22 @@ def test_retrieve_users(
     assert len(all_users) > 1
     for item in all_users:
         assert "email" in item
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"cursor": "not a cursor"},
+        {"cursor": "Im5vdCBhbiBpZCI"},
+        {"skip": 0, "cursor": "MQ"},
+        {"cursor": "MjE0NzQ4MzY0OA"},
+        {"cursor": "LTE"},
+    ],
+)
+def test_retrieve_users_with_bad_cursor(
+    client: TestClient, superuser_token_headers: dict, params: dict
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/users/", headers=superuser_token_headers, params=params
+    )
+    assert r.status_code == 400
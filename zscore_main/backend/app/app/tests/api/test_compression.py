@@ -0,0 +1,105 @@
+import asyncio
+import gzip
+from typing import Iterator, List, Optional
+
+import brotli
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.types import Message
+
+from app.api.compression import (
+    CompressionMiddleware,
+    decompress_receive,
+    preferred_encoding,
+)
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+
+@app.get("/text/{size}")
+def text(size: int) -> PlainTextResponse:
+    return PlainTextResponse("x" * size)
+
+
+@app.get("/stream")
+def stream() -> StreamingResponse:
+    def lines() -> Iterator[bytes]:
+        for i in range(3):
+            yield f"line {i}\n".encode()
+
+    return StreamingResponse(lines(), media_type="text/plain")
+
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding,encoding",
+    [
+        (None, None),
+        ("identity", None),
+        ("gzip, deflate", "gzip"),
+        ("gzip, br", "br"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("*", "br"),
+        ("*, br;q=0", "gzip"),
+    ],
+)
+def test_preferred_encoding(
+    accept_encoding: Optional[str], encoding: Optional[str]
+) -> None:
+    assert preferred_encoding(accept_encoding) == encoding
+
+
+def test_small_responses_are_not_compressed() -> None:
+    r = client.get("/text/99", headers={"accept-encoding": "gzip"})
+
+    assert "content-encoding" not in r.headers
+    assert r.text == "x" * 99
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_responses_are_compressed(encoding: str) -> None:
+    r = client.get("/text/1000", headers={"accept-encoding": encoding}, stream=True)
+    body = r.raw.read(decode_content=False)
+
+    assert r.headers["content-encoding"] == encoding
+    assert r.headers["content-length"] == str(len(body))
+    decompress = gzip.decompress if encoding == "gzip" else brotli.decompress
+    assert decompress(body) == b"x" * 1000
+
+
+def test_streaming_responses_are_compressed() -> None:
+    r = client.get("/stream", headers={"accept-encoding": "gzip"})
+
+    assert r.headers["content-encoding"] == "gzip"
+    assert "content-length" not in r.headers
+    assert r.text == "line 0\nline 1\nline 2\n"
+
+
+def _decompress(body: bytes, max_size: int) -> bytes:
+    messages: List[Message] = [
+        {"type": "http.request", "body": body[:100], "more_body": True},
+        {"type": "http.request", "body": body[100:], "more_body": False},
+    ]
+
+    async def receive() -> Message:
+        return messages.pop(0)
+
+    async def read() -> bytes:
+        wrapped = decompress_receive(receive, max_size)
+        return (await wrapped())["body"] + (await wrapped())["body"]
+
+    return asyncio.run(read())
+
+
+def test_decompress_receive_limits_the_body_size() -> None:
+    body = gzip.compress(b"x" * 100000)
+
+    assert _decompress(body, 100000) == b"x" * 100000
+    with pytest.raises(HTTPException) as e:
+        _decompress(body, 99999)
+    assert e.value.status_code == 413
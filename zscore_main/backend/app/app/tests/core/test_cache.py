@@ -0,0 +1,35 @@
+import time
+
+from app.core.cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache: LRUCache[str] = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_lru_cache_expires_entries() -> None:
+    cache: LRUCache[str] = LRUCache(maxsize=2, ttl=0.01)
+    cache.set("a", "1")
+
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_cache_disabled() -> None:
+    cache: LRUCache[str] = LRUCache(maxsize=0, ttl=60)
+    cache.set("a", "1")
+
+    assert cache.get("a") is None
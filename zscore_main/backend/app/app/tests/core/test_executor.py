@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from typing import Tuple
+
+import pytest
+
+from app.core.executor import BoundedExecutor, ExecutorBusy
+
+
+def test_bounded_executor_runs_calls() -> None:
+    executor = BoundedExecutor(max_workers=2, max_pending=1)
+
+    async def run() -> list:
+        return await asyncio.gather(*(executor.run(pow, i, 2) for i in range(3)))
+
+    try:
+        assert asyncio.run(run()) == [0, 1, 4]
+    finally:
+        executor.shutdown()
+    assert executor.stats()["pending"] == 0
+    assert executor.stats()["completed"] == 3
+
+
+def test_bounded_executor_rejects_calls_when_full() -> None:
+    executor = BoundedExecutor(max_workers=1, max_pending=1)
+    release = threading.Event()
+    try:
+        running = executor.submit(release.wait)
+        waiting = executor.submit(release.wait)
+
+        with pytest.raises(ExecutorBusy):
+            executor.submit(release.wait)
+
+        release.set()
+        assert running.result() and waiting.result()
+    finally:
+        release.set()
+        executor.shutdown()
+    # Calls are released once they end
+    assert executor.stats()["pending"] == 0
+    assert executor.submit(pow, 2, 3).result() == 8
+    executor.shutdown()
+    assert executor.stats()["rejected"] == 1
+
+
+def test_bounded_executor_propagates_errors() -> None:
+    executor = BoundedExecutor(max_workers=1)
+    try:
+        with pytest.raises(ZeroDivisionError):
+            asyncio.run(executor.run(divmod, 1, 0))
+    finally:
+        executor.shutdown()
+    assert executor.stats()["pending"] == 0
+
+
+def test_bounded_executor_waits_for_a_slot() -> None:
+    executor = BoundedExecutor(max_workers=1, max_pending=0)
+    release = threading.Event()
+
+    async def run() -> Tuple[bool, int]:
+        running = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0)
+        waiting = asyncio.ensure_future(executor.run(pow, 2, 3, wait=True))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        assert executor.stats()["waiting"] == 1
+        with pytest.raises(ExecutorBusy):
+            await executor.run(pow, 2, 3)
+
+        release.set()
+        return await running, await waiting
+
+    try:
+        assert asyncio.run(run()) == (True, 8)
+    finally:
+        release.set()
+        executor.shutdown()
+    assert executor.stats()["waiting"] == 0
+    assert executor.stats()["rejected"] == 1
+
+
+def test_bounded_executor_skips_cancelled_waiters() -> None:
+    executor = BoundedExecutor(max_workers=1, max_pending=0)
+    release = threading.Event()
+
+    async def run() -> Tuple[bool, int]:
+        running = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0)
+        cancelled = asyncio.ensure_future(executor.run(pow, 2, 2, wait=True))
+        waiting = asyncio.ensure_future(executor.run(pow, 2, 3, wait=True))
+        await asyncio.sleep(0.05)
+        cancelled.cancel()
+
+        release.set()
+        return await running, await asyncio.wait_for(waiting, 5)
+
+    try:
+        assert asyncio.run(run()) == (True, 8)
+    finally:
+        release.set()
+        executor.shutdown()
+    assert executor.stats()["waiting"] == 0
+    assert executor.stats()["pending"] == 0
@@ -0,0 +1,279 @@
+from typing import List
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas, scoring
+from app.tests.utils.utils import (
+    financial_payload,
+    random_company_id,
+    run_async,
+    uk_scores,
+)
+
+
+def test_merge_by_company_scores_only_new_or_changed_years(db: Session) -> None:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+    company_id = random_company_id()
+    coeffecients = scoring.coeffecient_registry.get()
+
+    history = crud.financial.merge_by_company(
+        db,
+        country_iso_code="gb",
+        company_id=company_id,
+        financials=financials[1:],
+        coeffecients=coeffecients,
+    )
+    assert [score.dict() for score in history] == uk_scores()["scores"][1:]
+
+    stored = crud.financial.get_multi_by_company(
+        db, country_iso_code="GB", company_id=company_id
+    )
+    score_ids = {db_obj.year: db_obj.score.id for db_obj in stored}
+
+    changed = financials[1].copy(update={"ebit": 0.0})
+    history = crud.financial.merge_by_company(
+        db,
+        country_iso_code="gb",
+        company_id=company_id,
+        financials=[financials[0], changed, financials[2]],
+        coeffecients=coeffecients,
+    )
+
+    expected = uk_scores()["scores"]
+    assert [score.dict() for score in history][0] == expected[0]
+    assert history[1].zscore < expected[1]["zscore"]
+    assert [score.dict() for score in history][2:] == expected[2:]
+    stored = crud.financial.get_multi_by_company(
+        db, country_iso_code="gb", company_id=company_id
+    )
+    assert [db_obj.year for db_obj in stored] == [2020, 2019, 2018, 2017, 2016]
+    assert {db_obj.year: db_obj.score.id for db_obj in stored[1:]} == score_ids
+
+
+def test_merge_by_company_rescores_other_coeffecients(db: Session) -> None:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+    company_id = random_company_id()
+    coeffecients = scoring.coeffecient_registry.get()
+    crud.financial.merge_by_company(
+        db,
+        country_iso_code="gb",
+        company_id=company_id,
+        financials=financials,
+        coeffecients=coeffecients,
+    )
+
+    doubled = scoring.build_table(
+        coeffecients.default,
+        {"gb": [2 * c for c in coeffecients.countries["gb"]]},
+    )
+    history = crud.financial.merge_by_company(
+        db,
+        country_iso_code="gb",
+        company_id=company_id,
+        financials=[],
+        coeffecients=doubled,
+    )
+
+    assert [score.zscore for score in history] == [
+        2 * score["zscore"] for score in uk_scores()["scores"]
+    ]
+
+
+def test_merge_by_company_of_a_year_stored_meanwhile(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+    company_id = random_company_id()
+    coeffecients = scoring.coeffecient_registry.get()
+    crud.financial.merge_by_company(
+        db,
+        country_iso_code="gb",
+        company_id=company_id,
+        financials=financials[:1],
+        coeffecients=coeffecients,
+    )
+    stored = crud.financial.get_multi_by_company(
+        db, country_iso_code="gb", company_id=company_id
+    )
+    score_id = stored[0].score.id
+
+    # Another merge stored the year after this one read the company
+    monkeypatch.setattr(crud.financial, "get_multi_by_company", lambda *a, **k: [])
+    history = crud.financial.merge_by_company(
+        db,
+        country_iso_code="gb",
+        company_id=company_id,
+        financials=[financials[0].copy(update={"ebit": 0.0})],
+        coeffecients=coeffecients,
+    )
+    monkeypatch.undo()
+
+    stored = crud.financial.get_multi_by_company(
+        db, country_iso_code="gb", company_id=company_id
+    )
+    assert [(db_obj.year, db_obj.ebit) for db_obj in stored] == [(2020, 0.0)]
+    assert stored[0].score.id == score_id
+    assert stored[0].score.zscore == history[0].zscore
+
+
+def test_get_history_by_company_stores_nothing(db: Session) -> None:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+    company_id = random_company_id()
+    coeffecients = scoring.coeffecient_registry.get()
+    doubled = scoring.build_table(
+        coeffecients.default,
+        {"gb": [2 * c for c in coeffecients.countries["gb"]]},
+    )
+    crud.financial.merge_by_company(
+        db,
+        country_iso_code="gb",
+        company_id=company_id,
+        financials=financials,
+        coeffecients=doubled,
+    )
+
+    history = crud.financial.get_history_by_company(
+        db, country_iso_code="GB", company_id=company_id, coeffecients=coeffecients
+    )
+
+    assert [score.dict() for score in history] == uk_scores()["scores"]
+    stored = crud.financial.get_multi_by_company(
+        db, country_iso_code="gb", company_id=company_id
+    )
+    assert {db_obj.score.coeffecients for db_obj in stored} == {
+        f"{scoring.DEFAULT_FORMULA}:{doubled.digest}"
+    }
+
+
+def test_ingest_stores_companies_financials_and_scores(db: Session) -> None:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+    company_id = random_company_id()
+    coeffecients = scoring.coeffecient_registry.get()
+    columns = scoring.financials_to_columns(financials)
+    zscores = scoring.calc_zscores(columns, "gb", coeffecients)
+    rows = len(financials)
+
+    stored = crud.financial.ingest(
+        db,
+        country_iso_codes=["GB"] * rows,
+        company_ids=[company_id] * rows,
+        columns=columns,
+        zscores=zscores,
+        coeffecients=[f"{scoring.DEFAULT_FORMULA}:{coeffecients.digest}"] * rows,
+    )
+
+    assert stored == rows
+    company = (
+        db.query(models.Company)
+        .filter_by(country_iso_code="gb", company_id=company_id)
+        .one()
+    )
+    assert len(company.financials) == rows
+    # Stored with the current coeffecients, so nothing is rescored
+    history = crud.financial.merge_by_company(
+        db,
+        country_iso_code="gb",
+        company_id=company_id,
+        financials=[],
+        coeffecients=coeffecients,
+    )
+    assert [score.dict() for score in history] == uk_scores()["scores"]
+
+
+def test_ingest_overwrites_stored_years(db: Session) -> None:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+    company_id = random_company_id()
+    coeffecients = scoring.coeffecient_registry.get()
+    crud.financial.merge_by_company(
+        db,
+        country_iso_code="gb",
+        company_id=company_id,
+        financials=financials,
+        coeffecients=coeffecients,
+    )
+    stored = crud.financial.get_multi_by_company(
+        db, country_iso_code="gb", company_id=company_id
+    )
+    score_ids = {db_obj.year: db_obj.score.id for db_obj in stored}
+
+    # The same year twice, the last one wins
+    changed = [
+        financials[1].copy(update={"ebit": 1.0}),
+        financials[1].copy(update={"ebit": 2.0}),
+    ]
+    count = crud.financial.ingest(
+        db,
+        country_iso_codes=["gb", "gb"],
+        company_ids=[company_id, company_id],
+        columns=scoring.financials_to_columns(changed),
+        zscores=[1.0, 2.0],
+        coeffecients=["test", "test"],
+    )
+
+    assert count == 1
+    stored = crud.financial.get_multi_by_company(
+        db, country_iso_code="gb", company_id=company_id
+    )
+    assert [db_obj.year for db_obj in stored] == [2020, 2019, 2018, 2017, 2016]
+    assert (stored[1].ebit, stored[1].score.zscore) == (2.0, 2.0)
+    assert stored[1].score.coeffecients == "test"
+    assert stored[1].current_assets is None
+    assert {db_obj.year: db_obj.score.id for db_obj in stored} == score_ids
+
+
+def test_async_merge_by_company() -> None:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+    company_id = random_company_id()
+
+    async def merge(async_db: AsyncSession) -> List[schemas.RankedZScore]:
+        history = await crud.financial.amerge_by_company(
+            async_db,
+            country_iso_code="gb",
+            company_id=company_id,
+            financials=financials,
+            coeffecients=scoring.coeffecient_registry.get(),
+        )
+        return await crud.financial.arank_scores(
+            async_db, country_iso_code="gb", scores=history
+        )
+
+    ranked = run_async(merge)
+    assert [score.dict(exclude={"percentile"}) for score in ranked] == uk_scores()[
+        "scores"
+    ]
+    assert all(score.percentile is not None for score in ranked)
+
+
+def test_async_ingest(db: Session) -> None:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+    company_id = random_company_id()
+    coeffecients = scoring.coeffecient_registry.get()
+    columns = scoring.financials_to_columns(financials)
+    zscores = scoring.calc_zscores(columns, "gb", coeffecients)
+    rows = len(financials)
+
+    async def ingest(async_db: AsyncSession) -> int:
+        return await crud.financial.aingest(
+            async_db,
+            country_iso_codes=["GB"] * rows,
+            company_ids=[company_id] * rows,
+            columns=columns,
+            zscores=zscores,
+            coeffecients=[f"{scoring.DEFAULT_FORMULA}:{coeffecients.digest}"] * rows,
+        )
+
+    assert run_async(ingest) == rows
+    history = crud.financial.merge_by_company(
+        db,
+        country_iso_code="gb",
+        company_id=company_id,
+        financials=[],
+        coeffecients=coeffecients,
+    )
+    assert [score.dict() for score in history] == uk_scores()["scores"]
+    stored = crud.financial.get_multi_by_company(
+        db, country_iso_code="gb", company_id=company_id
+    )
+    assert all(db_obj.current_assets is None for db_obj in stored)
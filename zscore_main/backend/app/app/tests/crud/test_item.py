@@ -1,9 +1,11 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import crud
 from app.schemas.item import ItemCreate, ItemUpdate
+from app.tests.utils.item import create_random_item
 from app.tests.utils.user import create_random_user
-from app.tests.utils.utils import random_lower_string
+from app.tests.utils.utils import count_statements, random_lower_string, run_async
 
 
 def test_create_item(db: Session) -> None:
@@ -55,7 +57,138 @@ def test_delete_item(db: Session) -> None:
     item2 = crud.item.remove(db=db, id=item.id)
     item3 = crud.item.get(db=db, id=item.id)
     assert item3 is None
+    assert item2 is not None
     assert item2.id == item.id
     assert item2.title == title
     assert item2.description == description
     assert item2.owner_id == user.id
+
+
+def test_single_writes_one_statement_each(db: Session) -> None:
+    owner_id = create_random_user(db).id
+    item_in = ItemCreate(title=random_lower_string())
+    with count_statements(db) as statements:
+        item = crud.item.create_with_owner(db=db, obj_in=item_in, owner_id=owner_id)
+        assert item.id and item.owner_id == owner_id
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT")
+
+    description = random_lower_string()
+    with count_statements(db) as statements:
+        item = crud.item.update(
+            db=db, db_obj=item, obj_in=ItemUpdate(description=description)
+        )
+        assert item.description == description
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE")
+
+    with count_statements(db) as statements:
+        removed = crud.item.remove(db=db, id=item.id)
+        assert removed and removed.description == description
+    assert len(statements) == 1
+    assert statements[0].startswith("DELETE")
+
+
+def test_update_item_without_changes(db: Session) -> None:
+    item = create_random_item(db)
+    with count_statements(db) as statements:
+        item2 = crud.item.update(db=db, db_obj=item, obj_in=ItemUpdate())
+    assert item2 is item
+    assert statements == []
+
+
+def test_update_detached_item(db: Session) -> None:
+    item = create_random_item(db)
+    db.expunge(item)
+    description = random_lower_string()
+    item2 = crud.item.update(db=db, db_obj=item, obj_in={"description": description})
+    assert item2 is item
+    assert item.description == description
+    stored = crud.item.get(db=db, id=item.id)
+    assert stored is not None
+    assert stored.description == description
+
+
+def test_delete_missing_item(db: Session) -> None:
+    item = create_random_item(db)
+    crud.item.remove(db=db, id=item.id)
+    assert crud.item.remove(db=db, id=item.id) is None
+
+
+def test_get_page_by_owner(db: Session) -> None:
+    user = create_random_user(db)
+    items = [create_random_item(db, owner_id=user.id) for _ in range(5)]
+
+    first, after = crud.item.get_page_by_owner(db=db, owner_id=user.id, limit=2)
+    second, after = crud.item.get_page_by_owner(
+        db=db, owner_id=user.id, after=after, limit=2
+    )
+    third, after = crud.item.get_page_by_owner(
+        db=db, owner_id=user.id, after=after, limit=2
+    )
+
+    assert [item.id for item in first + second + third] == [item.id for item in items]
+    assert after is None
+
+
+def test_create_update_and_remove_many(db: Session) -> None:
+    user = create_random_user(db)
+    items_in = [
+        ItemCreate(title=random_lower_string(), description=random_lower_string())
+        for _ in range(3)
+    ]
+
+    items = crud.item.create_many_with_owner(db=db, objs_in=items_in, owner_id=user.id)
+    assert [item.title for item in items] == [item_in.title for item_in in items_in]
+    assert all(item.id and item.owner_id == user.id for item in items)
+
+    ids = [item.id for item in items]
+    updated = crud.item.update_many(
+        db=db,
+        objs_in={
+            ids[0]: ItemUpdate(title="first"),
+            ids[1]: {"description": "second"},
+            ids[2]: {},
+        },
+    )
+    assert [item.id for item in updated] == ids
+    assert updated[0].title == "first"
+    assert updated[1].description == "second"
+    assert updated[2].title == items_in[2].title
+    stored = crud.item.get(db=db, id=ids[0])
+    assert stored is not None
+    assert stored.title == "first"
+
+    removed = crud.item.remove_many(db=db, ids=ids + [0])
+    assert sorted(item.id for item in removed) == ids
+    assert crud.item.get_owners(db=db, ids=ids) == {}
+
+
+def test_async_item_round_trip(db: Session) -> None:
+    owner_id = create_random_user(db).id
+    title = random_lower_string()
+    description = random_lower_string()
+
+    async def round_trip(async_db: AsyncSession) -> None:
+        item = await crud.item.acreate_with_owner(
+            async_db, obj_in=ItemCreate(title=title), owner_id=owner_id
+        )
+        assert item.owner_id == owner_id
+        assert await crud.item.aget_owners(async_db, ids=[item.id]) == {
+            item.id: owner_id
+        }
+        items, _ = await crud.item.aget_page_by_owner(async_db, owner_id=owner_id)
+        assert [stored.id for stored in items] == [item.id]
+
+        updated = await crud.item.aupdate(
+            async_db, db_obj=item, obj_in=ItemUpdate(description=description)
+        )
+        assert updated is item
+        assert item.title == title
+        assert item.description == description
+
+        removed = await crud.item.aremove(async_db, id=item.id)
+        assert removed and removed.description == description
+        assert await crud.item.aget(async_db, id=item.id) is None
+
+    run_async(round_trip)
@@ -1,10 +1,16 @@
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import crud
 from app.core.security import verify_password
 from app.schemas.user import UserCreate, UserUpdate
-from app.tests.utils.utils import random_email, random_lower_string
+from app.tests.utils.utils import (
+    count_statements,
+    random_email,
+    random_lower_string,
+    run_async,
+)
 
 
 def test_create_user(db: Session) -> None:
@@ -92,3 +98,37 @@ def test_update_user(db: Session) -> None:
     assert user_2
     assert user.email == user_2.email
     assert verify_password(new_password, user_2.hashed_password)
+
+
+def test_create_user_one_statement(db: Session) -> None:
+    user_in = UserCreate(email=random_email(), password=random_lower_string())
+    with count_statements(db) as statements:
+        user = crud.user.create(db, obj_in=user_in)
+        assert user.id
+        assert user.is_active
+        assert not user.is_superuser
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT")
+
+
+def test_async_create_and_update_user() -> None:
+    email = random_email()
+    password = random_lower_string()
+    new_password = random_lower_string()
+
+    async def create_and_update(async_db: AsyncSession) -> None:
+        user = await crud.user.acreate(
+            async_db, obj_in=UserCreate(email=email, password=password)
+        )
+        assert verify_password(password, user.hashed_password)
+        assert await crud.user.aget_by_email(async_db, email=email) is user
+
+        await crud.user.aupdate(
+            async_db, db_obj=user, obj_in=UserUpdate(password=new_password)
+        )
+        assert verify_password(new_password, user.hashed_password)
+        await crud.user.aupdate(async_db, db_obj=user, obj_in={"full_name": "Ada"})
+        assert user.full_name == "Ada"
+        assert verify_password(new_password, user.hashed_password)
+
+    run_async(create_and_update)
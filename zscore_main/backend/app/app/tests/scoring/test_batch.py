@@ -0,0 +1,122 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from app import schemas, scoring, utils
+from app.tests.utils.utils import default_scores, financial_payload, uk_scores
+
+
+def test_calc_zscores_matches_scalar_formula() -> None:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+    columns = scoring.financials_to_columns(financials)
+
+    zscores = scoring.calc_zscores(columns, "gb")
+
+    assert zscores.tolist() == [s["zscore"] for s in uk_scores()["scores"]]
+    assert columns["year"].tolist() == [s["year"] for s in uk_scores()["scores"]]
+
+
+def test_calc_zscores_broadcasts_coeffecients_per_row() -> None:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+    columns = {
+        field: np.concatenate([column, column])
+        for field, column in scoring.financials_to_columns(financials).items()
+    }
+    countries = np.array(["gb"] * len(financials) + ["de"] * len(financials))
+
+    zscores = scoring.calc_zscores(columns, countries)
+
+    expected = [s["zscore"] for s in uk_scores()["scores"]] + [
+        s["zscore"] for s in default_scores()["scores"]
+    ]
+    assert zscores.tolist() == expected
+
+
+def test_calc_zscores_zero_denominator_is_not_finite() -> None:
+    financial = schemas.Financial(**financial_payload()["financials"][0])
+    columns = scoring.financials_to_columns([financial])
+    columns["total_assets"][0] = 0.0
+
+    zscores = scoring.calc_zscores(columns, "gb")
+
+    assert not np.isfinite(zscores[0])
+
+
+def test_calc_zscore_wraps_batch_kernel() -> None:
+    financial = schemas.Financial(**financial_payload()["financials"][0])
+
+    assert utils.calc_zscore(financial, "gb") == uk_scores()["scores"][0]["zscore"]
+    assert utils.get_zscore_coeffecients("fr") == [1.1, 1.3, 3.2, 0.5, 1.1]
+
+
+def test_calc_zscore_zero_denominator_raises() -> None:
+    financial = schemas.Financial(
+        **{**financial_payload()["financials"][0], "total_liabilities": 0}
+    )
+
+    with pytest.raises(ZeroDivisionError):
+        utils.calc_zscore(financial, "gb")
+
+
+def _extra_financials() -> List[schemas.Financial]:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+    for i, financial in enumerate(financials):
+        financial.current_assets = 100.0 + i
+        financial.current_liabilities = 80.0 - i
+        financial.funds_from_operations = 40.0 + i
+        financial.net_income = 10.0 - 5 * i
+    return financials
+
+
+def test_calc_scores_matches_separate_formulas() -> None:
+    columns = scoring.financials_to_columns(_extra_financials())
+    formulas = ["z", "z_private", "ohlson_o", "zmijewski"]
+
+    scores = scoring.calc_scores(columns, "gb", formulas)
+
+    assert list(scores) == formulas
+    for name in formulas:
+        expected = scoring.calc_zscores(columns, "gb", formulas=name)
+        assert scores[name].tolist() == expected.tolist()
+    assert scores["z"].tolist() == [s["zscore"] for s in uk_scores()["scores"]]
+
+
+def test_calc_scores_missing_extra_fields_are_nan() -> None:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+    columns = scoring.financials_to_columns(financials)
+
+    scores = scoring.calc_scores(columns, "gb", ["z", "zmijewski"])
+
+    assert np.isfinite(scores["z"]).all()
+    assert np.isnan(scores["zmijewski"]).all()
+
+
+def test_derive_columns_links_prior_year_per_company() -> None:
+    columns = {
+        "year": np.array([2020, 2019, 2018, 2020, 2019]),
+        "total_assets": np.array([100.0, 100.0, 100.0, 50.0, 50.0]),
+        "total_liabilities": np.array([50.0, 50.0, 50.0, 60.0, 60.0]),
+        "net_income": np.array([-10.0, -30.0, 10.0, 5.0, 0.0]),
+    }
+
+    derived = scoring.derive_columns(columns, groups=[0, 0, 0, 1, 1])
+
+    assert derived["net_loss_two_years"].tolist() == [1.0, 0.0, 0.0, 0.0, 0.0]
+    assert derived["net_income_change"].tolist() == [0.5, -1.0, 0.0, 1.0, 0.0]
+    assert derived["liabilities_exceed_assets"].tolist() == [0, 0, 0, 1, 1]
+
+
+def test_calc_scores_of_many_companies() -> None:
+    financials = _extra_financials()
+    columns = scoring.financials_to_columns(financials + financials[:2])
+    countries = ["gb"] * len(financials) + ["de"] * 2
+    groups = [0] * len(financials) + [1] * 2
+
+    scores = scoring.calc_scores(columns, countries, ["z", "ohlson_o"], groups=groups)
+
+    assert scores["z"].tolist() == [s["zscore"] for s in uk_scores()["scores"]] + [
+        s["zscore"] for s in default_scores()["scores"][:2]
+    ]
+    # The latest year of the second company has the same prior year as in the first
+    assert scores["ohlson_o"][len(financials)] == scores["ohlson_o"][0]
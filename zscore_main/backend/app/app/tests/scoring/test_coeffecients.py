@@ -0,0 +1,89 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app import scoring
+
+
+def write_coeffecients(path: Path, gb: list) -> None:
+    data = {"default": [1.0, 1.2, 3.1, 0.4, 1.2], "countries": {"gb": gb}}
+    path.write_text(json.dumps(data))
+
+
+def test_country_ids_match_scalar_country_id() -> None:
+    codes = ["gb", "GB", "Fr", "aa", "zz", "gbh", "g", "", "1b", "@b", "g["]
+
+    ids = scoring.country_ids(np.array(codes))
+
+    assert ids.tolist() == [scoring.country_id(code) for code in codes]
+    assert ids[0] == ids[1]
+    assert ids[3] == 0
+    assert ids[4] == 26 * 26 - 1
+    assert set(ids[5:].tolist()) == {scoring.INVALID_COUNTRY_ID}
+
+
+def test_gather_coeffecients_with_one_fancy_index() -> None:
+    table = scoring.build_table(
+        [1.0, 1.2, 3.1, 0.4, 1.2], {"gb": [1.2, 1.4, 3.3, 0.6, 1.0]}
+    )
+    codes = np.array(["gb", "de", "GB", "gbh"])
+
+    coeffecients = scoring.gather_coeffecients(codes, table)
+    by_id = scoring.gather_coeffecients(scoring.country_ids(codes), table)
+
+    assert coeffecients.tolist() == [
+        [1.2, 1.4, 3.3, 0.6, 1.0],
+        [1.0, 1.2, 3.1, 0.4, 1.2],
+        [1.2, 1.4, 3.3, 0.6, 1.0],
+        [1.0, 1.2, 3.1, 0.4, 1.2],
+    ]
+    assert by_id.tolist() == coeffecients.tolist()
+
+
+def test_build_table_with_bad_country_code() -> None:
+    with pytest.raises(ValueError):
+        scoring.build_table([1.0, 1.2, 3.1, 0.4, 1.2], {"gbh": [1.0] * 5})
+
+
+def test_registry_reloads_changed_file(tmp_path: Path) -> None:
+    path = tmp_path / "coeffecients.json"
+    write_coeffecients(path, [1.2, 1.4, 3.3, 0.6, 1.0])
+    registry = scoring.CoeffecientRegistry(str(path), check_interval=0)
+    first = registry.get()
+
+    write_coeffecients(path, [2.0, 2.0, 2.0, 2.0, 2.0])
+    os.utime(path, ns=(first.version[0] + 1, first.version[0] + 1))
+    second = registry.get()
+
+    assert first.countries["gb"] == (1.2, 1.4, 3.3, 0.6, 1.0)
+    assert second.countries["gb"] == (2.0, 2.0, 2.0, 2.0, 2.0)
+    assert second.version != first.version
+
+
+def test_registry_keeps_version_on_bad_file(tmp_path: Path) -> None:
+    path = tmp_path / "coeffecients.json"
+    write_coeffecients(path, [1.2, 1.4, 3.3, 0.6, 1.0])
+    registry = scoring.CoeffecientRegistry(str(path), check_interval=0)
+    first = registry.get()
+
+    path.write_text("{")
+    os.utime(path, ns=(first.version[0] + 1, first.version[0] + 1))
+
+    assert registry.get() is first
+
+
+def test_registry_save_swaps_version(tmp_path: Path) -> None:
+    path = tmp_path / "coeffecients.json"
+    write_coeffecients(path, [1.2, 1.4, 3.3, 0.6, 1.0])
+    registry = scoring.CoeffecientRegistry(str(path))
+    first = registry.get()
+
+    second = registry.save([1.0] * 5, {"fr": [3.0] * 5})
+
+    assert registry.get() is second
+    assert second.countries == {"fr": (3.0,) * 5}
+    assert first.countries["gb"] == (1.2, 1.4, 3.3, 0.6, 1.0)
+    assert json.loads(path.read_text())["countries"] == {"fr": [3.0] * 5}
@@ -0,0 +1,38 @@
+import numpy as np
+
+from app import scoring
+
+
+def test_percentile_ranks() -> None:
+    cohort = np.array([1.0, 2.0, 2.0, 3.0])
+
+    ranks = scoring.percentile_ranks(cohort, [0.5, 1.0, 2.0, 4.0, np.nan])
+
+    assert ranks[:4].tolist() == [0.0, 12.5, 50.0, 100.0]
+    assert np.isnan(ranks[4])
+    assert np.isnan(scoring.percentile_ranks(np.empty(0), [1.0])).all()
+
+
+def test_cohort_index_updates_loaded_cohorts() -> None:
+    index = scoring.CohortIndex(ttl=60)
+
+    assert index.get("gb", 2020) is None
+    index.update("gb", 2020, None, 1.0)
+    assert index.get("gb", 2020) is None
+
+    index.load("GB", 2020, [3.0, 1.0, 2.0])
+    index.update("gb", 2020, None, 2.5)
+    index.update("gb", 2020, 1.0, 4.0)
+    index.update("gb", 2020, 9.0, None)
+
+    cohort = index.get("gb", 2020)
+    assert cohort is not None
+    assert cohort.tolist() == [2.0, 2.5, 3.0, 4.0]
+
+
+def test_cohort_index_expires() -> None:
+    index = scoring.CohortIndex(ttl=0)
+
+    index.load("gb", 2020, [1.0])
+
+    assert index.get("gb", 2020) is None
@@ -0,0 +1,38 @@
+import numpy as np
+import pycountry
+
+from app import scoring
+
+
+def test_country_codes_match_iso_3166() -> None:
+    codes = {country.alpha_2.lower() for country in pycountry.countries}
+
+    assert scoring.COUNTRY_CODES == codes
+
+
+def test_validate_country_code() -> None:
+    assert scoring.validate_country_code("gb")
+    assert scoring.validate_country_code("GB")
+    assert scoring.validate_country_code("Fr")
+    assert not scoring.validate_country_code("zq")
+    assert not scoring.validate_country_code("gbh")
+    assert not scoring.validate_country_code("g")
+    assert not scoring.validate_country_code("")
+    assert not scoring.validate_country_code("1b")
+
+
+def test_validate_country_codes_match_scalar_validation() -> None:
+    codes = ["gb", "GB", "Fr", "zq", "zz", "gbh", "g", "", "1b", "us", "@b"]
+
+    valid = scoring.validate_country_codes(np.array(codes))
+
+    assert valid.tolist() == [scoring.validate_country_code(code) for code in codes]
+
+
+def test_validate_country_ids() -> None:
+    ids = np.array(
+        [scoring.country_id("gb"), scoring.country_id("zq"), scoring.INVALID_COUNTRY_ID]
+    )
+
+    assert scoring.validate_country_ids(ids).tolist() == [True, False, False]
+    assert not scoring.VALID_COUNTRY_IDS[scoring.INVALID_COUNTRY_ID]
@@ -0,0 +1,98 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from app import schemas, scoring, utils
+from app.core.config import settings
+from app.tests.utils.utils import financial_payload, uk_scores
+
+
+def _columns() -> Tuple[List[schemas.Financial], Dict[str, np.ndarray]]:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+    return financials, scoring.financials_to_columns(financials)
+
+
+def test_fixed_coeffecient_formulas_match_scalar_formula() -> None:
+    financials, columns = _columns()
+
+    for name, coeffecients, intercept, n in (
+        ("z_private", (0.717, 0.847, 3.107, 0.420, 0.998), 0.0, 5),
+        ("z_non_manufacturing", (6.56, 3.26, 6.72, 1.05), 0.0, 4),
+        ("z_emerging_markets", (6.56, 3.26, 6.72, 1.05), 3.25, 4),
+    ):
+        expected = []
+        for f in financials:
+            ratios = (
+                f.working_capital / f.total_assets,
+                f.retained_earnings / f.total_assets,
+                f.ebit / f.total_assets,
+                f.equity / f.total_liabilities,
+                f.sales / f.total_assets,
+            )
+            z = ratios[0] * coeffecients[0]
+            for ratio, c in zip(ratios[1:n], coeffecients[1:]):
+                z += ratio * c
+            expected.append(z + intercept if intercept else z)
+
+        zscores = scoring.calc_zscores(columns, "gb", formulas=name)
+
+        assert zscores.tolist() == expected
+
+
+def test_calc_zscores_per_row_formulas() -> None:
+    _, columns = _columns()
+    n = len(columns["year"])
+    formulas = np.array(["z", "z_private"] * n)[:n]
+
+    zscores = scoring.calc_zscores(columns, "gb", formulas=formulas)
+
+    z = scoring.calc_zscores(columns, "gb")
+    z_private = scoring.calc_zscores(columns, "gb", formulas="z_private")
+    expected = np.where(formulas == "z", z, z_private)
+    assert zscores.tolist() == expected.tolist()
+    assert zscores.tolist()[0] == uk_scores()["scores"][0]["zscore"]
+
+
+def test_register_formula() -> None:
+    _, columns = _columns()
+    formula = scoring.Formula(
+        name="test_ebit",
+        ratios=(scoring.Ratio("ebit", "total_assets"),),
+        coeffecients=(2.0,),
+        intercept=1.0,
+    )
+    try:
+        scoring.register_formula(formula)
+
+        zscores = scoring.calc_zscores(columns, "gb", formulas="test_ebit")
+
+        assert (
+            zscores.tolist()
+            == (columns["ebit"] / columns["total_assets"] * 2.0 + 1.0).tolist()
+        )
+    finally:
+        del scoring.FORMULAS["test_ebit"]
+
+
+def test_formula_needs_one_coeffecient_per_ratio() -> None:
+    with pytest.raises(ValueError):
+        scoring.CompiledFormula(
+            scoring.Formula(
+                name="broken",
+                ratios=scoring.ALTMAN_Z.ratios,
+                coeffecients=(1.0,),
+            )
+        )
+
+
+def test_get_zscore_formula(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        settings, "ZSCORE_COUNTRY_FORMULAS", {"br": "z_emerging_markets"}
+    )
+
+    assert utils.get_zscore_formula("BR") == "z_emerging_markets"
+    assert utils.get_zscore_formula("gb") == scoring.DEFAULT_FORMULA
+    assert utils.get_zscore_formula("br", "z_private") == "z_private"
+    assert utils.validate_formula("z_private")
+    assert not utils.validate_formula("altman")
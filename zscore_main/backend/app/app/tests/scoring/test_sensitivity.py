@@ -0,0 +1,68 @@
+from typing import Dict
+
+import numpy as np
+import pytest
+
+from app import schemas, scoring
+from app.tests.utils.utils import financial_payload, uk_scores
+
+
+def _columns() -> Dict[str, np.ndarray]:
+    financial = schemas.Financial(**financial_payload()["financials"][0])
+    return scoring.financials_to_columns([financial])
+
+
+def test_calc_grid_matches_perturbed_payloads() -> None:
+    columns = _columns()
+    perturbations = {"ebit": [-0.5, 0.0, 0.5], "total_assets": [0.1]}
+
+    grid = scoring.calc_grid(columns, "gb", perturbations)
+
+    assert grid["ebit"][1] == uk_scores()["scores"][0]["zscore"]
+    for field, changes in perturbations.items():
+        for change, zscore in zip(changes, grid[field].tolist()):
+            perturbed = dict(columns)
+            perturbed[field] = columns[field] * (1 + change)
+            assert zscore == scoring.calc_zscores(perturbed, "gb")[0]
+
+
+def test_calc_derivatives_match_finite_differences() -> None:
+    columns = _columns()
+    fields = list(scoring.FINANCIAL_FIELDS)
+
+    derivatives = scoring.calc_derivatives(columns, "gb", fields)
+
+    for field in fields:
+        h = 1e-6 * columns[field][0]
+        up, down = dict(columns), dict(columns)
+        up[field] = columns[field] + h
+        down[field] = columns[field] - h
+        expected = (
+            scoring.calc_zscores(up, "gb") - scoring.calc_zscores(down, "gb")
+        ) / (2 * h)
+        assert derivatives[field][0] == pytest.approx(expected[0], rel=1e-5)
+
+
+def test_calc_break_even_reaches_thresholds() -> None:
+    columns = _columns()
+    zones = scoring.ALTMAN_Z.zones
+    assert zones is not None
+
+    break_even = scoring.calc_break_even(columns, "gb", ["ebit", "total_assets"], zones)
+
+    for field, values in break_even.items():
+        for threshold, value in zip(zones, values[0].tolist()):
+            solved = dict(columns)
+            solved[field] = np.array([value])
+            assert scoring.calc_zscores(solved, "gb")[0] == pytest.approx(threshold)
+
+
+def test_calc_break_even_unreachable_is_nan() -> None:
+    columns = _columns()
+
+    # Sales do not take part in the Z'' formula
+    break_even = scoring.calc_break_even(
+        columns, "gb", ["sales"], (1.1, 2.6), formula="z_non_manufacturing"
+    )
+
+    assert np.isnan(break_even["sales"]).all()
@@ -0,0 +1,81 @@
+from typing import Dict
+
+import numpy as np
+
+from app import schemas, scoring
+from app.tests.utils.utils import financial_payload, uk_scores
+
+
+def _columns() -> Dict[str, np.ndarray]:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+    return scoring.financials_to_columns(financials)
+
+
+def test_simulate_zscores_without_uncertainty_is_point_value() -> None:
+    zscores = scoring.simulate_zscores(_columns(), "gb", {}, samples=3)
+
+    assert zscores.shape == (5, 3)
+    for row, score in zip(zscores.tolist(), uk_scores()["scores"]):
+        assert row == [score["zscore"]] * 3
+
+
+def test_simulate_zscores_is_reproducible_with_seed() -> None:
+    uncertainty = {
+        "ebit": scoring.Uncertainty(relative_std=0.1),
+        "total_assets": scoring.Uncertainty(bounds=(-0.2, 0.2)),
+    }
+
+    first = scoring.simulate_zscores(_columns(), "gb", uncertainty, 1000, seed=7)
+    second = scoring.simulate_zscores(_columns(), "gb", uncertainty, 1000, seed=7)
+    other = scoring.simulate_zscores(_columns(), "gb", uncertainty, 1000, seed=8)
+
+    assert (first == second).all()
+    assert not (first == other).all()
+
+
+def test_simulate_zscores_chunks_the_draw() -> None:
+    uncertainty = {"ebit": scoring.Uncertainty(relative_std=0.1)}
+
+    zscores = scoring.simulate_zscores(
+        _columns(), "gb", uncertainty, 1001, seed=7, chunk_size=64
+    )
+
+    assert zscores.shape == (5, 1001)
+    assert np.isfinite(zscores).all()
+    assert len(np.unique(zscores[0])) == 1001
+
+
+def test_summarize_distribution() -> None:
+    zscores = np.array([[1.0, 2.0, 2.5, 3.0, 4.0], [np.nan] * 5])
+
+    means, values, probabilities = scoring.summarize_distribution(
+        zscores, [0, 50, 100], (1.81, 2.99)
+    )
+
+    assert means[0] == 2.5
+    assert values[0].tolist() == [1.0, 2.5, 4.0]
+    assert probabilities[0].tolist() == [0.2, 0.4, 0.4]
+    assert np.isnan(means[1])
+    assert probabilities[1].tolist() == [0.0, 0.0, 0.0]
+
+
+def test_simulate_distribution_summarizes_blocks_of_rows() -> None:
+    uncertainty = {"ebit": scoring.Uncertainty(relative_std=0.1)}
+    zones = (1.1, 2.6)
+
+    zscores = scoring.simulate_zscores(_columns(), "gb", uncertainty, 100, seed=7)
+    expected = scoring.summarize_distribution(zscores, [5, 50, 95], zones)
+    whole = scoring.simulate_distribution(
+        _columns(), "gb", uncertainty, 100, [5, 50, 95], zones, seed=7
+    )
+    # One row per block
+    blocks = scoring.simulate_distribution(
+        _columns(), "gb", uncertainty, 100, [5, 50, 95], zones, seed=7, chunk_size=64
+    )
+
+    for summary, expected_summary in zip(whole, expected):
+        assert (summary == expected_summary).all()
+    means, values, probabilities = blocks
+    assert (means.shape, values.shape, probabilities.shape) == ((5,), (5, 3), (5, 3))
+    assert np.isfinite(values).all()
+    assert np.allclose(probabilities.sum(axis=1), 1.0)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from app import schemas, scoring
+from app.tests.utils.utils import financial_payload, uk_scores
+
+
+def test_calc_trends() -> None:
+    groups = [0, 0, 0, 0, 1, 1, 1, 2, 2]
+    years = [2016, 2017, 2018, 2019, 2017, 2018, 2019, 2016, 2019]
+    zscores = [5.0, 4.0, 3.0, 2.5, 2.0, 1.0, 1.5, 3.0, 2.0]
+
+    trends = scoring.calc_trends(groups, years, zscores, 4)
+
+    assert trends.years.tolist() == [2016, 2017, 2018, 2019]
+    assert np.isnan(trends.zscores[3]).all()
+    assert trends.deltas[0, 1:].tolist() == [-1.0, -1.0, -0.5]
+    assert np.isnan(trends.deltas[2]).all()
+    for company in range(3):
+        present = ~np.isnan(trends.zscores[company])
+        slope, _ = np.polyfit(
+            trends.years[present], trends.zscores[company][present], 1
+        )
+        assert trends.slopes[company] == pytest.approx(slope)
+    assert np.isnan(trends.slopes[3])
+    assert trends.declines.tolist() == [3, 0, 0, 0]
+
+
+def test_calc_trends_empty() -> None:
+    trends = scoring.calc_trends([], [], [], 2)
+
+    assert trends.zscores.shape == (2, 0)
+    assert trends.declines.tolist() == [0, 0]
+
+
+def test_calc_trends_of_company_scores() -> None:
+    financials = schemas.FinancialPayload(**financial_payload()).financials
+
+    columns = scoring.financials_to_columns(financials + financials[:1])
+    groups = [0] * len(financials) + [1]
+    zscores = scoring.calc_zscores(columns, "gb", groups=groups)
+
+    trends = scoring.calc_trends(groups, columns["year"], zscores, 2)
+
+    expected = [s["zscore"] for s in reversed(uk_scores()["scores"])]
+    assert trends.years.tolist() == [2016, 2017, 2018, 2019, 2020]
+    assert trends.zscores[0].tolist() == expected
+    assert trends.deltas[0, 1:].tolist() == np.diff(expected).tolist()
+    assert trends.declines.tolist() == [1, 0]
@@ -0,0 +1,75 @@
+from typing import Any
+
+import numpy as np
+
+from app import scoring
+
+
+def columns(**overrides: Any) -> dict:
+    years = overrides.pop("year", [2020, 2019, 2018])
+    data = {field: np.ones(len(years)) for field in scoring.FINANCIAL_FIELDS}
+    data.update(
+        {field: np.full(len(years), np.nan) for field in scoring.EXTRA_FINANCIAL_FIELDS}
+    )
+    data["year"] = np.asarray(years)
+    data.update({field: np.asarray(values) for field, values in overrides.items()})
+    return data
+
+
+def test_validate_rows_without_errors() -> None:
+    errors = scoring.validate_rows(columns())
+
+    assert errors == {}
+    assert not scoring.invalid_rows(errors, 3).any()
+
+
+def test_validate_rows_reports_every_row() -> None:
+    data = columns(
+        year=[2020, 2019, 2019, scoring.MISSING_YEAR],
+        total_assets=[0.0, 1.0, -1.0, 1.0],
+        total_liabilities=[1.0, np.nan, 1.0, 1.0],
+    )
+
+    errors = scoring.validate_rows(
+        data,
+        country_ids=scoring.country_ids(["gb", "gb", "zq", "gb"]),
+        company_ids=["1", "x1", "2", "3"],
+    )
+
+    assert scoring.invalid_rows(errors, 4).tolist() == [True] * 4
+    assert [scoring.error_details(errors, row) for row in range(4)] == [
+        ["Zero or negative total_assets"],
+        ["Invalid company id", "Duplicate year", "Missing total_liabilities"],
+        ["Invalid country code", "Duplicate year", "Zero or negative total_assets"],
+        ["Missing year"],
+    ]
+
+
+def test_validate_rows_duplicate_years_per_group() -> None:
+    data = columns(year=[2020, 2020, 2020])
+
+    errors = scoring.validate_rows(data, groups=["a", "b", "a"])
+
+    assert errors["Duplicate year"].tolist() == [True, False, True]
+
+
+def test_validate_rows_checks_fields_of_the_formula_of_each_row() -> None:
+    data = columns(current_liabilities=[1.0, 0.0, 1.0], net_income=[1.0, 1.0, 1.0])
+    data["current_assets"] = np.ones(3)
+
+    errors = scoring.validate_rows(data, ["z", "zmijewski", "ohlson_o"])
+
+    assert [scoring.error_details(errors, row) for row in range(3)] == [
+        [],
+        ["Zero or negative current_liabilities"],
+        ["Missing funds_from_operations"],
+    ]
+
+
+def test_validate_ids() -> None:
+    ids = ["10149809", "abc123", "", "12 3", "٣"]
+
+    valid = scoring.validate_ids(ids)
+
+    assert valid.tolist() == [id.isnumeric() for id in ids]
+    assert scoring.validate_ids([]).tolist() == []
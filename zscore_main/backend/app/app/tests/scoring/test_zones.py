@@ -0,0 +1,69 @@
+import numpy as np
+
+from app import scoring
+
+
+def test_calc_zones_per_formula() -> None:
+    zscores = [1.5, 1.5, 1.5, 5.0]
+    formulas = ["z", "z_private", "zmijewski", "z_emerging_markets"]
+
+    codes = scoring.calc_zones(zscores, formulas)
+
+    assert [scoring.zone_name(code) for code in codes.tolist()] == [
+        "distress",
+        "grey",
+        None,
+        "grey",
+    ]
+    assert scoring.calc_zones(zscores, "z").tolist() == [0, 0, 0, 2]
+
+
+def test_classify_zones() -> None:
+    codes = scoring.classify_zones([1.0, 1.81, 2.5, 2.99, 3.0, np.nan], (1.81, 2.99))
+
+    assert codes.tolist() == [0, 1, 1, 1, 2, scoring.NO_ZONE]
+    assert [scoring.zone_name(code) for code in codes.tolist()] == [
+        "distress",
+        "grey",
+        "grey",
+        "grey",
+        "safe",
+        None,
+    ]
+
+
+def test_classify_zones_of_infinite_scores() -> None:
+    # Division by a zero total scores `inf`, which is no zone rather than safe
+    codes = scoring.classify_zones([np.inf, -np.inf, 2.0], (1.81, 2.99))
+
+    assert codes.tolist() == [scoring.NO_ZONE, scoring.NO_ZONE, 1]
+
+
+def test_zone_histogram() -> None:
+    countries = np.array(["gb", "fr", "GB", "gb", "fr", "gb"])
+    years = [2020, 2020, 2020, 2019, 2020, 2020]
+    codes = [2, 0, 2, 1, 0, scoring.NO_ZONE]
+
+    ids, hist_years, counts = scoring.zone_histogram(countries, years, codes)
+
+    assert [scoring.country_code(cid) for cid in ids.tolist()] == ["fr", "gb", "gb"]
+    assert hist_years.tolist() == [2020, 2019, 2020]
+    assert counts.tolist() == [[2, 0, 0], [0, 1, 0], [0, 0, 2]]
+
+
+def test_zone_histogram_of_distant_years() -> None:
+    countries = np.array(["gb", "fr", "gb"])
+    years = [-4 * 10**18, 4 * 10**18, 4 * 10**18]
+
+    ids, hist_years, counts = scoring.zone_histogram(countries, years, [0, 1, 2])
+
+    assert [scoring.country_code(cid) for cid in ids.tolist()] == ["fr", "gb", "gb"]
+    assert hist_years.tolist() == [4 * 10**18, -4 * 10**18, 4 * 10**18]
+    assert counts.tolist() == [[0, 1, 0], [1, 0, 0], [0, 0, 1]]
+
+
+def test_zone_histogram_empty() -> None:
+    ids, years, counts = scoring.zone_histogram(np.array([], dtype=str), [], [])
+
+    assert len(ids) == len(years) == 0
+    assert counts.shape == (0, 3)
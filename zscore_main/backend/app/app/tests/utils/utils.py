@@ -1,20 +1,70 @@
+import asyncio
 import random
 import string
-from typing import Dict
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, TypeVar
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.db.session import AsyncSessionLocal, async_engine
+
+ResultType = TypeVar("ResultType")
 
 
 def random_lower_string() -> str:
     return "".join(random.choices(string.ascii_lowercase, k=32))
 
 
+def random_company_id() -> str:
+    return "".join(random.choices(string.digits, k=12))
+
+
 def random_email() -> str:
     return f"{random_lower_string()}@{random_lower_string()}.com"
 
 
+@contextmanager
+def count_statements(db: Session) -> Iterator[List[str]]:
+    """
+    Collect the SQL statements the session sends to the database, commits and
+    rollbacks aside.
+    """
+    statements: List[str] = []
+    engine = db.get_bind()
+
+    def before_cursor_execute(
+        conn: Any, cursor: Any, statement: str, *args: Any
+    ) -> None:
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def run_async(func: Callable[[AsyncSession], Awaitable[ResultType]]) -> ResultType:
+    """
+    Run a coroutine function with an async session, on an event loop of its
+    own.
+    """
+
+    async def run() -> ResultType:
+        try:
+            async with AsyncSessionLocal() as db:
+                return await func(db)
+        finally:
+            # Pooled connections can't outlive their event loop
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+
 def get_superuser_token_headers(client: TestClient) -> Dict[str, str]:
     login_data = {
         "username": settings.FIRST_SUPERUSER,
@@ -88,11 +138,11 @@ def financial_payload() -> dict:
 def default_scores() -> dict:
     scores = {
         "scores": [
-            {"year": 2020, "zscore": 6.8661517296099515},
-            {"year": 2019, "zscore": 7.13880714484832},
-            {"year": 2018, "zscore": 7.11875256899471},
-            {"year": 2017, "zscore": 7.005949360640461},
-            {"year": 2016, "zscore": 7.105545038787994},
+            {"year": 2020, "zscore": 6.8661517296099515, "zone": "safe"},
+            {"year": 2019, "zscore": 7.13880714484832, "zone": "safe"},
+            {"year": 2018, "zscore": 7.11875256899471, "zone": "safe"},
+            {"year": 2017, "zscore": 7.005949360640461, "zone": "safe"},
+            {"year": 2016, "zscore": 7.105545038787994, "zone": "safe"},
         ]
     }
     return scores
@@ -101,11 +151,11 @@ def default_scores() -> dict:
 def uk_scores() -> dict:
     scores = {
         "scores": [
-            {"year": 2020, "zscore": 6.539547842049954},
-            {"year": 2019, "zscore": 6.786510311168614},
-            {"year": 2018, "zscore": 6.6714673215855385},
-            {"year": 2017, "zscore": 6.460657488940055},
-            {"year": 2016, "zscore": 6.602816418774483},
+            {"year": 2020, "zscore": 6.539547842049954, "zone": "safe"},
+            {"year": 2019, "zscore": 6.786510311168614, "zone": "safe"},
+            {"year": 2018, "zscore": 6.6714673215855385, "zone": "safe"},
+            {"year": 2017, "zscore": 6.460657488940055, "zone": "safe"},
+            {"year": 2016, "zscore": 6.602816418774483, "zone": "safe"},
         ]
     }
     return scores
@@ -4,10 +4,10 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 
 import emails
-import pycountry
 from emails.template import JinjaTemplate
 from jose import jwt
 
+from app import scoring
 from app.core.config import settings
 from app.schemas import Financial, ZScore
 
@@ -124,29 +124,20 @@ def calc_zscore(financial: Financial, country_code: str) -> float:
         X4 = equity / total_liabilities
         X5 = sales / total_assets
 
+    Thin wrapper around the batch kernel `app.scoring.calc_zscores`; prefer the
+    batch kernel when scoring more than one financial year.
+
     Args:
         financial (Financial): financial data per each year
 
     Returns:
         [float]: z-score
     """
-    coeffecients = get_zscore_coeffecients(country_code)
-
-    x1 = financial.working_capital / financial.total_assets
-    x2 = financial.retained_earnings / financial.total_assets
-    x3 = financial.ebit / financial.total_assets
-    x4 = financial.equity / financial.total_liabilities
-    x5 = financial.sales / financial.total_assets
-
-    z = (
-        coeffecients[0] * x1
-        + coeffecients[1] * x2
-        + coeffecients[2] * x3
-        + coeffecients[3] * x4
-        + coeffecients[4] * x5
-    )
+    if financial.total_assets == 0 or financial.total_liabilities == 0:
+        raise ZeroDivisionError("float division by zero")
 
-    return z
+    columns = scoring.financials_to_columns([financial])
+    return float(scoring.calc_zscores(columns, country_code)[0])
 
 
 def get_zscore_coeffecients(country_code) -> list:
@@ -159,12 +150,38 @@ def get_zscore_coeffecients(country_code) -> list:
     Returns:
         list: zscore formula coeffecients
     """
-    coeffecients = {
-        "gb": [1.2, 1.4, 3.3, 0.6, 1.0],  # UK
-        "fr": [1.1, 1.3, 3.2, 0.5, 1.1],  # France
-    }
+    return scoring.gather_coeffecients(country_code).tolist()
 
-    return coeffecients.get(country_code, [1.0, 1.2, 3.1, 0.4, 1.2])
+
+def get_zscore_formula(country_code: str, formula: Optional[str] = None) -> str:
+    """
+    Get the name of the zscore formula for country_code
+
+    Args:
+        country_code (str): country iso code
+        formula (str): formula requested by the client, if any
+
+    Returns:
+        str: formula name, falling back to the formula of the country
+    """
+    if formula is not None:
+        return formula
+    return settings.ZSCORE_COUNTRY_FORMULAS.get(
+        country_code.lower(), scoring.DEFAULT_FORMULA
+    )
+
+
+def validate_formula(formula: str) -> bool:
+    """
+    Validate zscore formula name
+
+    Args:
+        formula (str): formula name
+
+    Returns:
+        [bool]: validated value
+    """
+    return formula in scoring.FORMULAS
 
 
 def validate_country_code(code) -> bool:
@@ -177,14 +194,7 @@ def validate_country_code(code) -> bool:
     Returns:
         [bool]: validated value
     """
-    validation = False
-    alpha_2 = code.upper()
-    country = pycountry.countries.get(alpha_2=alpha_2)
-
-    if country is not None:
-        validation = True
-
-    return validation
+    return scoring.validate_country_code(code)
 
 
 def validate_id(id) -> bool:
@@ -0,0 +1,225 @@
+"""
+Benchmark async routes against threadpool routes under uvicorn.
+
+    python benchmarks/bench_async.py --connections 1 16 64 --duration 5
+
+Starlette runs `def` endpoints in its threadpool and `async def` endpoints on
+the event loop. Both models serve the same work here, under a uvicorn server
+started in a subprocess and a keep-alive HTTP/1.1 load generator:
+
+- score: one company, a few microseconds of NumPy, like `financial_scores`
+- bulk: many companies, CPU-heavy, like `bulk_financial_scores`, sent to the
+  bounded compute executor by the async route
+
+The Z-score cache is disabled, so every request is scored.
+"""
+
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import orjson
+import uvicorn
+from fastapi import FastAPI, Response
+
+from app import schemas, scoring, utils
+from app.api.api_v1.endpoints import company
+from app.api.responses import render_json
+from app.core.cache import zscore_cache
+
+FIELDS = (
+    "ebit",
+    "equity",
+    "retained_earnings",
+    "sales",
+    "total_assets",
+    "total_liabilities",
+    "working_capital",
+)
+
+
+def financials(rng: np.random.Generator, years: int = 5) -> List[dict]:
+    return [
+        {"year": 2020 - year, **{field: rng.uniform(10.0, 1000.0) for field in FIELDS}}
+        for year in range(years)
+    ]
+
+
+def score_company(payload: schemas.FinancialPayload) -> bytes:
+    columns = scoring.financials_to_columns(payload.financials)
+    coeffecients = scoring.coeffecient_registry.get()
+    formula = utils.get_zscore_formula("gb")
+    zscores = scoring.calc_zscores(columns, "gb", coeffecients, formulas=formula)
+    zones = scoring.calc_zones(zscores, formula)
+    return render_json(
+        dict(
+            scores=[
+                {"year": year, "zscore": zscore, "zone": scoring.zone_name(code)}
+                for year, zscore, code in zip(
+                    columns["year"].tolist(), zscores.tolist(), zones.tolist()
+                )
+            ]
+        )
+    )
+
+
+def create_app() -> FastAPI:
+    zscore_cache.maxsize = 0
+    app = FastAPI()
+
+    @app.put("/threadpool/score")
+    def threadpool_score(payload: schemas.FinancialPayload) -> Response:
+        return Response(score_company(payload), media_type="application/json")
+
+    @app.put("/async/score")
+    async def async_score(payload: schemas.FinancialPayload) -> Response:
+        return Response(score_company(payload), media_type="application/json")
+
+    @app.put("/threadpool/bulk")
+    def threadpool_bulk(payload: schemas.BulkFinancialPayload) -> Response:
+        return company._bulk_scores(payload, None)
+
+    @app.put("/async/bulk")
+    async def async_bulk(payload: schemas.BulkFinancialPayload) -> Response:
+        return await company._compute(company._bulk_scores, payload, None)
+
+    return app
+
+
+def serve(port: int) -> None:
+    uvicorn.run(create_app(), host="127.0.0.1", port=port, log_level="warning")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("Server did not start")
+
+
+async def read_response(reader: asyncio.StreamReader) -> int:
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def connection(
+    port: int, request: bytes, deadline: float, latencies: List[float]
+) -> Dict[int, int]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    statuses: Dict[int, int] = {}
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+    return statuses
+
+
+async def load(
+    port: int, path: str, body: bytes, connections: int, duration: float
+) -> Tuple[float, float, float, Dict[int, int]]:
+    request = (
+        f"PUT {path} HTTP/1.1\r\nhost: 127.0.0.1\r\n"
+        f"content-type: application/json\r\ncontent-length: {len(body)}\r\n\r\n"
+    ).encode() + body
+    latencies: List[float] = []
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            connection(port, request, start + duration, latencies)
+            for _ in range(connections)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    statuses: Dict[int, int] = {}
+    for result in results:
+        for status, count in result.items():
+            statuses[status] = statuses.get(status, 0) + count
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return len(latencies) / elapsed, p50, p99, statuses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--companies", type=int, default=1000)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve)
+        return
+
+    rng = np.random.default_rng(0)
+    bodies = {
+        "score": orjson.dumps({"financials": financials(rng)}),
+        "bulk": orjson.dumps(
+            {
+                "companies": [
+                    {
+                        "country_iso_code": "gb",
+                        "id": str(10000000 + i),
+                        "financials": financials(rng),
+                    }
+                    for i in range(args.companies)
+                ]
+            }
+        ),
+    }
+
+    port = free_port()
+    server = subprocess.Popen([sys.executable, __file__, "--serve", str(port)])
+    try:
+        wait_for(port)
+        print(
+            f"{'route':>6} {'model':>11} {'conns':>6} {'req/s':>9} "
+            f"{'p50 (ms)':>9} {'p99 (ms)':>9} {'errors':>7}"
+        )
+        for route, body in bodies.items():
+            for connections in args.connections:
+                for model in ("threadpool", "async"):
+                    rate, p50, p99, statuses = asyncio.run(
+                        load(
+                            port, f"/{model}/{route}", body, connections, args.duration
+                        )
+                    )
+                    errors = sum(
+                        count for status, count in statuses.items() if status != 200
+                    )
+                    print(
+                        f"{route:>6} {model:>11} {connections:>6} {rate:>9.1f} "
+                        f"{p50:>9.2f} {p99:>9.2f} {errors:>7}"
+                    )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
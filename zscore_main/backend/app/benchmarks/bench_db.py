@@ -0,0 +1,174 @@
+"""
+Benchmark async database sessions against sync sessions under uvicorn.
+
+    python benchmarks/bench_db.py --connections 16 64 256 --latency 100
+
+Sync `def` endpoints hold one of the 40 threadpool workers of Starlette while
+they wait on Postgres, async endpoints await it on the event loop. Both read a
+page of items, after a `pg_sleep` standing for the round trip to a remote
+database. Each model is served by a uvicorn server of its own, in a
+subprocess, with an engine pooling `--pool-size` connections: sync sessions
+serve at most as many requests at once as there are threadpool workers, async
+ones as many as there are connections.
+
+Past the threadpool, sync sessions stall: FastAPI closes them in the threadpool
+as well, behind requests waiting for a pooled connection, so requests fail once
+the pool times out. Async sessions are closed on the event loop.
+
+Needs the database of the app.
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from typing import Any, AsyncGenerator, Dict, Generator, List, Tuple
+
+import numpy as np
+import uvicorn
+from bench_async import connection, free_port, wait_for
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import crud, schemas
+from app.api.responses import ORJSONResponse, model_fields
+from app.core.config import settings
+
+MODELS = ("sync", "async")
+
+PAGE_SIZE = 20
+
+ROUND_TRIP = text("SELECT pg_sleep(:seconds)")
+
+
+def create_app(model: str, pool_size: int, latency: float) -> FastAPI:
+    app = FastAPI()
+    seconds = {"seconds": latency / 1000}
+
+    if model == "sync":
+        engine = create_engine(
+            settings.SQLALCHEMY_DATABASE_URI, pool_size=pool_size, max_overflow=0
+        )
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def get_db() -> Generator:
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        @app.get("/items")
+        def sync_items(db: Session = Depends(get_db)) -> Any:
+            db.execute(ROUND_TRIP, seconds)
+            items, _ = crud.item.get_page(db, limit=PAGE_SIZE)
+            return ORJSONResponse([model_fields(schemas.Item, item) for item in items])
+
+        return app
+
+    async_engine = create_async_engine(
+        settings.ASYNC_SQLALCHEMY_DATABASE_URI, pool_size=pool_size, max_overflow=0
+    )
+    AsyncSessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        bind=async_engine,
+        class_=AsyncSession,
+    )
+
+    async def get_async_db() -> AsyncGenerator:
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    @app.get("/items")
+    async def async_items(db: AsyncSession = Depends(get_async_db)) -> Any:
+        await db.execute(ROUND_TRIP, seconds)
+        items, _ = await crud.item.aget_page(db, limit=PAGE_SIZE)
+        return ORJSONResponse([model_fields(schemas.Item, item) for item in items])
+
+    return app
+
+
+def serve(port: int, model: str, pool_size: int, latency: float) -> None:
+    uvicorn.run(
+        create_app(model, pool_size, latency),
+        host="127.0.0.1",
+        port=port,
+        # Sync sessions that time out are counted as errors by the client
+        log_level="critical",
+    )
+
+
+async def load(
+    port: int, connections: int, duration: float
+) -> Tuple[float, float, float, Dict[int, int]]:
+    request = b"GET /items HTTP/1.1\r\nhost: 127.0.0.1\r\n\r\n"
+    latencies: List[float] = []
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            connection(port, request, start + duration, latencies)
+            for _ in range(connections)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    statuses: Dict[int, int] = {}
+    for result in results:
+        for status, count in result.items():
+            statuses[status] = statuses.get(status, 0) + count
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return len(latencies) / elapsed, p50, p99, statuses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=100.0, help="milliseconds")
+    parser.add_argument("--pool-size", type=int, default=80)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--model", choices=MODELS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.model, args.pool_size, args.latency)
+        return
+
+    print(
+        f"{'session':>8} {'conns':>6} {'req/s':>9} "
+        f"{'p50 (ms)':>9} {'p99 (ms)':>9} {'errors':>7}"
+    )
+    for model in MODELS:
+        port = free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                __file__,
+                *("--serve", str(port), "--model", model),
+                *("--pool-size", str(args.pool_size)),
+                *("--latency", str(args.latency)),
+            ]
+        )
+        try:
+            wait_for(port)
+            for connections in args.connections:
+                rate, p50, p99, statuses = asyncio.run(
+                    load(port, connections, args.duration)
+                )
+                errors = sum(
+                    count for status, count in statuses.items() if status != 200
+                )
+                print(
+                    f"{model:>8} {connections:>6} {rate:>9.1f} "
+                    f"{p50:>9.2f} {p99:>9.2f} {errors:>7}"
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark bulk ingestion of financials and scores against one write per company.
+
+    python benchmarks/bench_ingest.py --companies 100 1000 10000
+
+Needs the database of the app. Each run stores fresh company ids, and deletes
+them afterwards.
+"""
+
+import argparse
+import time
+import uuid
+from typing import Callable, List
+
+import numpy as np
+
+from app import crud, models, schemas, scoring
+from app.db.session import SessionLocal
+
+YEARS = 5
+
+
+def payload(companies: int, prefix: str) -> List[schemas.CompanyFinancials]:
+    rng = np.random.default_rng(0)
+    values = rng.uniform(
+        10.0, 1000.0, (companies, YEARS, len(scoring.FINANCIAL_FIELDS))
+    )
+    return [
+        schemas.CompanyFinancials(
+            country_iso_code="gb",
+            id=f"{prefix}{company}",
+            financials=[
+                dict(year=2020 - year, **dict(zip(scoring.FINANCIAL_FIELDS, row)))
+                for year, row in enumerate(values[company].tolist())
+            ],
+        )
+        for company in range(companies)
+    ]
+
+
+def per_company(companies: List[schemas.CompanyFinancials]) -> None:
+    coeffecients = scoring.coeffecient_registry.get()
+    db = SessionLocal()
+    try:
+        for company in companies:
+            crud.financial.merge_by_company(
+                db,
+                country_iso_code=company.country_iso_code,
+                company_id=company.id,
+                financials=company.financials,
+                coeffecients=coeffecients,
+            )
+    finally:
+        db.close()
+
+
+def bulk(companies: List[schemas.CompanyFinancials]) -> None:
+    coeffecients = scoring.coeffecient_registry.get()
+    rows = [
+        (company, financial)
+        for company in companies
+        for financial in company.financials
+    ]
+    columns = scoring.financials_to_columns([financial for _, financial in rows])
+    zscores = scoring.calc_zscores(columns, "gb", coeffecients)
+    db = SessionLocal()
+    try:
+        crud.financial.ingest(
+            db,
+            country_iso_codes=[company.country_iso_code for company, _ in rows],
+            company_ids=[company.id for company, _ in rows],
+            columns=columns,
+            zscores=zscores,
+            coeffecients=[f"{scoring.DEFAULT_FORMULA}:{coeffecients.digest}"]
+            * len(rows),
+        )
+    finally:
+        db.close()
+
+
+def cleanup(prefix: str) -> None:
+    db = SessionLocal()
+    try:
+        db.query(models.Company).filter(
+            models.Company.company_id.startswith(prefix)
+        ).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def timed(func: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--companies", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    print(
+        f"{'companies':>10} {'rows':>8} {'per company (s)':>16} "
+        f"{'bulk (s)':>10} {'speedup':>9}"
+    )
+    for size in args.companies:
+        prefixes = [uuid.uuid4().hex[:8], uuid.uuid4().hex[:8]]
+        slow_payload, fast_payload = (payload(size, prefix) for prefix in prefixes)
+        try:
+            slow = timed(lambda: per_company(slow_payload))
+            fast = timed(lambda: bulk(fast_payload))
+        finally:
+            for prefix in prefixes:
+                cleanup(prefix)
+        print(
+            f"{size:>10} {size * YEARS:>8} {slow:>16.3f} {fast:>10.3f} "
+            f"{slow / fast:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark the orjson fast response path against the validated response path.
+
+    python benchmarks/bench_responses.py --sizes 100 1000 10000
+
+The validated path is what FastAPI does with the content an endpoint returns:
+validate it against the `response_model` of the route, encode it with
+`jsonable_encoder` and serialize it with the stdlib `json`. The fast path
+serializes content built with the fields of the response model with orjson.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Callable, List, Type
+
+import numpy as np
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app import models, schemas, scoring
+from app.api.responses import ORJSONResponse, model_fields
+
+YEARS = 5
+
+
+def validated(response_model: Type[Any], content: Any) -> bytes:
+    field = create_response_field(name="response", type_=response_model)
+    encoded = asyncio.run(
+        serialize_response(field=field, response_content=content, is_coroutine=False)
+    )
+    return JSONResponse(encoded).body
+
+
+def bulk_models(companies: int, zscores: List[float], codes: List[int]) -> dict:
+    # The content of the bulk endpoint as it was built before the fast path
+    results = []
+    for company in range(companies):
+        rows = range(company * YEARS, (company + 1) * YEARS)
+        scores = [
+            schemas.ZScore(
+                year=2020 - row % YEARS,
+                zscore=zscores[row],
+                zone=scoring.zone_name(codes[row]),
+            )
+            for row in rows
+        ]
+        results.append(
+            schemas.CompanyZScoresResult(
+                country_iso_code="gb", id=str(company), scores=scores
+            )
+        )
+    return dict(results=results, errors=[], histogram=[])
+
+
+def bulk_dicts(companies: int, zscores: List[float], codes: List[int]) -> dict:
+    results = []
+    for company in range(companies):
+        rows = range(company * YEARS, (company + 1) * YEARS)
+        scores = [
+            {
+                "year": 2020 - row % YEARS,
+                "zscore": zscores[row],
+                "zone": scoring.zone_name(codes[row]),
+            }
+            for row in rows
+        ]
+        results.append({"country_iso_code": "gb", "id": str(company), "scores": scores})
+    return dict(results=results, errors=[], histogram=[])
+
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**2, 10**3, 10**4])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'endpoint':>10} {'rows':>8} {'validated (s)':>14} "
+        f"{'fast (s)':>10} {'speedup':>9}"
+    )
+    for size in args.sizes:
+        rng = np.random.default_rng(0)
+        zscores = rng.uniform(0.0, 5.0, size * YEARS)
+        codes = scoring.calc_zones(zscores).tolist()
+        zscores = zscores.tolist()
+        users = [
+            models.User(
+                id=i,
+                email=f"user{i}@example.com",
+                full_name=f"User {i}",
+                is_active=True,
+                is_superuser=False,
+            )
+            for i in range(size)
+        ]
+        items = [
+            models.Item(id=i, title=f"Item {i}", description="Item", owner_id=1)
+            for i in range(size)
+        ]
+
+        cases = [
+            (
+                "company",
+                size * YEARS,
+                lambda: validated(
+                    schemas.BulkCompanyZScores, bulk_models(size, zscores, codes)
+                ),
+                lambda: ORJSONResponse(bulk_dicts(size, zscores, codes)).body,
+            ),
+            (
+                "users",
+                size,
+                lambda: validated(List[schemas.User], users),
+                lambda: ORJSONResponse(
+                    [model_fields(schemas.User, user) for user in users]
+                ).body,
+            ),
+            (
+                "items",
+                size,
+                lambda: validated(List[schemas.Item], items),
+                lambda: ORJSONResponse(
+                    [model_fields(schemas.Item, item) for item in items]
+                ).body,
+            ),
+        ]
+        for name, rows, slow, fast in cases:
+            slow_time = best_of(args.repeat, slow)
+            fast_time = best_of(args.repeat, fast)
+            print(
+                f"{name:>10} {rows:>8} {slow_time:>14.4f} {fast_time:>10.4f} "
+                f"{slow_time / fast_time:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark the batch Z-score kernel against the per-row scalar formula.
+
+    python benchmarks/bench_zscore.py --sizes 1000 100000 10000000
+
+The per-row loop is timed on at most `--loop-limit` rows and scaled linearly to
+the requested size, so 10^7 rows do not take minutes to measure.
+"""
+
+import argparse
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app import scoring
+
+
+def make_columns(size: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    columns = {
+        field: rng.uniform(1.0, 1000.0, size) for field in scoring.FINANCIAL_FIELDS
+    }
+    columns["year"] = rng.integers(2000, 2021, size)
+    return columns
+
+
+def scalar_zscores(rows: List[tuple], country_code: str) -> List[float]:
+    # The pre-batch implementation: the coeffecient dict is rebuilt and five
+    # divisions are made per row.
+    zscores = []
+    for ebit, equity, retained, sales, assets, liabilities, working in rows:
+        c = {
+            "gb": [1.2, 1.4, 3.3, 0.6, 1.0],
+            "fr": [1.1, 1.3, 3.2, 0.5, 1.1],
+        }.get(country_code, [1.0, 1.2, 3.1, 0.4, 1.2])
+        zscores.append(
+            c[0] * (working / assets)
+            + c[1] * (retained / assets)
+            + c[2] * (ebit / assets)
+            + c[3] * (equity / liabilities)
+            + c[4] * (sales / assets)
+        )
+    return zscores
+
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**3, 10**5, 10**7])
+    parser.add_argument("--loop-limit", type=int, default=10**5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'per-row (s)':>12} {'batch (s)':>12} {'speedup':>9}")
+    for size in args.sizes:
+        columns = make_columns(size)
+        countries = np.where(np.arange(size) % 2, "gb", "fr")
+
+        sample = min(size, args.loop_limit)
+        rows = list(
+            zip(
+                *(
+                    columns[field][:sample].tolist()
+                    for field in scoring.FINANCIAL_FIELDS
+                )
+            )
+        )
+        loop = best_of(args.repeat, lambda: scalar_zscores(rows, "gb"))
+        loop *= size / sample
+
+        batch = best_of(args.repeat, lambda: scoring.calc_zscores(columns, countries))
+
+        estimated = "*" if sample < size else " "
+        print(
+            f"{size:>10} {loop:>11.4f}{estimated} {batch:>12.4f} {loop / batch:>8.1f}x"
+        )
+
+    print("* extrapolated from --loop-limit rows")
+
+
+if __name__ == "__main__":
+    main()